@@ -0,0 +1,181 @@
+"""
+Ejecución aislada de cálculos simbólicos costosos.
+
+Algunas llamadas de SymPy (limit, solveset) pueden tardar minutos con ciertas
+entradas. Aquí se ejecutan en un grupo pequeño de procesos auxiliares, ya
+iniciados y con SymPy importado, con un tiempo límite por llamada: si se
+agota, el proceso se termina, se reemplaza por uno nuevo y se lanza
+TiempoAgotado para que la app muestre una respuesta numérica o un aviso.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+
+import sympy as sp
+
+LIMITE_SEGUNDOS = 5.0
+TAMANO_POOL = 2
+
+
+class TiempoAgotado(TimeoutError):
+    """
+    El cálculo no terminó dentro del tiempo límite.
+    """
+
+
+class LimiteNoExiste(ValueError):
+    """
+    El límite por ambos lados no existe porque los límites laterales son
+    distintos. Se crea con (izquierda, derecha).
+    """
+
+    @property
+    def izquierda(self):
+        return self.args[0]
+
+    @property
+    def derecha(self):
+        return self.args[1]
+
+    def __str__(self):
+        return (f"El límite no existe: por la izquierda es {self.izquierda} "
+                f"y por la derecha, {self.derecha}")
+
+
+def _bucle_trabajador(conexion):
+    """
+    Bucle de cada proceso auxiliar: recibe (funcion, args) y devuelve
+    ("ok", resultado) o ("error", excepcion).
+    """
+    while True:
+        try:
+            funcion, args = conexion.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            respuesta = ("ok", funcion(*args))
+        except Exception as e:
+            respuesta = ("error", e)
+        try:
+            conexion.send(respuesta)
+        except Exception as e:
+            # El resultado o la excepción no se pudieron serializar
+            conexion.send(("error", RuntimeError(repr(e))))
+
+
+class _Trabajador:
+    def __init__(self, contexto):
+        self.conexion, extremo = contexto.Pipe()
+        self.proceso = contexto.Process(target=_bucle_trabajador, args=(extremo,), daemon=True)
+        self.proceso.start()
+        extremo.close()
+
+    def terminar(self):
+        self.proceso.kill()
+        self.proceso.join(timeout=1)
+        self.conexion.close()
+
+
+class PoolAislado:
+    """
+    Grupo de procesos auxiliares con tiempo límite y cancelación por llamada.
+    """
+
+    def __init__(self, tamano=TAMANO_POOL):
+        # "spawn" evita copiar con fork el estado (hilos, sockets) del servidor
+        self._contexto = multiprocessing.get_context("spawn")
+        self._libres = queue.Queue()
+        for _ in range(tamano):
+            self._libres.put(_Trabajador(self._contexto))
+
+    def ejecutar(self, funcion, *args, limite_segundos=LIMITE_SEGUNDOS):
+        """
+        Ejecuta funcion(*args) en un proceso auxiliar. La espera por un proceso
+        libre también cuenta dentro del tiempo límite.
+        """
+        fin = time.monotonic() + limite_segundos
+        try:
+            trabajador = self._libres.get(timeout=limite_segundos)
+        except queue.Empty:
+            raise TiempoAgotado("No hay procesos de cálculo libres") from None
+
+        agotado = False
+        try:
+            trabajador.conexion.send((funcion, args))
+            if trabajador.conexion.poll(max(fin - time.monotonic(), 0)):
+                estado, valor = trabajador.conexion.recv()
+            else:
+                agotado = True
+        except (EOFError, OSError):
+            estado, valor = "error", RuntimeError("El proceso de cálculo terminó inesperadamente")
+        if agotado or (estado == "error" and not trabajador.proceso.is_alive()):
+            # Se cancela el cálculo matando el proceso y se deja uno nuevo en su lugar
+            trabajador.terminar()
+            trabajador = _Trabajador(self._contexto)
+        self._libres.put(trabajador)
+
+        if agotado:
+            raise TiempoAgotado(f"El cálculo superó {limite_segundos:g} s")
+
+        if estado == "error":
+            raise valor
+        return valor
+
+
+_pool = None
+_candado_pool = threading.Lock()
+
+
+def obtener_pool():
+    """
+    Pool compartido por todas las sesiones; se crea la primera vez que se usa.
+    """
+    global _pool
+    with _candado_pool:
+        if _pool is None:
+            _pool = PoolAislado()
+        return _pool
+
+
+def ejecutar_aislado(funcion, *args, limite_segundos=LIMITE_SEGUNDOS):
+    """
+    Atajo para ejecutar `funcion` (definida a nivel de módulo) en el pool compartido.
+    """
+    return obtener_pool().ejecutar(funcion, *args, limite_segundos=limite_segundos)
+
+
+def _limite(expr, variable, punto, direccion):
+    try:
+        return sp.limit(expr, variable, punto, direccion)
+    except ValueError:
+        # SymPy lanza ValueError si los límites laterales no coinciden
+        if direccion != "+-":
+            raise
+        izquierda = sp.limit(expr, variable, punto, "-")
+        derecha = sp.limit(expr, variable, punto, "+")
+        if izquierda == derecha:
+            raise
+        raise LimiteNoExiste(izquierda, derecha) from None
+
+
+def _puntos_criticos(expr, variable):
+    return sp.solveset(sp.diff(expr, variable), variable, domain=sp.S.Reals)
+
+
+def limite_aislado(expr, variable, punto, direccion="+-", limite_segundos=LIMITE_SEGUNDOS):
+    """
+    sympy.limit con tiempo límite. Lanza TiempoAgotado si no termina a tiempo,
+    y LimiteNoExiste si los límites laterales son distintos.
+    """
+    return ejecutar_aislado(_limite, expr, variable, punto, direccion,
+                            limite_segundos=limite_segundos)
+
+
+def puntos_criticos_aislados(expr, variable, limite_segundos=LIMITE_SEGUNDOS):
+    """
+    Soluciones reales de f'(x) = 0 (solveset) con tiempo límite.
+    Lanza TiempoAgotado si no termina a tiempo.
+    """
+    return ejecutar_aislado(_puntos_criticos, expr, variable,
+                            limite_segundos=limite_segundos)
@@ -0,0 +1,255 @@
+"""
+Armónicos esféricos con NumPy, sin scipy.special.
+
+Y_l^m(θ, φ) = P̄_l^m(cos θ) e^{imφ}, donde P̄_l^m son las funciones asociadas
+de Legendre normalizadas (de modo que los Y_l^m son ortonormales sobre la
+esfera, con la fase de Condon-Shortley, como en scipy.special.sph_harm_y).
+
+Las P̄_l^m se calculan con las recurrencias de las funciones ya normalizadas,
+que no pasan por los factoriales de la normalización y son estables al menos
+hasta l ≈ 1000 (a partir de ahí sen(θ)^m deja de caber en un float cerca de
+los polos):
+    P̄_0^0 = 1 / sqrt(4π)
+    P̄_m^m = -sqrt((2m + 1) / 2m) sen(θ) P̄_{m-1}^{m-1}
+    P̄_{m+1}^m = sqrt(2m + 3) cos(θ) P̄_m^m
+    P̄_l^m = a_lm (cos(θ) P̄_{l-1}^m - P̄_{l-2}^m / a_{l-1,m}),
+        a_lm = sqrt((4l² - 1) / (l² - m²))
+Una sola pasada sobre l = 0, 1, ..., L calcula a la vez todos los órdenes m
+(cada paso es una operación vectorizada sobre m y sobre la malla de θ), y
+puede guardar todos los grados intermedios.
+
+Las mallas de θ y las tablas de cos(mφ) y sen(mφ) se calculan una vez por
+resolución y se reutilizan (son de solo lectura), igual que las tablas de
+Legendre de cada grado.
+
+Para las superposiciones Σ c_lm Y_lm, base() guarda en una matriz
+(puntos de la malla) × (l, m) los valores de todos los Y_lm hasta un grado
+dado, una vez por resolución; cada superposición es entonces un producto de
+esa matriz por el vector de coeficientes. Si la variable de entorno
+ARMONICOS_BASES indica un directorio, las bases se guardan ahí como .npy y se
+abren como memoria mapeada: los procesos del servidor comparten las mismas
+páginas y no las vuelven a calcular al reiniciar.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Directorio para las bases en disco ("" las deja solo en memoria)
+RUTA_BASES = os.environ.get("ARMONICOS_BASES", "")
+# Subir este número al cambiar el contenido o el formato de las bases
+VERSION_BASES = 1
+# Grado mínimo de las bases: todas las superposiciones de grado bajo
+# comparten la misma
+GRADO_BASE = 4
+
+
+def legendre_normalizadas(L, cos_theta, sin_theta, todos=False):
+    """
+    P̄_l^m(cos θ) para los valores dados de cos θ y sen θ (arreglos 1-D).
+    Devuelve un arreglo (L + 1, n) con los órdenes m = 0..L del grado L o,
+    con todos=True, uno (L + 1, L + 1, n) con [l, m] para todos los grados
+    hasta L (cero donde m > l).
+    """
+    cos_theta = np.asarray(cos_theta, dtype=float)
+    sin_theta = np.asarray(sin_theta, dtype=float)
+    n = cos_theta.size
+    # Filas m = 0..L de los grados k - 2, k - 1 y k; los arreglos se reutilizan
+    # en rotación (las filas m > k de cada uno siempre quedan en cero)
+    anterior = np.zeros((L + 1, n))
+    actual = np.zeros((L + 1, n))
+    nuevo = np.zeros((L + 1, n))
+    actual[0] = 1.0 / np.sqrt(4.0 * np.pi)
+    tabla = np.zeros((L + 1, L + 1, n)) if todos else None
+    if todos:
+        tabla[0, 0] = actual[0]
+
+    for k in range(1, L + 1):
+        # m = 0..k-2: recurrencia de tres términos en el grado
+        m = np.arange(k - 1, dtype=float)[:, None]
+        a = np.sqrt((4.0 * k * k - 1.0) / (k * k - m * m))
+        b = np.sqrt(((k - 1.0) ** 2 - m * m) / (4.0 * (k - 1.0) ** 2 - 1.0))
+        np.multiply(cos_theta, actual[:k - 1], out=nuevo[:k - 1])
+        nuevo[:k - 1] -= b * anterior[:k - 1]
+        nuevo[:k - 1] *= a
+        # m = k - 1 y m = k: a partir de la diagonal P̄_{k-1}^{k-1}
+        np.multiply(np.sqrt(2.0 * k + 1.0) * cos_theta, actual[k - 1], out=nuevo[k - 1])
+        np.multiply(-np.sqrt((2.0 * k + 1.0) / (2.0 * k)) * sin_theta, actual[k - 1], out=nuevo[k])
+        anterior, actual, nuevo = actual, nuevo, anterior
+        if todos:
+            tabla[k, :k + 1] = actual[:k + 1]
+
+    return tabla if todos else actual
+
+
+def _solo_lectura(*arreglos):
+    for arreglo in arreglos:
+        arreglo.flags.writeable = False
+    return arreglos if len(arreglos) > 1 else arreglos[0]
+
+
+@lru_cache(maxsize=16)
+def malla_theta(n_theta):
+    """
+    (θ, cos θ, sen θ) en n_theta puntos de 0 a π.
+    """
+    theta = np.linspace(0.0, np.pi, n_theta)
+    # En los polos sen θ es exactamente 0 (np.sin(π) da 1.2e-16)
+    seno = np.sin(theta)
+    seno[[0, -1]] = 0.0
+    return _solo_lectura(theta, np.cos(theta), seno)
+
+
+@lru_cache(maxsize=16)
+def tabla_fases(n_phi, m_max):
+    """
+    (φ, cos(mφ), sen(mφ)) en n_phi puntos de 0 a 2π, con una fila por cada
+    m = 0..m_max.
+    """
+    phi = np.linspace(0.0, 2.0 * np.pi, n_phi)
+    angulos = np.arange(m_max + 1)[:, None] * phi
+    return _solo_lectura(phi, np.cos(angulos), np.sin(angulos))
+
+
+@lru_cache(maxsize=32)
+def ordenes_de_grado(l, n_theta):
+    """
+    P̄_l^m(cos θ) de todos los órdenes m = 0..l en la malla de θ, de forma
+    (l + 1, n_theta).
+    """
+    _, cos_theta, sin_theta = malla_theta(n_theta)
+    return _solo_lectura(legendre_normalizadas(l, cos_theta, sin_theta))
+
+
+@lru_cache(maxsize=4)
+def grados_hasta(L, n_theta):
+    """
+    P̄_l^m(cos θ) de todos los grados l = 0..L y órdenes m = 0..l en la malla
+    de θ, de forma (L + 1, L + 1, n_theta).
+    """
+    _, cos_theta, sin_theta = malla_theta(n_theta)
+    return _solo_lectura(legendre_normalizadas(L, cos_theta, sin_theta, todos=True))
+
+
+def armonico(l, m, n_theta=100, n_phi=100):
+    """
+    Y_l^m en la malla (θ, φ), de forma (n_theta, n_phi), con θ en las filas.
+    Para m < 0 se usa Y_l^{-m} = (-1)^m conj(Y_l^m).
+    """
+    if abs(m) > l:
+        raise ValueError("Se necesita |m| <= l.")
+    radial = ordenes_de_grado(l, n_theta)[abs(m)][:, None]
+    _, coseno, seno = tabla_fases(n_phi, abs(m))
+    Y = radial * (coseno[abs(m)] + 1j * seno[abs(m)])
+    if m < 0:
+        Y = (-1) ** m * np.conj(Y)
+    return Y
+
+
+def indice(l, m):
+    """
+    Columna de Y_l^m en base(): los (l, m) en orden, l² + l + m.
+    """
+    return l * l + l + m
+
+
+def _calcular_base(L, n_theta, n_phi):
+    legendre = grados_hasta(L, n_theta)
+    _, coseno, seno = tabla_fases(n_phi, L)
+    grados = np.repeat(np.arange(L + 1), 2 * np.arange(L + 1) + 1)
+    ordenes = np.concatenate([np.arange(-l, l + 1) for l in range(L + 1)])
+    absolutos = np.abs(ordenes)
+    # Y_l^{-m} = (-1)^m conj(Y_l^m): misma parte en θ (con el signo) y fase e^{-imφ}
+    signo = np.where((ordenes < 0) & (absolutos % 2 == 1), -1.0, 1.0)
+    radial = legendre[grados, absolutos] * signo[:, None]
+    fase = coseno[absolutos] + 1j * np.sign(ordenes)[:, None] * seno[absolutos]
+    base = np.empty((n_theta, n_phi, grados.size), dtype=complex)
+    np.einsum("kt,kp->tpk", radial, fase, out=base)
+    return base.reshape(n_theta * n_phi, grados.size)
+
+
+@lru_cache(maxsize=8)
+def base(L, n_theta, n_phi):
+    """
+    Matriz (n_theta · n_phi, (L + 1)²) con Y_l^m en la malla (θ, φ) en la
+    columna indice(l, m), de solo lectura. Con ARMONICOS_BASES se lee de
+    disco como memoria mapeada (y se calcula y se guarda la primera vez);
+    cualquier error del disco deja la base solo en memoria.
+    """
+    if RUTA_BASES:
+        ruta = os.path.join(RUTA_BASES, f"base_v{VERSION_BASES}_L{L}_{n_theta}x{n_phi}.npy")
+        try:
+            return np.load(ruta, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+        matriz = _calcular_base(L, n_theta, n_phi)
+        try:
+            os.makedirs(RUTA_BASES, exist_ok=True)
+            # Se escribe aparte y se renombra, para que otro proceso nunca lea
+            # un archivo a medias
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as archivo:
+                np.save(archivo, matriz)
+            os.replace(temporal, ruta)
+            return np.load(ruta, mmap_mode="r")
+        except (OSError, ValueError):
+            return _solo_lectura(matriz)
+    return _solo_lectura(_calcular_base(L, n_theta, n_phi))
+
+
+def grado_de_base(coeficientes):
+    """
+    Grado de la base que sirve para estos coeficientes.
+    """
+    return max([GRADO_BASE] + [l for l, _ in coeficientes])
+
+
+def superposicion(coeficientes, n_theta=100, n_phi=100):
+    """
+    Σ c_lm Y_l^m en la malla (θ, φ), de forma (n_theta, n_phi).
+    - coeficientes : diccionario {(l, m): c}, con c real o complejo
+    """
+    L = grado_de_base(coeficientes)
+    vector = np.zeros((L + 1) ** 2, dtype=complex)
+    for (l, m), c in coeficientes.items():
+        if abs(m) > l:
+            raise ValueError("Se necesita |m| <= l.")
+        vector[indice(l, m)] += c
+    return (base(L, n_theta, n_phi) @ vector).reshape(n_theta, n_phi)
+
+
+def real(l, m):
+    """
+    Coeficientes del armónico real S_l^m (proporcional a cos(mφ) para m > 0
+    y a sen(|m|φ) para m < 0), como {(l, m): c}.
+    """
+    if m == 0:
+        return {(l, 0): 1.0}
+    k = abs(m)
+    if m > 0:
+        return {(l, -k): 1 / np.sqrt(2), (l, k): (-1) ** k / np.sqrt(2)}
+    return {(l, -k): 1j / np.sqrt(2), (l, k): -1j * (-1) ** k / np.sqrt(2)}
+
+
+def _suma(*partes):
+    total = {}
+    for peso, coeficientes in partes:
+        for clave, c in coeficientes.items():
+            total[clave] = total.get(clave, 0) + peso * c
+    return total
+
+
+# Orbitales reales (la parte angular) como superposiciones de Y_l^m
+ORBITALES = {
+    "s": real(0, 0),
+    "p_x": real(1, 1),
+    "p_y": real(1, -1),
+    "p_z": real(1, 0),
+    "d_xy": real(2, -2),
+    "d_xz": real(2, 1),
+    "d_yz": real(2, -1),
+    "d_x²-y²": real(2, 2),
+    "d_z²": real(2, 0),
+    "sp (híbrido)": _suma((1 / np.sqrt(2), real(0, 0)), (1 / np.sqrt(2), real(1, 0))),
+    "sp³ (híbrido)": _suma((0.5, real(0, 0)), (0.5, real(1, 1)), (0.5, real(1, -1)), (0.5, real(1, 0))),
+}
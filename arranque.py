@@ -0,0 +1,177 @@
+"""
+Medición del arranque en frío de las apps.
+
+Cada app se ejecuta una vez en un proceso nuevo de Python, con
+streamlit.testing (sin servidor ni navegador) y con -X importtime, y se
+informa:
+- el tiempo total desde que arranca el proceso hasta que termina la primera
+  ejecución del script (lo que espera el primer visitante de un servidor
+  recién iniciado)
+- cuánto de eso es la ejecución del script y cuánto sus importaciones
+- con --modulos N, los N módulos que más tardó en importar la app
+
+El total se compara con el presupuesto de la app (PRESUPUESTOS, o
+PRESUPUESTO_POR_DEFECTO). El programa sale con código 1 si alguna app se
+pasa de su presupuesto o falla, así que se puede usar en integración
+continua; con --json se agrega una línea con los resultados a un archivo,
+para seguir su evolución.
+
+Uso:
+    python arranque.py                       # todas las apps
+    python arranque.py deri-app.py --modulos 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+APPS = (
+    "asintotas.py",
+    "aves-app.py",
+    "campo_dipolo_app.py",
+    "cuerpo_negro_app.py",
+    "deri-app.py",
+    "deri-tabla.py",
+    "esfericos-app.py",
+    "limite-app.py",
+    "opti-app.py",
+    "pendiente.py",
+    "pizza-app.py",
+    "pizza_metrico_app.py",
+    "principal.py",
+    "racio-app.py",
+    "snell-app.py",
+    "tiro_parabolico.py",
+)
+
+# Segundos desde que arranca el proceso hasta que termina la primera ejecución
+PRESUPUESTO_POR_DEFECTO = 3.0
+PRESUPUESTOS = {
+    # Importan SymPy y analizan y derivan la expresión antes de la primera gráfica
+    "deri-app.py": 3.5,
+    "deri-tabla.py": 3.5,
+    "limite-app.py": 3.5,
+    "opti-app.py": 3.5,
+    "racio-app.py": 3.5,
+}
+
+_MARCA = "--- primera ejecución ---"
+
+# Se ejecuta en el proceso nuevo: primero se ejecuta una app vacía para que
+# las importaciones propias de Streamlit no se cuenten como de la app
+_MEDIR = f"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st").run()
+print({_MARCA!r}, file=sys.stderr, flush=True)
+inicio = time.perf_counter()
+prueba = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+fin = time.perf_counter()
+print(json.dumps({{
+    "fin": time.time(),
+    "ejecucion": fin - inicio,
+    "excepciones": [str(e.value) for e in prueba.exception],
+}}))
+"""
+
+
+def _importaciones(texto):
+    """
+    [(modulo, segundos)] de las importaciones de primer nivel que aparecen en
+    la salida de -X importtime después de la marca (el tiempo acumulado
+    incluye el de los módulos que cada una importó).
+    """
+    resultado = []
+    despues = False
+    for linea in texto.splitlines():
+        if linea.strip() == _MARCA:
+            despues = True
+            continue
+        if not despues or not linea.startswith("import time:"):
+            continue
+        partes = linea[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nombre = partes[2][1:]
+        if not nombre.startswith(" "):
+            resultado.append((nombre.strip(), int(partes[1]) / 1e6))
+    return resultado
+
+
+def medir(app, limite_segundos=120.0):
+    """
+    Arranca un proceso nuevo, ejecuta la app una vez y devuelve un
+    diccionario con los tiempos, las importaciones y los errores.
+    """
+    entorno = dict(os.environ, MPLBACKEND="Agg")
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [DIRECTORIO, entorno.get("PYTHONPATH")]))
+    ruta = os.path.join(DIRECTORIO, app)
+    inicio = time.time()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _MEDIR, ruta, str(limite_segundos)],
+        cwd=DIRECTORIO, env=entorno, capture_output=True, text=True, timeout=limite_segundos + 60,
+    )
+    importaciones = _importaciones(proceso.stderr)
+    try:
+        datos = json.loads(proceso.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {"app": app, "error": proceso.stderr.strip().splitlines()[-1:] or ["sin salida"]}
+    return {
+        "app": app,
+        "total": datos["fin"] - inicio,
+        "ejecucion": datos["ejecucion"],
+        "importaciones": sum(segundos for _, segundos in importaciones),
+        "modulos": sorted(importaciones, key=lambda par: -par[1]),
+        "error": datos["excepciones"] or None,
+    }
+
+
+def presupuesto(app):
+    return PRESUPUESTOS.get(app, PRESUPUESTO_POR_DEFECTO)
+
+
+def informe(resultados, modulos=0):
+    """
+    Tabla de texto con los resultados de medir().
+    """
+    lineas = [f"{'app':<24}{'total':>8}{'script':>8}{'import.':>9}{'presup.':>9}  estado"]
+    for r in resultados:
+        if "total" not in r:
+            lineas.append(f"{r['app']:<24}{'':>34}  error: {r['error'][0]}")
+            continue
+        estado = "ok" if r["total"] <= presupuesto(r["app"]) else "EXCEDIDO"
+        if r["error"]:
+            estado = f"error: {r['error'][0]}"
+        lineas.append(f"{r['app']:<24}{r['total']:>7.2f}s{r['ejecucion']:>7.2f}s{r['importaciones']:>8.2f}s"
+                      f"{presupuesto(r['app']):>8.1f}s  {estado}")
+        for nombre, segundos in r["modulos"][:modulos]:
+            lineas.append(f"    {nombre:<40}{segundos * 1e3:>8.0f} ms")
+    return "\n".join(lineas)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de las apps.")
+    parser.add_argument("apps", nargs="*", help="apps a medir (por defecto, todas)")
+    parser.add_argument("--modulos", type=int, default=0,
+                        help="mostrar los N módulos que más tarda en importar cada app")
+    parser.add_argument("--json", help="archivo al que se agrega una línea JSON con los resultados")
+    args = parser.parse_args(argumentos)
+
+    resultados = [medir(app) for app in (args.apps or APPS)]
+    print(informe(resultados, args.modulos))
+
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as archivo:
+            archivo.write(json.dumps({"fecha": time.time(), "resultados": resultados}, ensure_ascii=False) + "\n")
+
+    fallidas = [r for r in resultados
+                if r.get("error") or r.get("total", float("inf")) > presupuesto(r["app"])]
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
+from muestreo import muestrear_adaptativo
 
 # Título de la aplicación
 st.title("Visualización de Asíntotas de Funciones Racionales")
@@ -55,10 +56,10 @@ else:
 
 # Visualización interactiva
 st.subheader("Gráfica de la función")
-x = np.linspace(-10, 10, 1000)
-y = rational_function(x)
+x, y = muestrear_adaptativo(rational_function, -10, 10, singularidades=vertical_asymptotes)
 
-fig, ax = plt.subplots()
+fig = crear_figura()
+ax = fig.subplots()
 ax.plot(x, y, label="Función Racional")
 
 # Añadir asíntotas verticales
@@ -83,7 +84,7 @@ ax.set_title("Función Racional y sus Asíntotas")
 ax.set_xlabel("x")
 ax.set_ylabel("f(x)")
 
-st.pyplot(fig)
+mostrar(fig)
 
 # Mostrar asíntotas calculadas
 st.subheader("Información de las Asíntotas")
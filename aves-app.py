@@ -1,6 +1,8 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar_figura
+from muestreo import diezmar
+from graficas import mostrar_grafica, usar_graficas_vectoriales
 
 # ----------------------------------------------------
 # Funciones del modelo
@@ -54,6 +56,7 @@ st.set_page_config(
     page_title="Aves y Aviones: Energía Mínima",
     layout="centered",
 )
+vector = usar_graficas_vectoriales()
 
 st.title("Aves y Aviones: Energía Mínima")
 st.write(
@@ -106,33 +109,55 @@ with col_v2:
 with col_v3:
     n_points = st.number_input("N° de puntos", value=200, min_value=10, step=10)
 
-# Generar arreglo de velocidades
-v_vals = np.linspace(v_min, v_max, n_points)
-
-P_vals = potencia(v_vals, A, B, L)
-E_vals = energia_por_distancia(v_vals, A, B, L)
-
-fig, ax = plt.subplots(1, 2, figsize=(12,5))
-
-# Gráfica P(v)
-ax[0].plot(v_vals, P_vals, label="P(v)")
-ax[0].axvline(v_min_P, color="r", linestyle="--", label="v_min_P")
-ax[0].set_xlabel("Velocidad v")
-ax[0].set_ylabel("Potencia P(v)")
-ax[0].set_title("Potencia vs Velocidad")
-ax[0].legend()
-ax[0].grid(True)
-
-# Gráfica E(v)
-ax[1].plot(v_vals, E_vals, label="E(v)", color="purple")
-ax[1].axvline(v_min_E, color="r", linestyle="--", label="v_min_E")
-ax[1].set_xlabel("Velocidad v")
-ax[1].set_ylabel("Energía por distancia E(v)")
-ax[1].set_title("Energía por distancia vs Velocidad")
-ax[1].legend()
-ax[1].grid(True)
-
-st.pyplot(fig)
+def grafica_potencia_energia(A, B, L, v_min, v_max, n_points):
+    """
+    Figura con P(v) y E(v). Solo se dibuja si no está en la caché de figuras.
+    """
+    # Generar arreglo de velocidades
+    v_vals = np.linspace(v_min, v_max, n_points)
+
+    P_vals = potencia(v_vals, A, B, L)
+    E_vals = energia_por_distancia(v_vals, A, B, L)
+    # Con muchos puntos se dibujan solo el mínimo y el máximo de cada píxel
+    v_vals, (P_vals, E_vals) = diezmar(v_vals, [P_vals, E_vals])
+
+    fig = crear_figura(figsize=(12,5))
+    ax = fig.subplots(1, 2)
+
+    # Gráfica P(v)
+    ax[0].plot(v_vals, P_vals, label="P(v)")
+    ax[0].axvline(velocidad_minima_potencia(A, B, L), color="r", linestyle="--", label="v_min_P")
+    ax[0].set_xlabel("Velocidad v")
+    ax[0].set_ylabel("Potencia P(v)")
+    ax[0].set_title("Potencia vs Velocidad")
+    ax[0].legend()
+    ax[0].grid(True)
+
+    # Gráfica E(v)
+    ax[1].plot(v_vals, E_vals, label="E(v)", color="purple")
+    ax[1].axvline(velocidad_minima_energia(A, B, L), color="r", linestyle="--", label="v_min_E")
+    ax[1].set_xlabel("Velocidad v")
+    ax[1].set_ylabel("Energía por distancia E(v)")
+    ax[1].set_title("Energía por distancia vs Velocidad")
+    ax[1].legend()
+    ax[1].grid(True)
+    return fig
+
+if vector:
+    # Las dos gráficas se dibujan en el navegador, una junto a la otra
+    v_vals = np.linspace(v_min, v_max, n_points)
+    col_P, col_E = st.columns(2)
+    with col_P:
+        mostrar_grafica([{"nombre": "P(v)", "x": v_vals, "y": potencia(v_vals, A, B, L)}],
+                        titulo="Potencia vs Velocidad", eje_x="Velocidad v", eje_y="Potencia P(v)",
+                        verticales=[(v_min_P, "v_min_P")], alto=350)
+    with col_E:
+        mostrar_grafica([{"nombre": "E(v)", "x": v_vals, "y": energia_por_distancia(v_vals, A, B, L)}],
+                        titulo="Energía por distancia vs Velocidad", eje_x="Velocidad v",
+                        eje_y="Energía por distancia E(v)", verticales=[(v_min_E, "v_min_E")], alto=350)
+else:
+    mostrar_figura("aves_potencia_energia", (A, B, L, v_min, v_max, n_points),
+                   lambda: grafica_potencia_energia(A, B, L, v_min, v_max, n_points))
 
 # ----------------------------------------------------
 # Sección 3: Aleteo-planeo
@@ -175,21 +200,40 @@ else:
 # Graficar P_promedio vs x para ilustrar
 st.subheader("Gráfica de P_prom vs x")
 
-x_range = np.linspace(0.01, 0.99, 200)  # fracción de tiempo 0 < x < 1
-P_prom_vals = [potencia_promedio(xx, v_ave, Ab, Aw, B, m_val, g_val) for xx in x_range]
-
-fig2, ax2 = plt.subplots(figsize=(6,4))
-ax2.plot(x_range, P_prom_vals, label="P_prom(x)")
-if x_opt is not None and 0 < x_opt < 1:
-    P_opt = potencia_promedio(x_opt, v_ave, Ab, Aw, B, m_val, g_val)
-    ax2.plot(x_opt, P_opt, 'ro', label="x óptimo")
-ax2.set_xlabel("Fracción de tiempo aleteando (x)")
-ax2.set_ylabel("Potencia promedio")
-ax2.set_title("Potencia promedio vs fracción de aleteo")
-ax2.legend()
-ax2.grid(True)
-
-st.pyplot(fig2)
+def grafica_potencia_promedio(v_ave, Ab, Aw, B, m_val, g_val):
+    """
+    Figura de P_prom(x). Solo se dibuja si no está en la caché de figuras.
+    """
+    x_range = np.linspace(0.01, 0.99, 200)  # fracción de tiempo 0 < x < 1
+    P_prom_vals = [potencia_promedio(xx, v_ave, Ab, Aw, B, m_val, g_val) for xx in x_range]
+
+    fig2 = crear_figura(figsize=(6,4))
+    ax2 = fig2.subplots()
+    ax2.plot(x_range, P_prom_vals, label="P_prom(x)")
+    x_opt = x_optimo(Ab, Aw, B, v_ave, m_val, g_val)
+    if x_opt is not None and 0 < x_opt < 1:
+        P_opt = potencia_promedio(x_opt, v_ave, Ab, Aw, B, m_val, g_val)
+        ax2.plot(x_opt, P_opt, 'ro', label="x óptimo")
+    ax2.set_xlabel("Fracción de tiempo aleteando (x)")
+    ax2.set_ylabel("Potencia promedio")
+    ax2.set_title("Potencia promedio vs fracción de aleteo")
+    ax2.legend()
+    ax2.grid(True)
+    return fig2
+
+if vector:
+    x_range = np.linspace(0.01, 0.99, 200)
+    puntos = []
+    if x_opt is not None and 0 < x_opt < 1:
+        puntos.append((x_opt, potencia_promedio(x_opt, v_ave, Ab, Aw, B, m_val, g_val), "x óptimo"))
+    mostrar_grafica([{"nombre": "P_prom(x)", "x": x_range,
+                      "y": potencia_promedio(x_range, v_ave, Ab, Aw, B, m_val, g_val)}],
+                    titulo="Potencia promedio vs fracción de aleteo",
+                    eje_x="Fracción de tiempo aleteando (x)", eje_y="Potencia promedio",
+                    puntos=puntos, alto=300)
+else:
+    mostrar_figura("aves_potencia_promedio", (v_ave, Ab, Aw, B, m_val, g_val),
+                   lambda: grafica_potencia_promedio(v_ave, Ab, Aw, B, m_val, g_val))
 
 st.markdown(
     "**Interpretación:** el punto rojo (si está en el rango 0 < x < 1) "
@@ -1,73 +1,156 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar_figura
 
 # Título y descripción de la app
 st.title("Campo Eléctrico de un Dipolo")
 st.markdown(
     """
     Esta aplicación muestra el campo eléctrico de un dipolo formado por dos cargas
-    \(+q\) y \(-q\) separadas una distancia \(d\) en el eje \(x\). Usa los controles de la barra lateral para modificar los parámetros.
+    \(+q\) y \(-q\) separadas una distancia \(d\) en el eje \(x\), o el de cualquier
+    otra configuración de cargas puntuales. Usa los controles de la barra lateral para modificar los parámetros;
+    en la configuración personalizada, las posiciones y los valores de las cargas se editan en una tabla.
     """
 )
 
 # Parámetros interactivos en la barra lateral
+configuration = st.sidebar.selectbox("Configuración", ["Dipolo", "Cuadrupolo", "Anillo de cargas", "Personalizada"])
 q = st.sidebar.number_input("Magnitud de la carga (q)", value=1.0, step=0.1)
 d = st.sidebar.number_input("Separación (d)", value=1.0, step=0.1)
+ring_count = st.sidebar.slider("Cargas en el anillo", min_value=2, max_value=200, value=12) \
+    if configuration == "Anillo de cargas" else 0
 grid_size = st.sidebar.slider("Resolución de la cuadrícula", min_value=50, max_value=500, value=100)
 extent = st.sidebar.slider("Extensión del dominio (en cada dirección)", min_value=3, max_value=10, value=5)
 
-# Posiciones de las cargas: la carga positiva se ubica a la derecha y la negativa a la izquierda
-pos_positive = np.array([ d/2, 0])
-pos_negative = np.array([-d/2, 0])
-
 # Constante de Coulomb (para visualización usamos k = 1)
 k = 1
+# Distancia mínima a una carga, para evitar la singularidad
+MIN_DISTANCE = 0.1
+# Valores de cada arreglo temporal del cálculo por bloques (1 MiB)
+TILE_ELEMENTS = 2**17
+
+def preset_charges(configuration, q, d, ring_count):
+    """
+    Cargas (x, y, q) de una configuración predefinida; la personalizada
+    empieza desde el dipolo.
+    """
+    if configuration == "Cuadrupolo":
+        return [(d/2, d/2, q), (-d/2, d/2, -q), (-d/2, -d/2, q), (d/2, -d/2, -q)]
+    if configuration == "Anillo de cargas":
+        # Anillo de diámetro d con cargas iguales que suman q
+        angles = 2 * np.pi * np.arange(ring_count) / ring_count
+        return [(d/2 * np.cos(a), d/2 * np.sin(a), q / ring_count) for a in angles]
+    # La carga positiva se ubica a la derecha y la negativa a la izquierda
+    return [(d/2, 0.0, q), (-d/2, 0.0, -q)]
 
-# Crear la malla de puntos
-x = np.linspace(-extent, extent, grid_size)
-y = np.linspace(-extent, extent, grid_size)
-X, Y = np.meshgrid(x, y)
+charges = np.array(preset_charges(configuration, q, d, ring_count), dtype=float)
+if configuration == "Personalizada":
+    # La tabla (y pandas, que Streamlit usa para mostrarla) solo se carga en
+    # esta configuración; con otros q o d se empieza de nuevo
+    st.sidebar.write("Cargas (se pueden editar, agregar y quitar filas):")
+    edited = st.sidebar.data_editor([{"x": cx, "y": cy, "q": cq} for cx, cy, cq in charges.tolist()],
+                                    num_rows="dynamic", hide_index=True, key=f"charges_{q}_{d}")
+    charges = np.array([(row["x"], row["y"], row["q"]) for row in edited
+                        if all(row.get(c) is not None and np.isfinite(row[c]) for c in "xyq")],
+                       dtype=float).reshape(-1, 3)
+charges = charges[charges[:, 2] != 0]
 
-def electric_field(q, pos_charge, X, Y):
+def electric_field(charges, x, y, tile_elements=TILE_ELEMENTS):
     """
-    Calcula el campo eléctrico (Ex, Ey) generado por una carga q ubicada en pos_charge.
-    Se añade una pequeña corrección para evitar divisiones por cero.
+    Calcula el campo eléctrico (Ex, Ey) de varias cargas puntuales en la malla
+    x × y (Ex[i, j] es el campo en (x[j], y[i]), como con np.meshgrid(x, y)).
+    - charges : arreglo (N, 3) con la posición (x, y) y la carga q de cada una
+
+    Las cargas y las filas de la malla se recorren por bloques: los arreglos
+    temporales (uno por carga, fila y columna del bloque) nunca pasan de
+    tile_elements valores, sin importar cuántas cargas haya ni el tamaño de
+    la malla, y el campo de cada bloque se suma en su lugar a Ex y Ey. Cerca
+    de una carga la distancia se limita a MIN_DISTANCE.
     """
-    # Vectores de posición desde la carga hasta cada punto (x, y)
-    Rx = X - pos_charge[0]
-    Ry = Y - pos_charge[1]
-    # Distancia con un pequeño offset para evitar singularidades
-    R = np.sqrt(Rx**2 + Ry**2)
-    # Evitar división por cero: se reemplazan los valores muy pequeños por un mínimo
-    R = np.where(R < 0.1, 0.1, R)
-    Ex = k * q * Rx / (R**3)
-    Ey = k * q * Ry / (R**3)
+    nx, ny = len(x), len(y)
+    Ex = np.zeros((ny, nx))
+    Ey = np.zeros((ny, nx))
+    if len(charges) == 0:
+        return Ex, Ey
+    charge_block = max(1, min(len(charges), tile_elements // nx))
+    row_block = max(1, min(ny, tile_elements // (charge_block * nx)))
+
+    # Temporales y acumuladores del bloque, creados una sola vez (los bloques
+    # del final usan una parte)
+    weight = np.empty((charge_block, row_block, nx))
+    distance = np.empty_like(weight)
+    block_x = np.empty((row_block, nx))
+    block_y = np.empty((row_block, nx))
+
+    for c0 in range(0, len(charges), charge_block):
+        cx, cy, cq = charges[c0:c0 + charge_block].T
+        nc = len(cq)
+        # La malla es regular: la componente x del vector de la carga al punto
+        # solo depende de la columna, y la componente y solo de la fila
+        Rx = x[None, :] - cx[:, None]
+        Rx2 = Rx**2
+        for r0 in range(0, ny, row_block):
+            r1 = min(r0 + row_block, ny)
+            Ry = y[None, r0:r1] - cy[:, None]
+            w = weight[:nc, :r1 - r0]
+            R = distance[:nc, :r1 - r0]
+            # w = k q / R^3, con R >= MIN_DISTANCE
+            np.add(Rx2[:, None, :], (Ry**2)[:, :, None], out=w)
+            np.maximum(w, MIN_DISTANCE**2, out=w)
+            np.sqrt(w, out=R)
+            w *= R
+            np.divide((k * cq)[:, None, None], w, out=w)
+            # Suma sobre las cargas del bloque de w Rx y w Ry
+            np.einsum("crx,cx->rx", w, Rx, out=block_x[:r1 - r0])
+            np.einsum("crx,cr->rx", w, Ry, out=block_y[:r1 - r0])
+            Ex[r0:r1] += block_x[:r1 - r0]
+            Ey[r0:r1] += block_y[:r1 - r0]
     return Ex, Ey
 
-# Calcular el campo eléctrico generado por cada carga
-Ex_pos, Ey_pos = electric_field(q, pos_positive, X, Y)
-Ex_neg, Ey_neg = electric_field(-q, pos_negative, X, Y)
+def draw_field(charges, grid_size, extent, title):
+    """
+    Calcula el campo de las cargas y dibuja sus líneas de campo. Solo se llama
+    cuando la imagen de estos parámetros no está en la caché de figuras.
+    """
+    charges = np.array(charges).reshape(-1, 3)
+
+    # Crear la malla de puntos
+    x = np.linspace(-extent, extent, grid_size)
+    y = np.linspace(-extent, extent, grid_size)
+
+    # Campo eléctrico total (suma vectorial del de todas las cargas)
+    Ex_total, Ey_total = electric_field(charges, x, y)
 
-# Campo eléctrico total (suma vectorial)
-Ex_total = Ex_pos + Ex_neg
-Ey_total = Ey_pos + Ey_neg
+    # Graficar el campo usando streamplot de Matplotlib
+    fig = crear_figura(figsize=(8, 8))
+    ax = fig.subplots()
+    # Se utiliza una escala logarítmica para el color en función de la magnitud
+    # del campo (en los puntos donde se anula se usa el menor valor positivo)
+    magnitude = np.sqrt(Ex_total**2 + Ey_total**2)
+    magnitude = np.maximum(magnitude, np.finfo(float).tiny)
+    ax.streamplot(x, y, Ex_total, Ey_total, color=np.log(magnitude), cmap='autumn', density=1.5)
 
-# Graficar el campo usando streamplot de Matplotlib
-fig, ax = plt.subplots(figsize=(8, 8))
-# Se utiliza una escala logarítmica para el color en función de la magnitud del campo
-magnitude = np.sqrt(Ex_total**2 + Ey_total**2)
-strm = ax.streamplot(X, Y, Ex_total, Ey_total, color=np.log(magnitude), cmap='autumn', density=1.5)
+    # Dibujar las posiciones de las cargas
+    positive = charges[charges[:, 2] > 0]
+    negative = charges[charges[:, 2] < 0]
+    if len(positive):
+        ax.scatter(positive[:, 0], positive[:, 1], color='blue', s=100, label=r'$q > 0$')
+    if len(negative):
+        ax.scatter(negative[:, 0], negative[:, 1], color='red', s=100, label=r'$q < 0$')
 
-# Dibujar las posiciones de las cargas
-ax.scatter([pos_positive[0]], [pos_positive[1]], color='blue', s=100, label=r'$+q$')
-ax.scatter([pos_negative[0]], [pos_negative[1]], color='red', s=100, label=r'$-q$')
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
+    ax.set_title(title)
+    if len(charges):
+        ax.legend()
+    ax.set_aspect('equal')
+    return fig
 
-ax.set_xlabel('x')
-ax.set_ylabel('y')
-ax.set_title('Campo Eléctrico de un Dipolo')
-ax.legend()
-ax.set_aspect('equal')
+if configuration == "Dipolo":
+    title = 'Campo Eléctrico de un Dipolo'
+else:
+    title = f'Campo Eléctrico de {len(charges)} cargas puntuales'
 
-# Mostrar la figura en la app de Streamlit
-st.pyplot(fig)
+# Mostrar la figura en la app de Streamlit (desde la caché si ya se dibujó con estos parámetros)
+key = (tuple(map(tuple, charges.tolist())), grid_size, extent, title)
+mostrar_figura("campo_dipolo", key, lambda: draw_field(key[0], grid_size, extent, title))
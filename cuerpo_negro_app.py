@@ -1,6 +1,7 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, figura_de_sesion, mostrar, mostrar_estadisticas_memoria
+from graficas import mostrar_grafica, usar_graficas_vectoriales
 
 # Constantes físicas
 h = 6.626e-34  # Constante de Planck (Joule·s)
@@ -17,6 +18,20 @@ def planck(wavelength, temperature):
     """
     return (2 * h * c**2 / wavelength**5) / (np.exp(h * c / (wavelength * k_B * temperature)) - 1)
 
+def construir_grafica():
+    """
+    Figura del espectro para esta sesión; en las siguientes re-ejecuciones
+    solo se actualizan sus datos.
+    """
+    fig = crear_figura(figsize=(10, 6))
+    ax = fig.add_subplot()
+    linea, = ax.plot([], [])
+    ax.set_title("Espectro de radiación del cuerpo negro")
+    ax.set_xlabel("Longitud de onda (nm)")
+    ax.set_ylabel("Radiancia espectral (W·sr⁻¹·m⁻³)")
+    ax.grid(True)
+    return fig, (ax, linea)
+
 # Configuración de la aplicación
 st.title("Ley de Planck: Radiación del Cuerpo Negro")
 st.write("Explora cómo la radiación de un cuerpo negro varía con la temperatura y la longitud de onda.")
@@ -28,6 +43,7 @@ temperature = st.sidebar.slider("Temperatura del cuerpo negro (K)", min_value=10
 # Rango de longitud de onda
 wavelength_min = st.sidebar.number_input("Longitud de onda mínima (nm)", min_value=1, max_value=1000, value=100)
 wavelength_max = st.sidebar.number_input("Longitud de onda máxima (nm)", min_value=1, max_value=3000, value=2000)
+vector = usar_graficas_vectoriales()
 
 # Verifica que los valores sean válidos
 if wavelength_min >= wavelength_max:
@@ -39,18 +55,28 @@ else:
     # Cálculo de la radiancia espectral
     radiance = planck(wavelengths, temperature)
 
-    # Gráfica de la radiancia espectral
-    plt.figure(figsize=(10, 6))
-    plt.plot(wavelengths * 1e9, radiance, label=f"T = {temperature} K")
-    plt.title("Espectro de radiación del cuerpo negro")
-    plt.xlabel("Longitud de onda (nm)")
-    plt.ylabel("Radiancia espectral (W·sr⁻¹·m⁻³)")
-    plt.grid(True)
-    plt.legend()
-    st.pyplot(plt)
-
     # Máximo de emisión según la ley de Wien
     wavelength_peak = 2.898e-3 / temperature  # Máxima emisión en metros
+
+    # Gráfica de la radiancia espectral
+    if vector:
+        pico = wavelength_peak * 1e9
+        mostrar_grafica(
+            [{"nombre": f"T = {temperature} K", "x": wavelengths * 1e9, "y": radiance}],
+            titulo="Espectro de radiación del cuerpo negro",
+            eje_x="Longitud de onda (nm)",
+            eje_y="Radiancia espectral (W·sr⁻¹·m⁻³)",
+            verticales=[(pico, "Pico (ley de Wien)")] if wavelength_min <= pico <= wavelength_max else [],
+        )
+    else:
+        fig, (ax, linea) = figura_de_sesion("cuerpo_negro", construir_grafica)
+        linea.set_data(wavelengths * 1e9, radiance)
+        linea.set_label(f"T = {temperature} K")
+        ax.relim()
+        ax.autoscale_view()
+        ax.legend()
+        mostrar(fig)
+
     st.write(f"El pico de emisión ocurre en aproximadamente {wavelength_peak * 1e9:.2f} nm (Ley de Wien).")
 
     # Explicación de la física detrás
@@ -80,3 +106,5 @@ else:
         "Esta fórmula permite entender cómo objetos más calientes emiten radiación con picos a longitudes de onda más cortas, "
         "como la luz visible o ultravioleta."
     )
+
+mostrar_estadisticas_memoria()
@@ -1,33 +1,48 @@
 import streamlit as st
-import sympy as sp
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
+from simbolico import compilar
+from muestreo import limites_y, muestrear_adaptativo
+from graficas import mostrar_grafica, usar_graficas_vectoriales
 
 st.title("Aprende derivadas de funciones algebraicas")
 
 # Entrada de la función
 func_str = st.text_input("Ingresa una función algebraica en términos de x", "x**2 + 3*x")
-x = sp.symbols('x')
-func = sp.sympify(func_str)
+compiled = compilar(func_str)
+func = compiled.expr
 
 # Cálculo de la derivada
-derivative = sp.diff(func, x)
+derivative = compiled.derivada(1)
 st.write(f"Derivada: {derivative}")
 
-# Gráficos
-func_lambdified = sp.lambdify(x, func, "numpy")
-derivative_lambdified = sp.lambdify(x, derivative, "numpy")
-x_vals = np.linspace(-10, 10, 500)
-y_vals = func_lambdified(x_vals)
-dy_vals = derivative_lambdified(x_vals)
+# Gráficos (f y f' se evalúan juntas, compartiendo subexpresiones, y se
+# muestrean con más detalle donde la curva cambia y cortando en los polos)
+polos = compiled.polos()
+x_vals, (y_vals, dy_vals) = muestrear_adaptativo(
+    compiled.nucleo((0, 1)), -10, 10, singularidades=polos
+)
 
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.plot(x_vals, y_vals, label=f"f(x) = {func}")
-ax.plot(x_vals, dy_vals, label=f"f'(x) = {derivative}", linestyle="--")
-ax.axhline(0, color="black", linewidth=0.8)
-ax.set_title("Función y su derivada")
-ax.set_xlabel("x")
-ax.set_ylabel("y")
-ax.legend()
-ax.grid()
-st.pyplot(fig)
+if usar_graficas_vectoriales():
+    # El navegador dibuja la gráfica a partir de las series y las asíntotas
+    mostrar_grafica(
+        [{"nombre": f"f(x) = {func}", "x": x_vals, "y": y_vals},
+         {"nombre": f"f'(x) = {derivative}", "x": x_vals, "y": dy_vals, "discontinua": True}],
+        titulo="Función y su derivada",
+        verticales=[(p, f"x = {p:g}") for p in polos if -10 <= p <= 10],
+        horizontales=[(0, None)],
+        limites_y=limites_y(x_vals, [y_vals, dy_vals]),
+    )
+else:
+    fig = crear_figura(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.plot(x_vals, y_vals, label=f"f(x) = {func}")
+    ax.plot(x_vals, dy_vals, label=f"f'(x) = {derivative}", linestyle="--")
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.set_ylim(*limites_y(x_vals, [y_vals, dy_vals]))
+    ax.set_title("Función y su derivada")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.legend()
+    ax.grid()
+    mostrar(fig)
@@ -1,45 +1,98 @@
+import importlib.util
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sympy import symbols, diff, lambdify, sympify
+from figuras import crear_figura, mostrar
+from simbolico import compilar
+from tablas import FILAS_MAXIMAS_DESCARGA, envolvente, exportacion_diferida, exportar_csv, exportar_parquet, pagina
+
+COLUMN_NAMES = ["x", "f(x)", "Pendiente (f'(x))"]
 
 # Título de la aplicación
 st.title("Explorando el concepto de pendiente en un punto")
 st.write("Esta aplicación ayuda a visualizar y entender el concepto de pendiente en un punto a una función, como introducción a la derivada.")
 
 # Entrada de la función
-x = symbols('x')
 user_function = st.text_input("Ingresa una función en términos de x (por ejemplo, x**2, sin(x), etc.):", "x**2")
 
 # Procesar la función
 try:
-    function = sympify(user_function)
-    derivative = diff(function, x)
-    f = lambdify(x, function, 'numpy')
-    f_prime = lambdify(x, derivative, 'numpy')
+    compiled = compilar(user_function)
+    function = compiled.expr
+    f = compiled.funcion(0)
+    f_prime = compiled.funcion(1)
 
     # Selección del punto
     point = st.number_input("Selecciona el punto donde deseas calcular la pendiente:", value=1.0)
 
-    # Valores para la tabla y la gráfica
-    x_values = np.linspace(point - 5, point + 5, 10)
-    y_values = f(x_values)
-    slopes = f_prime(x_values)
+    st.subheader("Tabla de valores")
+    large_table = st.checkbox("Modo tabla grande (hasta 10 millones de filas)")
 
-    # Crear tabla de valores
-    data = pd.DataFrame({
-        'x': x_values,
-        'f(x)': y_values,
-        "Pendiente (f'(x))": slopes
-    })
+    if not large_table:
+        # Valores para la tabla
+        x_values = np.linspace(point - 5, point + 5, 10)
+        y_values, slopes = compiled.nucleo((0, 1))(x_values)
 
-    st.subheader("Tabla de valores")
-    st.write(data)
+        # Crear tabla de valores
+        data = pd.DataFrame({
+            'x': x_values,
+            'f(x)': y_values,
+            "Pendiente (f'(x))": slopes
+        })
+        st.write(data)
+    else:
+        # La tabla nunca se construye completa: se calcula solo la página visible,
+        # y las descargas se escriben por bloques
+        nucleo = compiled.nucleo((0, 1))
+        table_min = st.number_input("Valor mínimo de x de la tabla", value=point - 5)
+        table_max = st.number_input("Valor máximo de x de la tabla", value=point + 5)
+        n_rows = st.number_input("Número de filas", min_value=2, max_value=10_000_000,
+                                 value=100_000, step=10_000)
+        page_size = st.selectbox("Filas por página", [100, 1000, 10_000], index=1)
+        n_pages = -(-n_rows // page_size)
+        page = st.number_input(f"Página (de {n_pages})", min_value=1, max_value=n_pages, value=1)
+
+        if table_min < table_max:
+            st.dataframe(pagina(nucleo, table_min, table_max, n_rows, page - 1, page_size, COLUMN_NAMES))
+
+            # El servidor guarda en memoria el archivo completo de cada descarga
+            if n_rows <= FILAS_MAXIMAS_DESCARGA:
+                st.download_button(
+                    "Descargar tabla completa (CSV)",
+                    data=exportacion_diferida(exportar_csv, nucleo, table_min, table_max, n_rows, COLUMN_NAMES),
+                    file_name="tabla.csv", mime="text/csv", on_click="ignore")
+                if importlib.util.find_spec("pyarrow") is not None:
+                    st.download_button(
+                        "Descargar tabla completa (Parquet)",
+                        data=exportacion_diferida(exportar_parquet, nucleo, table_min, table_max, n_rows, COLUMN_NAMES),
+                        file_name="tabla.parquet", mime="application/octet-stream", on_click="ignore")
+                st.caption("El archivo se genera al pulsar el botón; con cientos de miles de filas puede tardar unos segundos.")
+            else:
+                st.info(f"La descarga está disponible para tablas de hasta {FILAS_MAXIMAS_DESCARGA:,} filas; "
+                        "reduce el número de filas para descargarla.")
+
+            if st.checkbox("Graficar la tabla completa"):
+                # Se recorre la tabla por bloques guardando unos dos puntos por
+                # píxel, así que la gráfica no crece con el número de filas
+                x_all, (y_all, dy_all) = compiled.memo_acotado(
+                    ("table_envelope", table_min, table_max, n_rows),
+                    lambda: envolvente(nucleo, table_min, table_max, n_rows),
+                )
+                fig_table = crear_figura()
+                ax_table = fig_table.subplots()
+                ax_table.plot(x_all, y_all, label=f"f(x) = {function}")
+                ax_table.plot(x_all, dy_all, '--', label="f'(x)")
+                ax_table.set_xlabel("x")
+                ax_table.set_title(f"Tabla completa ({n_rows:,} filas)")
+                ax_table.legend()
+                mostrar(fig_table)
+        else:
+            st.error("El valor mínimo de x debe ser menor que el máximo.")
 
     # Gráfica de la función y la tangente
     st.subheader("Gráfica de la función y la tangente en el punto seleccionado")
-    fig, ax = plt.subplots()
+    fig = crear_figura()
+    ax = fig.subplots()
 
     # Gráfica de la función
     x_plot = np.linspace(point - 5, point + 5, 500)
@@ -56,7 +109,7 @@ try:
     ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
     ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
     ax.legend()
-    st.pyplot(fig)
+    mostrar(fig)
 
 except Exception as e:
     st.error(f"Error al procesar la función: {e}")
@@ -1,8 +1,10 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from scipy.special import sph_harm
+from armonicos import ORBITALES, armonico, grado_de_base, superposicion
+from figuras import crear_figura, mostrar_figura
+from graficas import usar_graficas_vectoriales
+from superficies import (MUESTRAS_POR_LOBULO, PRESUPUESTO_MATPLOTLIB, PRESUPUESTO_NAVEGADOR, muestras_por_lobulo,
+                         resolucion, superficie, vista_3d)
 
 # Título de la app
 st.title("Visualización de Esféricos Armónicos")
@@ -17,42 +19,186 @@ st.markdown(
 
 # Sidebar para parámetros
 st.sidebar.header("Parámetros")
-l = st.sidebar.slider("Selecciona l (grado)", 0, 10, 2)
-m = st.sidebar.slider("Selecciona m (orden)", -l, l, 0)
-
-# Generar coordenadas esféricas
-phi = np.linspace(0, 2 * np.pi, 100)
-theta = np.linspace(0, np.pi, 100)
-phi, theta = np.meshgrid(phi, theta)
-
-# Calcular los esféricos armónicos
-Y_lm = sph_harm(m, l, phi, theta)
-
-# Convertir a coordenadas cartesianas para la visualización
-r = np.abs(Y_lm)
-x = r * np.sin(theta) * np.cos(phi)
-y = r * np.sin(theta) * np.sin(phi)
-z = r * np.cos(theta)
-
-# Crear figura 3D
-fig = plt.figure(figsize=(8, 6))
-ax = fig.add_subplot(111, projection='3d')
-
-# Graficar
-norm = plt.Normalize(np.min(r), np.max(r))
-colors = plt.cm.viridis(norm(r.real))
-ax.plot_surface(x, y, z, facecolors=colors, rstride=1, cstride=1, antialiased=True, alpha=0.8)
-ax.set_title(f"Esférico Armónico Y({l},{m})")
-ax.set_xlabel("X")
-ax.set_ylabel("Y")
-ax.set_zlabel("Z")
-
-# Ajustes visuales
-ax.view_init(elev=30, azim=45)
-plt.colorbar(plt.cm.ScalarMappable(norm=norm, cmap='viridis'), ax=ax, shrink=0.5, aspect=10, label='|Y(l,m)|')
-
-# Mostrar la gráfica en Streamlit
-st.pyplot(fig)
+mode = st.sidebar.radio("Visualizar", ["Un armónico Y(l, m)", "Superposición Σ c(l, m) Y(l, m)"])
+single = mode.startswith("Un")
+
+# Grado máximo de los términos de una superposición
+MAX_SUPERPOSITION_DEGREE = 10
+
+if single:
+    l = st.sidebar.slider("Selecciona l (grado)", 0, 100, 2)
+    # Con l = 0 el único orden es m = 0 (un slider de 0 a 0 no es válido)
+    m = st.sidebar.slider("Selecciona m (orden)", -l, l, 0) if l > 0 else 0
+else:
+    # pandas solo hace falta para la tabla de coeficientes de la superposición
+    import pandas as pd
+
+    preset = st.sidebar.selectbox("Orbital", list(ORBITALES) + ["Personalizada"], index=list(ORBITALES).index("d_xy"))
+    initial = ORBITALES.get(preset, {(1, 0): 1.0, (2, 1): 0.5})
+    table = pd.DataFrame(
+        [{"l": degree, "m": order, "Re(c)": complex(c).real, "Im(c)": complex(c).imag}
+         for (degree, order), c in initial.items()],
+        columns=["l", "m", "Re(c)", "Im(c)"],
+    )
+    st.sidebar.write("Coeficientes c(l, m) (se pueden editar, agregar y quitar filas):")
+    # Una tabla por orbital: al elegir otro se empieza de sus coeficientes
+    edited = st.sidebar.data_editor(
+        table, num_rows="dynamic", hide_index=True, key=f"coefficients_{preset}",
+        column_config={
+            "l": st.column_config.NumberColumn(min_value=0, max_value=MAX_SUPERPOSITION_DEGREE, step=1),
+            "m": st.column_config.NumberColumn(min_value=-MAX_SUPERPOSITION_DEGREE,
+                                               max_value=MAX_SUPERPOSITION_DEGREE, step=1),
+            "Re(c)": st.column_config.NumberColumn(format="%.4f"),
+            "Im(c)": st.column_config.NumberColumn(format="%.4f"),
+        },
+    )
+
+    # Se suman las filas repetidas y se descartan las incompletas o inválidas
+    coefficients = {}
+    for row in edited.fillna({"Re(c)": 0.0, "Im(c)": 0.0}).itertuples(index=False):
+        if pd.isna(row.l) or pd.isna(row.m):
+            continue
+        degree, order = int(row.l), int(row.m)
+        if not 0 <= degree <= MAX_SUPERPOSITION_DEGREE or abs(order) > degree:
+            st.sidebar.error(f"Se ignora c({degree}, {order}): se necesita |m| <= l <= {MAX_SUPERPOSITION_DEGREE}.")
+            continue
+        coefficients[(degree, order)] = coefficients.get((degree, order), 0) + complex(row[2], row[3])
+    # Tupla ordenada: sirve de clave de la caché de figuras
+    coefficients = tuple(sorted((lm, c) for lm, c in coefficients.items() if c != 0))
+
+def surface_colors(values, vmin, vmax, cmap):
+    """
+    (norm, colores RGBA de cada punto) para colorear la superficie.
+    """
+    # Los colores de Matplotlib solo se importan si hay que dibujar
+    from matplotlib import colormaps
+    from matplotlib.colors import Normalize
+
+    norm = Normalize(vmin, vmax)
+    return norm, colormaps[cmap](norm(values))
+
+def harmonic_surface(l, m, budget=PRESUPUESTO_MATPLOTLIB):
+    """
+    Superficie r = |Y(l, m)| como (x, y, z, r), en una malla cuya resolución
+    depende de los lóbulos de Y(l, m) y del presupuesto de triángulos.
+    """
+    # |Y(l, m)| no depende de φ y tiene l - |m| + 1 lóbulos en θ
+    lobes = l - abs(m) + 1
+    n_theta, n_phi = resolucion(lobes, 0, budget)
+
+    # Calcular los esféricos armónicos (todos los órdenes m del grado l se
+    # calculan de una vez y quedan en caché)
+    r = np.abs(armonico(l, m, n_theta, n_phi))
+
+    # Convertir a coordenadas cartesianas para la visualización (con un radio
+    # mínimo: cerca de los polos |Y| llega a 1e-95 para |m| grande, y las
+    # normales de esas caras, que se usan para sombrear, dan cero)
+    x, y, z = superficie(np.maximum(r, 1e-6 * np.max(r)))
+    return x, y, z, r
+
+def superposition_surface(coefficients, budget=PRESUPUESTO_MATPLOTLIB):
+    """
+    Superficie r = |f| de f = Σ c(l, m) Y(l, m) como (x, y, z, fase de f).
+    """
+    # La malla depende del grado de la base y no de los coeficientes, así que
+    # todas las superposiciones de grado bajo usan la misma base ya calculada
+    coefficients = dict(coefficients)
+    degree = grado_de_base(coefficients)
+    n_theta, n_phi = resolucion(degree + 1, 2 * degree + 1, budget)
+    f = superposicion(coefficients, n_theta, n_phi)
+
+    r = np.abs(f)
+    x, y, z = superficie(np.maximum(r, 1e-6 * np.max(r)))
+    return x, y, z, np.angle(f)
+
+def draw_surface(x, y, z, values, vmin, vmax, cmap, title, label):
+    """
+    Dibuja la superficie con matplotlib, coloreada según `values`.
+    """
+    from matplotlib.cm import ScalarMappable
+
+    # Crear figura 3D
+    fig = crear_figura(figsize=(8, 6))
+    ax = fig.add_subplot(111, projection='3d')
+
+    # Graficar
+    norm, colors = surface_colors(values, vmin, vmax, cmap)
+    ax.plot_surface(x, y, z, facecolors=colors, rstride=1, cstride=1, antialiased=True, alpha=0.8)
+    ax.set_title(title)
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    ax.set_zlabel("Z")
+
+    # Ajustes visuales
+    ax.view_init(elev=30, azim=45)
+    fig.colorbar(ScalarMappable(norm=norm, cmap=cmap), ax=ax, shrink=0.5, aspect=10, label=label)
+    return fig
+
+def draw_harmonic(l, m):
+    """
+    Dibuja la superficie de Y(l, m). Solo se llama cuando la imagen de
+    (l, m) no está en la caché de figuras.
+    """
+    x, y, z, r = harmonic_surface(l, m)
+    return draw_surface(x, y, z, r, np.min(r), np.max(r), "viridis", f"Esférico Armónico Y({l},{m})", '|Y(l,m)|')
+
+def draw_superposition(coefficients, title):
+    """
+    Dibuja |f| coloreada según la fase de f (para un orbital real, los dos
+    colores son los dos signos).
+    """
+    x, y, z, phase = superposition_surface(coefficients)
+    return draw_surface(x, y, z, phase, -np.pi, np.pi, "twilight", title, "Fase de f")
+
+def warn_if_undersampled(lobes_theta, lobes_phi, budget):
+    """
+    Aviso si la malla que cabe en el presupuesto tiene menos muestras por
+    lóbulo de las necesarias para que la superficie se vea sin artefactos.
+    """
+    samples = muestras_por_lobulo(lobes_theta, lobes_phi, budget)
+    if samples < MUESTRAS_POR_LOBULO:
+        st.warning(f"La malla tiene solo {samples:.1f} muestras por lóbulo (se necesitan unas "
+                   f"{MUESTRAS_POR_LOBULO}), así que la superficie puede verse con artefactos "
+                   "(lóbulos que faltan o se deforman).")
+
+def format_coefficient(c):
+    if c.imag == 0:
+        return f"{c.real:.4g}"
+    if c.real == 0:
+        return f"{c.imag:.4g}i"
+    return f"({c.real:.4g} {c.imag:+.4g}i)"
+
+# Mostrar la gráfica en Streamlit: en el navegador (se gira sin volver a
+# llamar al servidor) o como imagen, desde la caché si ya se dibujó con estos
+# parámetros
+vector = usar_graficas_vectoriales()
+budget = PRESUPUESTO_NAVEGADOR if vector else PRESUPUESTO_MATPLOTLIB
+if single:
+    warn_if_undersampled(l - abs(m) + 1, 0, budget)
+    if vector:
+        x, y, z, r = harmonic_surface(l, m, PRESUPUESTO_NAVEGADOR)
+        st.pydeck_chart(vista_3d(x, y, z, surface_colors(r, np.min(r), np.max(r), "viridis")[1]), height=500)
+    else:
+        mostrar_figura("esfericos", (l, m), lambda: draw_harmonic(l, m))
+elif not coefficients:
+    st.info("Agrega al menos un coeficiente distinto de cero.")
+else:
+    terms = [rf"{format_coefficient(c)}\,Y_{{{degree}}}^{{{order}}}" for (degree, order), c in coefficients]
+    formula = terms[0] + "".join(f" - {term[1:]}" if term.startswith("-") else f" + {term}" for term in terms[1:])
+    st.latex(r"f(\theta, \varphi) = " + formula)
+    # Los Y(l, m) son ortonormales: la norma de f es la de sus coeficientes
+    st.caption(f"∫|f|² dΩ = Σ|c(l, m)|² = {sum(abs(c) ** 2 for _, c in coefficients):.4g}")
+    # El título del orbital solo si no se cambiaron sus coeficientes
+    unchanged = preset in ORBITALES and dict(coefficients) == {lm: complex(c) for lm, c in ORBITALES[preset].items()}
+    title = f"Orbital {preset}" if unchanged else "Superposición"
+    max_degree = grado_de_base(dict(coefficients))
+    warn_if_undersampled(max_degree + 1, 2 * max_degree + 1, budget)
+    if vector:
+        x, y, z, phase = superposition_surface(coefficients, PRESUPUESTO_NAVEGADOR)
+        st.pydeck_chart(vista_3d(x, y, z, surface_colors(phase, -np.pi, np.pi, "twilight")[1]), height=500)
+    else:
+        mostrar_figura("esfericos_superposicion", (coefficients, title),
+                       lambda: draw_superposition(coefficients, title))
 
 # Información adicional
 st.markdown(
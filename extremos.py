@@ -0,0 +1,185 @@
+"""
+Puntos críticos y extremos de una función en un intervalo, de forma numérica.
+
+Se construye un interpolante de Chebyshev de f en [a, b] (subdividiendo el
+intervalo si hace falta más grado del permitido) y las raíces de su derivada
+se obtienen como valores propios de la matriz "colega" (numpy Chebyshev.roots).
+El costo está acotado por el grado máximo y la profundidad de subdivisión, sin
+importar qué tan complicada sea la expresión.
+
+Los subintervalos donde ni así se logra interpolar f se revisan con muestras:
+si f no es finita en alguna, o si sus valores siguen creciendo al muestrear
+más fino (un polo), no se informan extremos globales, porque no los hay (o
+no se pueden garantizar); si f es acotada ahí (por ejemplo, tiene un pico),
+sus valores extremos muestreados entran como candidatos.
+"""
+import numpy as np
+from numpy.polynomial import Chebyshev
+from numpy.polynomial.chebyshev import chebinterpolate
+
+GRADOS = (16, 32, 64, 128)
+PROFUNDIDAD_MAXIMA = 6
+# Muestras de un subintervalo que no se pudo interpolar, y cuántas veces más
+# fino se vuelve a muestrear para detectar un polo
+MUESTRAS_SUBINTERVALO = 257
+REFINAMIENTO = 16
+# Crecimiento de los extremos al refinar, relativo al rango de los valores,
+# a partir del cual se considera que f no es acotada
+CRECIMIENTO_MAXIMO = 0.05
+
+NO_DEFINIDA = "no definida en todo el intervalo"
+NO_ACOTADA = "no acotada en el intervalo"
+
+
+def _evaluar(f, x):
+    with np.errstate(all="ignore"):
+        y = np.asarray(f(x))
+    if np.iscomplexobj(y):
+        y = np.where(np.abs(y.imag) < 1e-12, y.real, np.nan)
+    return np.broadcast_to(np.asarray(y, dtype=float), np.shape(x))
+
+
+def interpolante_chebyshev(f, a, b, tolerancia=1e-12):
+    """
+    Interpolante de Chebyshev de f en [a, b] con el menor grado de GRADOS cuyos
+    últimos coeficientes son despreciables. Devuelve None si ninguno alcanza la
+    tolerancia o si f no es finita en algún nodo.
+    """
+    centro, radio = 0.5 * (a + b), 0.5 * (b - a)
+    for grado in GRADOS:
+        with np.errstate(all="ignore"):
+            coeficientes = chebinterpolate(lambda t: _evaluar(f, centro + radio * t), grado)
+        if not np.all(np.isfinite(coeficientes)):
+            return None
+        escala = max(np.max(np.abs(coeficientes)), 1e-300)
+        if np.max(np.abs(coeficientes[-3:])) <= tolerancia * escala:
+            # Sin la cola de coeficientes despreciables (ruido de redondeo)
+            return Chebyshev(coeficientes, domain=[a, b]).trim(tolerancia * escala)
+    return None
+
+
+def _raices_derivada(f, a, b, fallidos, profundidad=0):
+    """
+    Raíces reales de la derivada del interpolante de f en [a, b], subdividiendo
+    el intervalo cuando el grado máximo no basta. Los subintervalos donde no se
+    logra interpolar ni con la profundidad máxima se agregan a `fallidos`.
+    """
+    interpolante = interpolante_chebyshev(f, a, b)
+    if interpolante is None:
+        if profundidad >= PROFUNDIDAD_MAXIMA:
+            fallidos.append((a, b))
+            return []
+        medio = 0.5 * (a + b)
+        return (_raices_derivada(f, a, medio, fallidos, profundidad + 1)
+                + _raices_derivada(f, medio, b, fallidos, profundidad + 1))
+
+    derivada = interpolante.deriv()
+    if np.all(derivada.coef == 0):
+        return []
+    raices = derivada.roots()
+    margen = 1e-9 * (b - a)
+    reales = raices[np.abs(raices.imag) <= 1e-8 * (b - a)].real
+    return list(reales[(reales >= a - margen) & (reales <= b + margen)])
+
+
+def _revisar_subintervalo(f, a, b):
+    """
+    Muestrea f en un subintervalo donde no se pudo interpolar. Devuelve
+    (problema, x, y): problema es NO_DEFINIDA si f no es finita en alguna
+    muestra, NO_ACOTADA si sus valores extremos crecen al muestrear más fino
+    o None; en ese caso, x e y son los puntos donde f toma su máximo y su
+    mínimo muestreados.
+    """
+    x = np.linspace(a, b, REFINAMIENTO * (MUESTRAS_SUBINTERVALO - 1) + 1)
+    y = _evaluar(f, x)
+    if not np.all(np.isfinite(y)):
+        return NO_DEFINIDA, x[:0], y[:0]
+    gruesa = y[::REFINAMIENTO]
+    rango = max(np.ptp(gruesa), 1e-12 * np.max(np.abs(gruesa)), 1e-300)
+    if (y.max() - gruesa.max() > CRECIMIENTO_MAXIMO * rango
+            or gruesa.min() - y.min() > CRECIMIENTO_MAXIMO * rango):
+        return NO_ACOTADA, x[:0], y[:0]
+    indices = [np.argmax(y), np.argmin(y)]
+    return None, x[indices], y[indices]
+
+
+def analizar_extremos(f, derivadas, a, b):
+    """
+    Puntos críticos de f en [a, b] y extremos globales en el intervalo.
+    - f : función vectorizada de NumPy
+    - derivadas : función que devuelve a la vez las filas f'(x) y f''(x)
+      (por ejemplo, ExpresionCompilada.nucleo((1, 2)))
+    - a, b : extremos del intervalo
+
+    Devuelve un diccionario con los arreglos x, y y tipo de los puntos
+    críticos ("Mínimo", "Máximo" o "Punto de inflexión"), las tuplas (x, y)
+    de maximo_global y minimo_global (que pueden estar en los bordes) y
+    problema: None, o NO_DEFINIDA o NO_ACOTADA si f no es finita o no es
+    acotada en alguna parte del intervalo; en ese caso maximo_global y
+    minimo_global son None, y subintervalos tiene los (a, b) donde ocurre.
+    """
+    fallidos = []
+    x = np.array(sorted(_raices_derivada(f, a, b, fallidos)))
+    x = np.clip(x, a, b)
+
+    if x.size:
+        # Un paso de Newton con las derivadas exactas para pulir las raíces,
+        # y luego se juntan las repetidas (en los bordes entre subintervalos)
+        d1, d2 = _evaluar_filas(derivadas, x)
+        with np.errstate(all="ignore"):
+            paso = np.where(np.abs(d2) > 0, d1 / d2, 0.0)
+        pulidas = x - paso
+        x = np.where(np.isfinite(pulidas) & (np.abs(paso) < 1e-3 * (b - a)), pulidas, x)
+        x = np.clip(np.sort(x), a, b)
+        x = x[np.concatenate(([True], np.diff(x) > 1e-7 * (b - a)))]
+
+    y = _evaluar(f, x)
+    d1, d2 = _evaluar_filas(derivadas, x)
+
+    # Clasificación de todos los puntos a la vez por el signo de f''
+    escala = np.max(np.abs(d2)) if d2.size else 0.0
+    tipo = np.full(x.shape, "Punto de inflexión", dtype=object)
+    tipo[d2 > 1e-9 * max(escala, 1.0)] = "Mínimo"
+    tipo[d2 < -1e-9 * max(escala, 1.0)] = "Máximo"
+
+    candidatos_x = [np.array([a]), x, np.array([b])]
+    candidatos_y = [_evaluar(f, np.array([a])), y, _evaluar(f, np.array([b]))]
+    problemas = {}
+    for inicio, fin in fallidos:
+        problema, px, py = _revisar_subintervalo(f, inicio, fin)
+        if problema is not None:
+            problemas.setdefault(problema, []).append((inicio, fin))
+        candidatos_x.append(px)
+        candidatos_y.append(py)
+    candidatos_x = np.concatenate(candidatos_x)
+    candidatos_y = np.concatenate(candidatos_y)
+    # Bordes del intervalo (o puntos críticos) donde f no es finita
+    for x_no_finito in candidatos_x[~np.isfinite(candidatos_y)]:
+        problemas.setdefault(NO_DEFINIDA, []).append((x_no_finito, x_no_finito))
+
+    # Los puntos críticos de las partes donde f sí se pudo analizar se
+    # informan igual, pero los extremos globales solo si f es finita y
+    # acotada en todo el intervalo
+    maximo_global = minimo_global = problema = None
+    if problemas:
+        problema = NO_DEFINIDA if NO_DEFINIDA in problemas else NO_ACOTADA
+    else:
+        maximo_global = (candidatos_x[np.argmax(candidatos_y)], candidatos_y.max())
+        minimo_global = (candidatos_x[np.argmin(candidatos_y)], candidatos_y.min())
+
+    return {
+        "x": x,
+        "y": y,
+        "tipo": tipo,
+        "maximo_global": maximo_global,
+        "minimo_global": minimo_global,
+        "problema": problema,
+        "subintervalos": sorted(s for lista in problemas.values() for s in lista),
+    }
+
+
+def _evaluar_filas(derivadas, x):
+    with np.errstate(all="ignore"):
+        filas = np.asarray(derivadas(x), dtype=float)
+    filas = np.broadcast_to(filas, (2,) + x.shape)
+    return filas[0], filas[1]
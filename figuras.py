@@ -0,0 +1,251 @@
+"""
+Manejo de figuras de matplotlib: caché de figuras ya rasterizadas y ciclo de
+vida de las figuras de cada sesión.
+
+Dibujar y rasterizar una figura de matplotlib es lo que más CPU consume en
+las apps, y la mayoría de las sesiones se quedan en los parámetros por
+defecto. Aquí cada figura se identifica por el nombre de la vista y la tupla
+completa de sus parámetros; la primera vez se dibuja y se guarda la imagen
+PNG ya codificada, y las siguientes se muestra directamente esa imagen, sin
+llamar a matplotlib. La caché está acotada en bytes y cada imagen caduca
+después de un tiempo (TTL).
+
+Las figuras que cambian con cada interacción se crean con la API orientada a
+objetos (Figure con un lienzo Agg), nunca con el estado global de pyplot, así
+que no quedan registradas en su administrador de figuras: cada sesión guarda
+la suya en st.session_state, la actualiza cambiando los datos de sus líneas y
+la libera cuando termina la sesión; las demás se liberan en cuanto se
+muestran. estadisticas_memoria() informa cuántas figuras siguen vivas y la
+memoria del proceso; la barra lateral solo lo muestra si la variable de
+entorno MEMORIA_SERVIDOR vale 1.
+"""
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+
+# Las figuras se dibujan con el lienzo Agg, sin las partes gráficas (ventanas)
+# de pyplot; si alguna biblioteca llega a importar pyplot, que también use Agg
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+TTL_SEGUNDOS = 600
+BYTES_MAXIMOS = 64 * 2**20
+# Los mismos valores que usa st.pyplot al guardar la figura
+OPCIONES_GUARDADO = {"format": "png", "bbox_inches": "tight", "dpi": 200}
+# MEMORIA_SERVIDOR=1 muestra mostrar_estadisticas_memoria() en las apps
+# (es información para quien administra el servidor, no para los estudiantes)
+MOSTRAR_MEMORIA = os.environ.get("MEMORIA_SERVIDOR", "") == "1"
+
+
+class CacheImagenes:
+    """
+    Imágenes codificadas, con desalojo de la menos usada cuando se pasa de
+    bytes_maximos y caducidad de ttl segundos desde que se dibujaron.
+    """
+
+    def __init__(self, bytes_maximos=BYTES_MAXIMOS, ttl=TTL_SEGUNDOS):
+        self.bytes_maximos = bytes_maximos
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, generar):
+        """
+        Bytes de la imagen `clave`; si no está o caducó, los crea con generar().
+        """
+        ahora = time.monotonic()
+        with self._candado:
+            entrada = self._datos.get(clave)
+            if entrada is not None and ahora - entrada[0] <= self.ttl:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+
+        imagen = generar()
+
+        with self._candado:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior[1])
+            self._datos[clave] = (ahora, imagen)
+            self._bytes += len(imagen)
+            while self._bytes > self.bytes_maximos and len(self._datos) > 1:
+                _, (_, descartada) = self._datos.popitem(last=False)
+                self._bytes -= len(descartada)
+                self.desalojos += 1
+        return imagen
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+            }
+
+
+_imagenes = CacheImagenes()
+
+
+def clave_figura(nombre, parametros):
+    """
+    Hash del nombre de la vista y de la tupla de parámetros (números, textos
+    o tuplas de ellos; repr distingue 1 de 1.0 y conserva todos los decimales).
+    """
+    return hashlib.sha256(repr((nombre, parametros)).encode()).hexdigest()
+
+
+def codificar(fig):
+    """
+    PNG de la figura, con las mismas opciones que st.pyplot.
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **OPCIONES_GUARDADO)
+    return buffer.getvalue()
+
+
+def liberar(fig):
+    """
+    Quita la figura del administrador de pyplot (si estaba ahí) y borra su
+    contenido, para que su memoria se libere aunque quede alguna referencia.
+    """
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close(fig)
+    fig.clear()
+
+
+def rasterizar(fig):
+    """
+    PNG de la figura, que después se libera.
+    """
+    try:
+        return codificar(fig)
+    finally:
+        liberar(fig)
+
+
+def imagen_figura(nombre, parametros, dibujar):
+    """
+    PNG de la figura que devuelve dibujar() para estos parámetros, sacado
+    de la caché si ya se había dibujado.
+    """
+    return _imagenes.obtener(clave_figura(nombre, parametros), lambda: rasterizar(dibujar()))
+
+
+def mostrar_figura(nombre, parametros, dibujar):
+    """
+    Reemplazo de st.pyplot(dibujar()) que solo llama a dibujar() cuando la
+    imagen de estos parámetros no está en la caché. `dibujar` debe depender
+    únicamente de `parametros`.
+    """
+    st.image(imagen_figura(nombre, parametros, dibujar), width="stretch")
+
+
+def estadisticas_figuras():
+    return _imagenes.estadisticas()
+
+
+# Todas las figuras creadas con crear_figura que siguen en memoria, y las que
+# pertenecen a una sesión (esas no se liberan al mostrarlas)
+_vivas = weakref.WeakSet()
+_de_sesion = weakref.WeakSet()
+
+
+def crear_figura(**opciones):
+    """
+    Figura nueva con lienzo Agg, fuera del administrador de figuras de pyplot
+    (se libera sola cuando ya nadie la usa). Acepta las opciones de Figure,
+    por ejemplo figsize.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(**opciones)
+    FigureCanvasAgg(fig)
+    _vivas.add(fig)
+    return fig
+
+
+def figura_de_sesion(nombre, construir):
+    """
+    Figura `nombre` de la sesión actual y sus elementos (líneas, ejes, ...),
+    creados con construir() -> (fig, elementos) la primera vez. En las
+    siguientes re-ejecuciones se reutilizan: basta con actualizar sus datos.
+    """
+    figuras = st.session_state.setdefault("_figuras", {})
+    if nombre not in figuras:
+        figuras[nombre] = construir()
+        _de_sesion.add(figuras[nombre][0])
+    return figuras[nombre]
+
+
+def mostrar(fig):
+    """
+    Muestra la figura ya codificada como imagen (en lugar de st.pyplot). Las
+    figuras de figura_de_sesion se conservan para la siguiente re-ejecución;
+    cualquier otra se libera después de codificarla.
+    """
+    imagen = codificar(fig) if fig in _de_sesion else rasterizar(fig)
+    st.image(imagen, width="stretch")
+
+
+def _memoria_residente():
+    """
+    Memoria residente (RSS) del proceso en bytes; en sistemas sin /proc, el
+    máximo alcanzado.
+    """
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KiB y macOS en bytes
+        return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+def estadisticas_memoria():
+    """
+    Figuras vivas (creadas con crear_figura y registradas en pyplot), imágenes
+    en la caché y memoria residente del proceso.
+    """
+    en_pyplot = 0
+    if "matplotlib.pyplot" in sys.modules:
+        en_pyplot = len(sys.modules["matplotlib.pyplot"].get_fignums())
+    return {
+        "figuras_vivas": len(_vivas),
+        "figuras_pyplot": en_pyplot,
+        "imagenes_en_cache": _imagenes.estadisticas()["entradas"],
+        "bytes_imagenes": _imagenes.estadisticas()["bytes"],
+        "memoria_residente": _memoria_residente(),
+    }
+
+
+def mostrar_estadisticas_memoria():
+    """
+    Resumen de estadisticas_memoria() en la barra lateral, solo si
+    MEMORIA_SERVIDOR=1.
+    """
+    if not MOSTRAR_MEMORIA:
+        return
+    datos = estadisticas_memoria()
+    with st.sidebar.expander("Memoria del servidor"):
+        st.write(f"Figuras vivas: {datos['figuras_vivas']} "
+                 f"(en pyplot: {datos['figuras_pyplot']})")
+        st.write(f"Imágenes en caché: {datos['imagenes_en_cache']} "
+                 f"({datos['bytes_imagenes'] / 2**20:.1f} MB)")
+        st.write(f"Memoria del proceso: {datos['memoria_residente'] / 2**20:.0f} MB")
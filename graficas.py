@@ -0,0 +1,92 @@
+"""
+Gráficas de líneas que se dibujan en el navegador.
+
+En lugar de rasterizar la figura con matplotlib en el servidor y enviar un
+PNG, se envían las series numéricas (reducidas con muestreo.diezmar a unos
+dos puntos por columna de píxeles) y una descripción declarativa de la
+gráfica en Vega-Lite (con Altair y st.altair_chart): curvas, rectas
+verticales y horizontales (asíntotas, valores óptimos, ejes) y puntos
+marcados. El navegador dibuja la gráfica, y acercar o desplazar la vista no
+le cuesta nada al servidor.
+"""
+import numpy as np
+import streamlit as st
+
+from muestreo import ANCHO_PIXELES, diezmar
+
+
+def usar_graficas_vectoriales():
+    """
+    Interruptor (compartido por todas las apps de la sesión) para elegir
+    entre las gráficas interactivas y las imágenes de matplotlib.
+    """
+    return st.sidebar.toggle(
+        "Gráficas interactivas", key="graficas_vectoriales",
+        help="Dibuja las gráficas en el navegador: se pueden acercar y desplazar con el ratón.",
+    )
+
+
+def grafica_lineas(series, titulo=None, eje_x="x", eje_y="y", verticales=(), horizontales=(),
+                   puntos=(), limites_y=None, alto=400, ancho_pixeles=ANCHO_PIXELES):
+    """
+    Gráfica de Altair con:
+    - series : lista de diccionarios {"nombre", "x", "y"} y, opcionalmente,
+      "discontinua": True para una línea a trazos
+    - verticales, horizontales : listas de (valor, nombre); con nombre None
+      se dibujan como ejes (negro y delgado), si no, como rectas rojas a trazos
+    - puntos : lista de (x, y, nombre)
+    - limites_y : (mínimo, máximo) del eje y; lo que queda fuera se recorta
+    - ancho_pixeles : columnas de píxeles para las que se diezman las series
+    """
+    import altair as alt
+    import pandas as pd
+
+    tablas = []
+    for serie in series:
+        x, y = diezmar(serie["x"], serie["y"], ancho_pixeles)
+        y = np.where(np.isfinite(y), y, np.nan)
+        tablas.append(pd.DataFrame({"x": x, "y": y, "serie": serie["nombre"],
+                                    "trazo": "discontinua" if serie.get("discontinua") else "continua"}))
+    datos = pd.concat(tablas, ignore_index=True)
+
+    escala_y = alt.Scale(domain=list(limites_y)) if limites_y is not None else alt.Scale(zero=False)
+    nombres = [serie["nombre"] for serie in series] + [nombre for _, _, nombre in puntos]
+    color = alt.Color("serie:N", title=None, scale=alt.Scale(domain=nombres),
+                      legend=alt.Legend(orient="bottom", labelLimit=400))
+    capas = [
+        alt.Chart(datos).mark_line(clip=True, invalid="break-paths-show-domains").encode(
+            x=alt.X("x:Q", title=eje_x),
+            y=alt.Y("y:Q", title=eje_y, scale=escala_y),
+            color=color,
+            strokeDash=alt.StrokeDash("trazo:N", legend=None,
+                                      scale=alt.Scale(domain=["continua", "discontinua"],
+                                                      range=[[1, 0], [6, 4]])),
+            tooltip=["serie:N", "x:Q", "y:Q"],
+        )
+    ]
+
+    for campo, rectas in (("x", verticales), ("y", horizontales)):
+        for valor, nombre in rectas:
+            if nombre is None:
+                marca = alt.Chart(pd.DataFrame({campo: [valor]})).mark_rule(color="black", strokeWidth=0.8)
+            else:
+                marca = alt.Chart(pd.DataFrame({campo: [valor], "nombre": [nombre]})).mark_rule(
+                    color="red", strokeDash=[6, 4]).encode(tooltip=["nombre:N"])
+            capas.append(marca.encode(**{campo: f"{campo}:Q"}))
+
+    if puntos:
+        tabla_puntos = pd.DataFrame(puntos, columns=["x", "y", "serie"])
+        capas.append(alt.Chart(tabla_puntos).mark_point(filled=True, size=80, clip=True).encode(
+            x="x:Q", y="y:Q", color=color, tooltip=["serie:N", "x:Q", "y:Q"]))
+
+    grafica = alt.layer(*capas).properties(height=alto).interactive()
+    if titulo:
+        grafica = grafica.properties(title=titulo)
+    return grafica
+
+
+def mostrar_grafica(*args, **kwargs):
+    """
+    Muestra grafica_lineas(*args, **kwargs) a todo el ancho.
+    """
+    st.altair_chart(grafica_lineas(*args, **kwargs), width="stretch")
@@ -1,42 +1,89 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from sympy import symbols, limit, sympify, lambdify
+from figuras import crear_figura, mostrar
+from simbolico import compilar
+from muestreo import muestrear_adaptativo
+from aislamiento import LimiteNoExiste, TiempoAgotado, limite_aislado
+from limites import estimar_limite
+
+def describe_estimate(estimate):
+    """
+    Text for a numeric limit estimate (one side or both sides together).
+    """
+    kind = estimate["tipo"]
+    if kind == "finito":
+        return f"≈ {estimate['valor']:.10g} (error ≤ {estimate['error']:.1e})"
+    if kind == "infinito":
+        return "+∞" if estimate["valor"] > 0 else "-∞"
+    if kind == "no definido":
+        return "la función no está definida de este lado"
+    if kind == "no existe":
+        return "no existe (los límites laterales son distintos)"
+    return "no concluyente"
 
 # Título de la aplicación
 st.title("Entendiendo el concepto de límite de una función")
 st.write("Esta aplicación interactiva te ayuda a comprender el concepto de límite en cálculo diferencial.")
 
 # Entrada de la función
-x = symbols('x')
 user_function = st.text_input("Ingresa una función en términos de x (por ejemplo, sin(x)/x, (x**2 - 1)/(x - 1), etc.):", "(x**2 - 1)/(x - 1)")
 
 # Punto donde evaluar el límite
 try:
-    function = sympify(user_function)
-    f = lambdify(x, function, 'numpy')
+    compiled = compilar(user_function)
+    function = compiled.expr
+    f = compiled.funcion(0)
 
     point = st.number_input("Ingresa el punto al que x tiende (por ejemplo, 1):", value=1.0)
 
-    # Calcular el límite usando SymPy
-    limit_value = limit(function, x, point)
-    st.write(f"El valor del límite cuando x tiende a {point} es: {limit_value}")
+    # Estimación numérica (rápida) por ambos lados del punto
+    estimate = estimar_limite(f, point)
+    st.write(f"Límite por la izquierda: {describe_estimate(estimate['izquierda'])}")
+    st.write(f"Límite por la derecha: {describe_estimate(estimate['derecha'])}")
+
+    limit_value = estimate["valor"] if estimate["tipo"] == "finito" else None
+    exact = st.checkbox("Calcular el valor exacto (cálculo simbólico)")
+    if estimate["tipo"] != "inconcluso" and not exact:
+        st.write(f"El valor del límite cuando x tiende a {point} es: {describe_estimate(estimate)}")
+    else:
+        # Calcular el límite usando SymPy (en un proceso aparte y con tiempo límite),
+        # solo si la estimación no es concluyente o si se pide el valor exacto
+        try:
+            exact_value = limite_aislado(function, compiled.variable, point)
+            st.write(f"El valor del límite cuando x tiende a {point} es: {exact_value}")
+            if exact_value.is_real and exact_value.is_finite:
+                try:
+                    limit_value = float(exact_value)
+                except TypeError:
+                    # Por ejemplo, un intervalo (AccumBounds) cuando la función oscila
+                    pass
+        except LimiteNoExiste as e:
+            st.write(f"El límite cuando x tiende a {point} no existe: por la izquierda es "
+                     f"{e.izquierda} y por la derecha, {e.derecha}.")
+        except TiempoAgotado:
+            st.warning("El cálculo simbólico del límite es demasiado costoso para esta función.")
+        if estimate["tipo"] == "inconcluso":
+            st.caption("La estimación numérica no fue concluyente (por ejemplo, la función "
+                       "oscila cerca del punto), por eso se usó el cálculo simbólico.")
 
     # Valores para visualizar la función
     delta = 0.5  # Define un intervalo alrededor del punto
-    x_values = np.linspace(point - delta, point + delta, 500)
-    y_values = f(x_values)
+    x_values, y_values = muestrear_adaptativo(
+        f, point - delta, point + delta, singularidades=[point], presupuesto=300
+    )
 
     # Evitar que la función explote en valores no definidos
     y_values[np.isinf(y_values) | np.isnan(y_values)] = np.nan
 
     # Gráfica del comportamiento de la función
     st.subheader("Gráfica del comportamiento de la función")
-    fig, ax = plt.subplots()
+    fig = crear_figura()
+    ax = fig.subplots()
 
     ax.plot(x_values, y_values, label=f"f(x) = {function}")
     ax.axvline(point, color='red', linestyle='--', label=f"x = {point}")
-    ax.scatter([point], [limit_value], color='green', label=f"Límite = {limit_value}")
+    if limit_value is not None:
+        ax.scatter([point], [limit_value], color='green', label=f"Límite = {limit_value:.6g}")
 
     ax.set_title("Visualización del límite")
     ax.set_xlabel("x")
@@ -45,14 +92,19 @@ try:
     ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
     ax.legend()
 
-    st.pyplot(fig)
+    mostrar(fig)
 
     # Explicación didáctica
     st.subheader("Explicación del concepto de límite")
-    st.write(
-        f"El límite de una función describe el valor al que se aproxima la función "
-        f"cuando x se acerca a un punto dado. En este caso, cuando x tiende a {point}, "
-        f"la función {function} se aproxima al valor {limit_value}.")
+    if limit_value is not None:
+        st.write(
+            f"El límite de una función describe el valor al que se aproxima la función "
+            f"cuando x se acerca a un punto dado. En este caso, cuando x tiende a {point}, "
+            f"la función {function} se aproxima al valor {limit_value:.6g}.")
+    else:
+        st.write(
+            "El límite de una función describe el valor al que se aproxima la función "
+            "cuando x se acerca a un punto dado.")
     st.write(
         "El comportamiento de la función cerca de este punto puede observarse en la gráfica, "
         "donde los valores de f(x) (en azul) se acercan al valor límite (en verde) cuando x se "
@@ -0,0 +1,175 @@
+"""
+Estimación numérica rápida de límites.
+
+Se evalúa f en dos sucesiones geométricas que se acercan al punto, una por
+cada lado, en una sola llamada vectorizada, y cada sucesión se acelera con
+extrapolación de Richardson y con el algoritmo épsilon de Wynn. De cada lado
+se obtiene un valor con una cota de error, o se detecta que la función crece
+sin límite, o que no está definida. Si el resultado no es concluyente (por
+ejemplo, una función que oscila), la app recurre al límite simbólico.
+"""
+import numpy as np
+
+# Razón entre pasos consecutivos y número de pasos de cada lado
+RAZON = 0.5
+PASOS = 12
+
+
+def _evaluar(f, x):
+    with np.errstate(all="ignore"):
+        y = np.asarray(f(x))
+    if np.iscomplexobj(y):
+        y = np.where(np.abs(y.imag) < 1e-12, y.real, np.nan)
+    return np.broadcast_to(np.asarray(y, dtype=float), np.shape(x))
+
+
+def _cambio(columna):
+    """
+    Cota del error del último valor de una columna de extrapolación: el mayor
+    de sus dos últimos cambios (con uno solo, el redondeo puede hacer que dos
+    valores coincidan por casualidad).
+    """
+    if len(columna) < 3:
+        return np.inf
+    return max(abs(columna[-1] - columna[-2]), abs(columna[-2] - columna[-3]))
+
+
+def _richardson(s, razon):
+    """
+    Diagonal de la tabla de Richardson de s (valores en pasos h0 * razon**k),
+    suponiendo un error en potencias enteras de h. Devuelve (estimaciones, errores).
+    """
+    estimaciones, errores = [], []
+    tabla = s.copy()
+    for j in range(1, len(s)):
+        factor = razon ** j
+        tabla = (tabla[1:] - factor * tabla[:-1]) / (1 - factor)
+        estimaciones.append(tabla[-1])
+        errores.append(_cambio(tabla))
+    return estimaciones, errores
+
+
+def _wynn(s):
+    """
+    Columnas pares del algoritmo épsilon de Wynn, que acelera sumas de
+    sucesiones geométricas (errores en cualquier potencia de h, no solo enteras).
+    Devuelve (estimaciones, errores).
+    """
+    estimaciones, errores = [], []
+    anterior, actual = np.zeros(len(s) + 1), s.copy()
+    for k in range(1, len(s)):
+        with np.errstate(all="ignore"):
+            siguiente = anterior[1:-1] + 1.0 / np.diff(actual)
+        if not np.all(np.isfinite(siguiente)):
+            # Diferencias nulas: la sucesión ya convergió en esta columna
+            break
+        anterior, actual = actual, siguiente
+        if k % 2 == 0:
+            estimaciones.append(actual[-1])
+            errores.append(_cambio(actual))
+    return estimaciones, errores
+
+
+def _diverge(s, tolerancia):
+    """
+    Signo (+1 o -1) si la sucesión crece sin límite, 0 si no: en la última
+    mitad los valores se alejan siempre en el mismo sentido y los incrementos
+    no se achican (en una sucesión convergente se achican geométricamente).
+    """
+    mitad = s[len(s) // 2:]
+    incrementos = np.diff(mitad)
+    signo = np.sign(incrementos[-1])
+    if signo == 0 or np.any(np.sign(incrementos) != signo) or np.any(np.sign(mitad) != signo):
+        return 0
+    if np.any(np.abs(incrementos[1:]) < 0.98 * np.abs(incrementos[:-1])):
+        return 0
+    if abs(mitad[-1] - mitad[0]) <= 10 * tolerancia * max(1.0, abs(mitad[-1])):
+        return 0
+    return int(signo)
+
+
+def _lado(s, tolerancia):
+    """
+    Límite de la sucesión s (valores de f cada vez más cerca del punto).
+    Devuelve un diccionario con tipo ("finito", "infinito", "no definido" o
+    "inconcluso"), valor y error.
+    """
+    finitos = np.isfinite(s)
+    # Solo cuenta el tramo final de valores finitos, el más cercano al punto
+    inicio = len(s) - np.argmin(finitos[::-1]) if not finitos.all() else 0
+    if len(s) - inicio < 4:
+        # Infinito cerca del punto pero no lejos de él (si es infinito en
+        # todos lados, es un desbordamiento y no dice nada del límite)
+        if np.isinf(s[-1]) and finitos.any():
+            return {"tipo": "infinito", "valor": float(s[-1]), "error": 0.0}
+        return {"tipo": "no definido", "valor": None, "error": None}
+    s = s[inicio:]
+
+    signo = _diverge(s, tolerancia)
+    if signo:
+        return {"tipo": "infinito", "valor": signo * np.inf, "error": 0.0}
+
+    estimaciones = [s[-1]]
+    errores = [_cambio(s)]
+    for metodo in (_richardson(s, RAZON), _wynn(s)):
+        estimaciones += metodo[0]
+        errores += metodo[1]
+    estimaciones, errores = np.array(estimaciones), np.array(errores)
+    validos = np.isfinite(estimaciones) & np.isfinite(errores)
+    if not validos.any():
+        return {"tipo": "inconcluso", "valor": None, "error": None}
+
+    mejor = np.flatnonzero(validos)[np.argmin(errores[validos])]
+    valor, error = float(estimaciones[mejor]), float(errores[mejor])
+    # El redondeo no permite garantizar menos que unas cuantas cifras
+    error = max(error, 1e-13 * max(1.0, abs(valor)))
+    if abs(valor) <= error:
+        valor = 0.0
+    tipo = "finito" if error <= tolerancia * max(1.0, abs(valor)) else "inconcluso"
+    return {"tipo": tipo, "valor": valor, "error": error}
+
+
+def estimar_limite(f, punto, tolerancia=1e-6, h0=None, pasos=PASOS):
+    """
+    Estimación numérica del límite de f cuando x tiende a `punto`.
+    - f : función vectorizada de NumPy
+    - tolerancia : error relativo máximo para aceptar una estimación
+    - h0 : primer paso (por defecto, 0.1 * max(1, |punto|))
+    - pasos : número de valores de cada lado (h0 * RAZON**k)
+
+    Devuelve un diccionario con "izquierda" y "derecha" (cada uno con tipo,
+    valor y error) y el resultado de ambos lados juntos, con tipo "finito",
+    "infinito", "no existe" (los límites laterales son distintos) o
+    "inconcluso", y su valor y error.
+    """
+    if h0 is None:
+        h0 = 0.1 * max(1.0, abs(punto))
+    h = h0 * RAZON ** np.arange(pasos)
+    # Ambos lados en una sola evaluación
+    valores = _evaluar(f, punto + np.concatenate((-h, h)))
+    izquierda = _lado(valores[:pasos], tolerancia)
+    derecha = _lado(valores[pasos:], tolerancia)
+
+    resultado = {"izquierda": izquierda, "derecha": derecha,
+                 "tipo": "inconcluso", "valor": None, "error": None}
+    tipos = {izquierda["tipo"], derecha["tipo"]}
+    if "inconcluso" in tipos or tipos == {"no definido"}:
+        return resultado
+    if "no definido" in tipos:
+        # Solo está definida de un lado: el límite es el de ese lado
+        lado = derecha if izquierda["tipo"] == "no definido" else izquierda
+        resultado.update(tipo=lado["tipo"], valor=lado["valor"], error=lado["error"])
+        return resultado
+
+    a, b = izquierda["valor"], derecha["valor"]
+    if tipos == {"finito"}:
+        error = izquierda["error"] + derecha["error"]
+        if abs(a - b) <= error + tolerancia * max(1.0, abs(a), abs(b)):
+            resultado.update(tipo="finito", valor=0.5 * (a + b), error=max(error, 0.5 * abs(a - b)))
+        else:
+            resultado["tipo"] = "no existe"
+    elif a == b:
+        resultado.update(tipo="infinito", valor=a, error=0.0)
+    else:
+        resultado["tipo"] = "no existe"
+    return resultado
@@ -0,0 +1,237 @@
+"""
+Evaluación por lotes, sin interfaz, de muchas expresiones (por ejemplo, las
+funciones entregadas por los estudiantes de un curso).
+
+Cada expresión pasa por el mismo proceso que en deri-app, racio-app y
+opti-app: se analiza, se deriva, se buscan sus puntos críticos y extremos en
+un intervalo y se muestrea su gráfica. Las expresiones se reparten entre
+procesos auxiliares (uno por núcleo, por defecto) con un tiempo límite por
+expresión; cada resultado se escribe como una línea JSON en cuanto está
+listo, y al final se imprime un resumen de rendimiento y latencias.
+
+Uso:
+    python lote.py entregas.jsonl -o resultados.jsonl --procesos 8 --limite 10
+
+La entrada es un archivo JSONL (un objeto por línea) o CSV, con la expresión
+en el campo "expresion" (se puede cambiar con --campo) y, opcionalmente, un
+identificador en el campo "id". Una línea del JSONL que no se puede leer no
+detiene el lote: queda en los resultados como un error con su número de línea.
+
+Por defecto el lote no usa la caché en disco de las apps (persistencia.py);
+con --cache se le puede dar un archivo propio.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from aislamiento import PoolAislado, TiempoAgotado
+
+
+def evaluar_expresion(texto, x_min, x_max, presupuesto):
+    """
+    Analiza, deriva y estudia una expresión. Se ejecuta en un proceso auxiliar.
+    """
+    from extremos import analizar_extremos
+    from muestreo import limites_y, muestrear_adaptativo
+    from simbolico import compilar
+
+    compiled = compilar(texto)
+    extremos = analizar_extremos(compiled.funcion(0), compiled.nucleo((1, 2)), x_min, x_max)
+    polos = compiled.polos()
+    x, y = muestrear_adaptativo(compiled.funcion(0), x_min, x_max,
+                                singularidades=polos, presupuesto=presupuesto)
+
+    return {
+        "funcion": str(compiled.expr),
+        "derivada": str(compiled.derivada(1)),
+        "segunda_derivada": str(compiled.derivada(2)),
+        "puntos_criticos": [
+            {"x": _numero(px), "y": _numero(py), "tipo": tipo}
+            for px, py, tipo in zip(extremos["x"], extremos["y"], extremos["tipo"])
+        ],
+        "maximo_global": _par(extremos["maximo_global"]),
+        "minimo_global": _par(extremos["minimo_global"]),
+        # Si la función no es finita o acotada en todo el intervalo, no hay
+        # extremos globales, y se dice por qué y dónde
+        "problema": extremos["problema"],
+        "subintervalos": [[_numero(a), _numero(b)] for a, b in extremos["subintervalos"]],
+        "polos": polos,
+        "muestras": int(np.count_nonzero(np.isfinite(y))),
+        "rango_y": [_numero(v) for v in limites_y(x, y, margen=0)],
+    }
+
+
+def preparar_proceso():
+    """
+    Importa en el proceso auxiliar los módulos de cálculo, para que ese costo
+    no se cuente en la latencia de la primera expresión.
+    """
+    import extremos, muestreo, simbolico  # noqa: F401
+
+
+def _numero(valor):
+    """
+    float de Python, o None si no es finito (JSON no admite NaN ni infinito).
+    """
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+def _par(punto):
+    return None if punto is None else [_numero(punto[0]), _numero(punto[1])]
+
+
+def leer_entradas(ruta, campo="expresion"):
+    """
+    Produce (identificador, expresion, error) por cada registro de un archivo
+    JSONL o CSV, sin cargarlo completo en memoria. Si un registro no tiene
+    "id", se usa su número de línea (de registro, en el CSV). Si una línea del
+    JSONL no es un objeto JSON, se produce (número de línea, la línea, mensaje
+    de error); en los demás casos el error es None.
+    """
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith(".csv"):
+            for numero, registro in enumerate(csv.DictReader(archivo), start=1):
+                yield registro.get("id", numero), registro.get(campo, ""), None
+            return
+
+        for numero, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError as e:
+                yield numero, linea.strip(), f"JSONDecodeError: línea {numero}: {e}"
+                continue
+            if not isinstance(registro, dict):
+                yield numero, linea.strip(), f"línea {numero}: se esperaba un objeto JSON"
+                continue
+            yield registro.get("id", numero), registro.get(campo, ""), None
+
+
+def procesar_lote(entradas, salida, procesos, limite_segundos, x_min, x_max, presupuesto):
+    """
+    Evalúa todas las entradas en un PoolAislado de `procesos` procesos y
+    escribe en `salida` una línea JSON por resultado, en el orden en que
+    terminan. Devuelve la lista de (estado, segundos) de cada expresión y los
+    segundos que tardaron en arrancar los procesos.
+    """
+    inicio = time.perf_counter()
+    pool = PoolAislado(tamano=procesos)
+    candado = threading.Lock()
+    registro = []
+
+    def escribir(resultado, estado, segundos):
+        # segundos es None para las líneas que no se pudieron leer
+        resultado["estado"] = estado
+        resultado["segundos"] = None if segundos is None else round(segundos, 6)
+        with candado:
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            salida.flush()
+            registro.append((estado, segundos))
+
+    def tarea(identificador, texto):
+        inicio = time.perf_counter()
+        resultado = {"id": identificador, "entrada": texto}
+        try:
+            resultado.update(pool.ejecutar(evaluar_expresion, texto, x_min, x_max, presupuesto,
+                                           limite_segundos=limite_segundos))
+            estado = "ok"
+        except TiempoAgotado:
+            estado = "tiempo_agotado"
+        except Exception as e:
+            estado = "error"
+            resultado["error"] = f"{type(e).__name__}: {e}"
+        escribir(resultado, estado, time.perf_counter() - inicio)
+
+    # Un hilo por proceso auxiliar; se mantienen a lo sumo 2 tareas en espera
+    # por proceso para no leer toda la entrada de golpe
+    with ThreadPoolExecutor(max_workers=procesos) as hilos:
+        # Cada llamada ocupa un proceso hasta terminar, así que se preparan todos
+        wait([hilos.submit(pool.ejecutar, preparar_proceso, limite_segundos=120)
+              for _ in range(procesos)])
+        arranque = time.perf_counter() - inicio
+
+        pendientes = set()
+        for identificador, texto, error in entradas:
+            if error is not None:
+                # La línea no se pudo leer: se anota sin ocupar un proceso
+                escribir({"id": identificador, "entrada": texto, "linea": identificador, "error": error},
+                         "error", None)
+                continue
+            if len(pendientes) >= 2 * procesos:
+                _, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            pendientes.add(hilos.submit(tarea, identificador, texto))
+        wait(pendientes)
+    return registro, arranque
+
+
+def resumen(registro, segundos_totales, arranque, procesos):
+    """
+    Texto con el rendimiento (expresiones por segundo) y las latencias. Las
+    líneas que no se pudieron leer cuentan como errores, pero no entran en el
+    rendimiento ni en las latencias.
+    """
+    estados = [estado for estado, _ in registro]
+    latencias = np.array([segundos for _, segundos in registro if segundos is not None])
+    ilegibles = len(registro) - len(latencias)
+    lineas = [
+        f"Expresiones: {len(registro)} (ok: {estados.count('ok')}, errores: {estados.count('error')}, "
+        f"tiempo agotado: {estados.count('tiempo_agotado')})"
+        + (f"; líneas ilegibles: {ilegibles}" if ilegibles else ""),
+        f"Tiempo total: {segundos_totales:.2f} s con {procesos} procesos "
+        f"(arranque de los procesos: {arranque:.2f} s)",
+    ]
+    if len(latencias):
+        p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+        lineas += [
+            f"Rendimiento: {len(latencias) / (segundos_totales - arranque):.1f} expresiones/s",
+            f"Latencia: p50 {p50 * 1e3:.1f} ms, p95 {p95 * 1e3:.1f} ms, "
+            f"p99 {p99 * 1e3:.1f} ms, máx {latencias.max() * 1e3:.1f} ms",
+        ]
+    return "\n".join(lineas)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Evalúa por lotes un archivo de expresiones.")
+    parser.add_argument("entrada", help="archivo JSONL o CSV con las expresiones")
+    parser.add_argument("-o", "--salida", help="archivo JSONL de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--campo", default="expresion", help="campo con la expresión (por defecto: expresion)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                        help="número de procesos auxiliares (por defecto, uno por núcleo)")
+    parser.add_argument("--limite", type=float, default=10.0,
+                        help="tiempo límite por expresión, en segundos (por defecto: 10)")
+    parser.add_argument("--x-min", type=float, default=-10.0, help="inicio del intervalo (por defecto: -10)")
+    parser.add_argument("--x-max", type=float, default=10.0, help="fin del intervalo (por defecto: 10)")
+    parser.add_argument("--presupuesto", type=int, default=400,
+                        help="evaluaciones para muestrear cada gráfica (por defecto: 400)")
+    parser.add_argument("--cache", default="",
+                        help="archivo SQLite para la caché de expresiones (por defecto, ninguno)")
+    args = parser.parse_args(argumentos)
+    if args.x_min >= args.x_max:
+        parser.error("--x-min debe ser menor que --x-max")
+
+    # Los procesos auxiliares heredan el entorno: nunca escriben en la caché
+    # de las apps, cuyo contenido se ejecuta en el servidor
+    os.environ["DERIVADA_CACHE"] = args.cache
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    inicio = time.perf_counter()
+    try:
+        registro, arranque = procesar_lote(leer_entradas(args.entrada, args.campo), salida, args.procesos,
+                                           args.limite, args.x_min, args.x_max, args.presupuesto)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    print(resumen(registro, time.perf_counter() - inicio, arranque, args.procesos), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Muestreo adaptativo de curvas para las gráficas.
+
+En lugar de una malla uniforme fija, se parte de una malla gruesa y se
+agregan puntos solo donde la curva se dobla, salta o deja de estar definida,
+sin pasar de un presupuesto total de evaluaciones. El dominio se corta en las
+singularidades conocidas (por ejemplo, las raíces del denominador de una
+función racional) y en los polos y saltos que se detectan, y en esos cortes
+se inserta un NaN para que matplotlib no una los dos lados con una línea
+vertical.
+
+Además, diezmar() reduce cualquier serie ya muestreada a unos dos puntos por
+columna de píxeles de la gráfica (el mínimo y el máximo de cada columna), de
+modo que dibujarla o enviarla al navegador no cuesta más por tener más
+muestras.
+"""
+import numpy as np
+
+# Media altura de la zona visible, en unidades de la altura "típica" de la curva
+BANDA_VISIBLE = 1.5
+# Columnas de píxeles de una gráfica mostrada a todo el ancho
+ANCHO_PIXELES = 1000
+
+
+def _evaluar(f, x):
+    """
+    Evalúa f en x y devuelve (y, varias_filas), con y siempre de forma
+    (k, len(x)). Acepta funciones que devuelven un escalar (expresiones
+    constantes) o varias filas a la vez (por ejemplo, f y f' de un mismo núcleo).
+    """
+    with np.errstate(all="ignore"):
+        y = np.asarray(f(x))
+    if np.iscomplexobj(y):
+        y = np.where(np.abs(y.imag) < 1e-12, y.real, np.nan)
+    y = np.asarray(y, dtype=float)
+    varias_filas = y.ndim > 1
+    if varias_filas:
+        y = np.broadcast_to(y, y.shape[:-1] + x.shape).reshape(-1, len(x))
+    else:
+        y = np.broadcast_to(y, x.shape)[None, :]
+    return np.array(y), varias_filas
+
+
+def _escala_y(x, y):
+    """
+    Centro y altura "típicos" de una fila de valores: percentiles 5 a 95 de
+    los valores finitos, pesando cada punto por el ancho de x que representa
+    (así los puntos agregados cerca de un polo no cambian la escala).
+    """
+    finitos = np.isfinite(y)
+    if not finitos.any():
+        return 0.0, 1.0
+    peso = np.gradient(x) if len(x) > 1 else np.ones_like(x)
+    valores, peso = y[finitos], peso[finitos]
+    orden = np.argsort(valores)
+    acumulado = np.cumsum(peso[orden])
+    acumulado /= acumulado[-1]
+    bajo, alto = np.interp([0.05, 0.95], acumulado, valores[orden])
+    altura = alto - bajo
+    if altura == 0:
+        altura = max(abs(alto), 1.0)
+    return 0.5 * (bajo + alto), altura
+
+
+def _normalizar(x, y):
+    """
+    Lleva cada fila de y a unidades de su altura típica, centradas en 0.
+    """
+    yn = np.empty_like(y)
+    for i, fila in enumerate(y):
+        centro, altura = _escala_y(x, fila)
+        yn[i] = (fila - centro) / altura
+    return yn
+
+
+def muestrear_adaptativo(f, x_min, x_max, singularidades=(), presupuesto=400,
+                         n_inicial=None, tolerancia=2e-3, max_iteraciones=30):
+    """
+    Muestrea f en [x_min, x_max] refinando donde hace falta.
+    - f : función vectorizada de NumPy; puede devolver varias filas
+    - singularidades : valores de x donde se sabe que f no está definida
+    - presupuesto : número máximo de evaluaciones de f
+    - n_inicial : puntos de la malla inicial (por defecto, un cuarto del presupuesto)
+    - tolerancia : desviación máxima, relativa a la altura de la gráfica,
+      entre la curva y la cuerda de dos segmentos vecinos
+
+    Devuelve (x, y); y tiene una fila por cada salida de f (o es 1-D si f
+    devuelve una sola) y contiene NaN en los cortes.
+    """
+    if n_inicial is None:
+        n_inicial = max(presupuesto // 4, 16)
+    ancho = x_max - x_min
+    # Más fino que un píxel en cualquier gráfica razonable
+    ancho_minimo = 1e-4 * ancho
+
+    # Tramos entre singularidades (se deja un pequeño margen a cada lado)
+    cortes = sorted(s for s in np.atleast_1d(singularidades) if x_min < s < x_max)
+    bordes = [x_min] + [c for s in cortes for c in (s - ancho_minimo, s + ancho_minimo)] + [x_max]
+    tramos = [(a, b) for a, b in zip(bordes[::2], bordes[1::2]) if b > a]
+
+    partes = []
+    for a, b in tramos:
+        n = max(int(round(n_inicial * (b - a) / ancho)), 3)
+        partes.append(np.linspace(a, b, n))
+    x = np.concatenate(partes)
+    tramo = np.concatenate([np.full(len(p), i) for i, p in enumerate(partes)])
+    y, varias_filas = _evaluar(f, x)
+    evaluaciones = len(x)
+
+    for _ in range(max_iteraciones):
+        restante = presupuesto - evaluaciones
+        if restante <= 0:
+            break
+
+        yn = _normalizar(x, y)
+        visible = np.abs(yn) <= BANDA_VISIBLE
+        refinable = (tramo[1:] == tramo[:-1]) & (np.diff(x) > 2 * ancho_minimo)
+
+        with np.errstate(all="ignore"):
+            # (1) Curvatura: distancia del punto central a la cuerda de sus vecinos
+            t = (x[1:-1] - x[:-2]) / (x[2:] - x[:-2])
+            desvio = np.abs(yn[:, 1:-1] - (yn[:, :-2] + t * (yn[:, 2:] - yn[:, :-2])))
+            desvio = np.where(visible[:, 1:-1], np.nan_to_num(desvio, nan=0.0), 0.0)
+            # (2) Saltos de más de un décimo de la altura con algún extremo visible
+            salto = np.abs(np.diff(yn, axis=1))
+            salto = np.where((visible[:, 1:] | visible[:, :-1]) & (salto > 0.1), salto, 0.0)
+        salto = np.nan_to_num(salto, nan=0.0, posinf=0.0)
+
+        prioridad = np.max(salto, axis=0)
+        desvio = np.max(desvio, axis=0)
+        prioridad[:-1] = np.maximum(prioridad[:-1], desvio)
+        prioridad[1:] = np.maximum(prioridad[1:], desvio)
+
+        # (3) Bordes del dominio de definición y (4) polos: la curva pasa de un
+        # lado de la zona visible al otro entre dos puntos consecutivos
+        finito = np.all(np.isfinite(y), axis=0)
+        prioridad[finito[1:] != finito[:-1]] = np.inf
+        prioridad[np.any(_cruza_banda(yn), axis=0)] = np.inf
+
+        prioridad[~refinable] = 0.0
+        candidatos = np.nonzero(prioridad > tolerancia)[0]
+        if candidatos.size == 0:
+            break
+        if candidatos.size > restante:
+            candidatos = candidatos[np.argsort(prioridad[candidatos])[::-1][:restante]]
+
+        x_nuevos = 0.5 * (x[candidatos] + x[candidatos + 1])
+        y_nuevos, _ = _evaluar(f, x_nuevos)
+        evaluaciones += len(x_nuevos)
+
+        x = np.insert(x, candidatos + 1, x_nuevos)
+        y = np.insert(y, candidatos + 1, y_nuevos, axis=1)
+        tramo = np.insert(tramo, candidatos + 1, tramo[candidatos])
+
+    # Cortes: cambios de tramo, polos, y saltos visibles que no se suavizaron
+    # al llegar al ancho mínimo (discontinuidades de salto)
+    yn = _normalizar(x, y)
+    visible = np.abs(yn) <= BANDA_VISIBLE
+    with np.errstate(all="ignore"):
+        salto = np.nan_to_num(np.abs(np.diff(yn, axis=1)), nan=0.0)
+    angosto = np.diff(x) <= 2 * ancho_minimo
+    salto_visible = np.any(visible[:, 1:] & visible[:, :-1] & (salto > 0.1), axis=0)
+    romper = ((tramo[1:] != tramo[:-1])
+              | np.any(_cruza_banda(yn), axis=0)
+              | (angosto & salto_visible))
+    indices = np.nonzero(romper)[0] + 1
+    x = np.insert(x, indices, 0.5 * (x[indices - 1] + x[indices]))
+    y = np.insert(y, indices, np.nan, axis=1)
+
+    if not varias_filas:
+        y = y[0]
+    return x, y
+
+
+def _cruza_banda(yn):
+    """
+    Segmentos con un extremo por encima de la zona visible y el otro por debajo.
+    """
+    arriba = yn > BANDA_VISIBLE
+    abajo = yn < -BANDA_VISIBLE
+    return (arriba[:, 1:] & abajo[:, :-1]) | (abajo[:, 1:] & arriba[:, :-1])
+
+
+def limites_y(x, y, margen=0.05):
+    """
+    Límites razonables para el eje y: los valores extremos si la curva es
+    acotada, o la zona visible alrededor de los valores típicos si hay
+    valores que se disparan (cerca de un polo), para que estos no aplasten
+    el resto. y puede tener varias filas.
+    """
+    y = np.atleast_2d(y)
+    bajos, altos = [], []
+    for fila in y:
+        finitos = fila[np.isfinite(fila)]
+        if finitos.size == 0:
+            continue
+        bajo, alto = finitos.min(), finitos.max()
+        centro, altura = _escala_y(x, fila)
+        if alto - bajo > 20 * altura:
+            bajo = centro - BANDA_VISIBLE * altura
+            alto = centro + BANDA_VISIBLE * altura
+        bajos.append(bajo)
+        altos.append(alto)
+    if not bajos:
+        return -1.0, 1.0
+    bajo, alto = min(bajos), max(altos)
+    espacio = margen * (alto - bajo) if alto > bajo else 1.0
+    return bajo - espacio, alto + espacio
+
+
+def diezmar(x, y, ancho_pixeles=ANCHO_PIXELES, rango=None):
+    """
+    Reduce una serie a unos 2 puntos por columna de píxeles sin cambiar su
+    dibujo: en cada columna se conservan los puntos donde cada fila de y toma
+    su mínimo y su máximo, y además los extremos de la serie y los puntos no
+    finitos con sus vecinos (los cortes de la curva en polos y saltos).
+    - x : valores crecientes
+    - y : una fila o varias con los mismos x (por ejemplo, f y f')
+    - rango : (x_min, x_max) que ocupa el ancho de la gráfica; por defecto,
+      el de x. Con un rango dado siempre se devuelven copias, lo que permite
+      diezmar por bloques una serie que no cabe en memoria.
+
+    Si la serie ya tiene pocos puntos se devuelve tal cual.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    filas = np.atleast_2d(y)
+    n = len(x)
+    if rango is None:
+        if n <= 2 * ancho_pixeles:
+            return x, y
+        rango = (x[0], x[-1])
+    x_min, x_max = rango
+    if n == 0 or not x_max > x_min:
+        return x.copy(), y.copy()
+
+    columna = ((x - x_min) * (ancho_pixeles / (x_max - x_min))).astype(np.int64)
+    columna = np.clip(columna, 0, ancho_pixeles - 1)
+    finito = np.all(np.isfinite(filas), axis=0)
+
+    # Grupos de puntos consecutivos en la misma columna y del mismo lado de un corte
+    nuevo_grupo = np.ones(n, dtype=bool)
+    nuevo_grupo[1:] = (columna[1:] != columna[:-1]) | (finito[1:] != finito[:-1])
+    inicios = np.flatnonzero(nuevo_grupo)
+    grupo = np.cumsum(nuevo_grupo) - 1
+
+    conservar = ~finito
+    conservar[[0, -1]] = True
+    conservar[:-1] |= ~finito[1:]
+    conservar[1:] |= ~finito[:-1]
+    for fila in filas:
+        for signo in (1.0, -1.0):
+            valores = np.where(np.isfinite(fila), signo * fila, np.inf)
+            extremo = np.minimum.reduceat(valores, inicios)
+            candidatos = np.flatnonzero(valores == extremo[grupo])
+            # El primero de cada grupo (en un tramo constante todos empatan)
+            _, primeros = np.unique(grupo[candidatos], return_index=True)
+            conservar[candidatos[primeros]] = True
+
+    indices = np.flatnonzero(conservar)
+    return x[indices], (filas[:, indices] if y.ndim > 1 else filas[0, indices])
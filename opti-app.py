@@ -1,37 +1,111 @@
 import streamlit as st
 import sympy as sp
 import numpy as np
-import matplotlib.pyplot as plt
+from simbolico import compilar
+from aislamiento import TiempoAgotado, puntos_criticos_aislados
+from extremos import analizar_extremos
+from figuras import crear_figura, figura_de_sesion, mostrar, mostrar_estadisticas_memoria
 
-def plot_function_and_critical_points(expr, x_range=(-10, 10)):
+def find_critical_points(compiled):
     """
-    Function to plot a given expression and its critical points over a specified range.
+    Real solutions of f'(x) = 0, computed once per expression in a separate
+    process with a deadline. Returns None if solveset took too long.
     """
-    x = sp.symbols('x')
-    func = sp.lambdify(x, expr, "numpy")
-    derivative = sp.diff(expr, x)
-    deriv_func = sp.lambdify(x, derivative, "numpy")
+    def solve():
+        try:
+            return puntos_criticos_aislados(compiled.expr, compiled.variable)
+        except TiempoAgotado:
+            return None
 
+    return compiled.memo("critical_points", solve)
+
+def find_extrema(compiled, x_range):
+    """
+    Critical points and global extrema of f on x_range, found numerically from a
+    Chebyshev interpolant (bounded cost for any expression). Cached per interval
+    in a bounded cache shared by all sessions.
+    """
+    x_min, x_max = x_range
+    return compiled.memo_acotado(
+        ("extrema", x_min, x_max),
+        lambda: analizar_extremos(compiled.funcion(0), compiled.nucleo((1, 2)), x_min, x_max),
+    )
+
+def build_plot():
+    """
+    Figure of f and its critical points for this session; later reruns only
+    update its data.
+    """
+    fig = crear_figura(figsize=(10, 6))
+    ax = fig.add_subplot()
+    line_f, = ax.plot([], [])
+    points = ax.scatter([], [], color="red", label="Puntos críticos")
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.axvline(0, color="black", linewidth=0.8)
+    ax.set_title("Función y puntos críticos")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.grid()
+    return fig, (ax, line_f, points)
+
+def plot_function_and_critical_points(compiled, extrema, x_range=(-10, 10)):
+    """
+    Function to plot a compiled expression and its critical points over a specified range.
+    """
+    expr = compiled.expr
+
+    # Las muestras se guardan por expresión y rango (en una caché acotada)
     x_vals = np.linspace(x_range[0], x_range[1], 500)
-    y_vals = func(x_vals)
-    dy_vals = deriv_func(x_vals)
-
-    # Find critical points
-    critical_points = sp.solveset(derivative, x, domain=sp.S.Reals)
-    critical_points_numeric = [float(p) for p in critical_points if p.is_real]
-    critical_y_vals = [func(p) for p in critical_points_numeric]
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, y_vals, label=f"f(x) = {expr}")
-    plt.scatter(critical_points_numeric, critical_y_vals, color="red", label="Puntos críticos")
-    plt.axhline(0, color="black", linewidth=0.8)
-    plt.axvline(0, color="black", linewidth=0.8)
-    plt.title("Función y puntos críticos")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.legend()
-    plt.grid()
-    st.pyplot(plt)
+    y_vals = compiled.memo_acotado(("samples_f", tuple(x_range)), lambda: compiled.nucleo((0,))(x_vals)[0])
+
+    fig, (ax, line_f, points) = figura_de_sesion("opti", build_plot)
+    line_f.set_data(x_vals, y_vals)
+    line_f.set_label(f"f(x) = {expr}")
+    points.set_offsets(np.column_stack((extrema["x"], extrema["y"])))
+    ax.relim()
+    ax.autoscale_view()
+    ax.legend()
+    mostrar(fig)
+
+@st.fragment
+def interval_section(compiled):
+    """
+    Interval inputs, numeric critical points and plot. As a fragment, editing
+    the interval reruns only this section, not the parsing, differentiation,
+    LaTeX and symbolic solution above it.
+    """
+    st.write("Selecciona el intervalo de valores de x donde buscar los puntos críticos.")
+    x_min = st.number_input("Valor mínimo de x", value=-10.0, key="x_min")
+    x_max = st.number_input("Valor máximo de x", value=10.0, key="x_max")
+
+    if x_min >= x_max:
+        st.error("El valor mínimo de x debe ser menor que el máximo.")
+        return
+
+    try:
+        # Calcula los puntos críticos en el intervalo y su tipo, todos a la vez
+        extrema = find_extrema(compiled, (x_min, x_max))
+
+        st.write("### Puntos críticos y su tipo:")
+        if len(extrema["x"]) == 0:
+            st.write("No se encontraron puntos críticos en el intervalo.")
+        for point, value, p_type in zip(extrema["x"], extrema["y"], extrema["tipo"]):
+            st.write(f"x ≈ {point:.6g} (f(x) ≈ {value:.6g}): {p_type}")
+
+        if extrema["problema"] is not None:
+            st.write("### Extremos globales en el intervalo:")
+            start, end = extrema["subintervalos"][0]
+            where = f"en x ≈ {start:.4g}" if start == end else f"entre x ≈ {start:.4g} y x ≈ {end:.4g}"
+            st.warning(f"No hay máximo ni mínimo global: f(x) {extrema['problema']} (por ejemplo, {where}).")
+        elif extrema["maximo_global"] is not None:
+            st.write("### Extremos globales en el intervalo:")
+            st.write("Máximo: x ≈ {:.6g}, f(x) ≈ {:.6g}".format(*extrema["maximo_global"]))
+            st.write("Mínimo: x ≈ {:.6g}, f(x) ≈ {:.6g}".format(*extrema["minimo_global"]))
+
+        st.subheader("Gráfica de la función y puntos críticos")
+        plot_function_and_critical_points(compiled, extrema, (x_min, x_max))
+    except Exception as e:
+        st.error(f"Error al analizar la función en el intervalo: {e}")
 
 # Configuración básica de Streamlit
 st.title("Problemas de optimización usando cálculo diferencial")
@@ -44,50 +118,31 @@ func_input = st.text_input("Función en términos de x (ejemplo: x**3 - 6*x**2 +
 if func_input:
     try:
         # Define la variable simbólica y la función
-        x = sp.symbols('x')
-        func = sp.sympify(func_input)
-
-        # Calcula la derivada y puntos críticos
-        derivative = sp.diff(func, x)
-        critical_points = sp.solveset(derivative, x, domain=sp.S.Reals)
-
-        # Verifica el tipo de cada punto crítico
-        second_derivative = sp.diff(derivative, x)
-        critical_point_types = []
-        for point in critical_points:
-            if point.is_real:
-                second_derivative_value = second_derivative.subs(x, point)
-                if second_derivative_value > 0:
-                    critical_point_types.append((point, "Mínimo"))
-                elif second_derivative_value < 0:
-                    critical_point_types.append((point, "Máximo"))
-                else:
-                    critical_point_types.append((point, "Punto de inflexión"))
+        compiled = compilar(func_input)
 
         # Muestra los resultados
         st.subheader("Resultados")
-        st.latex(f"f(x) = {sp.latex(func)}")
-        st.latex(f"f'(x) = {sp.latex(derivative)}")
-        st.latex(f"f''(x) = {sp.latex(second_derivative)}")
-
-        st.write("### Puntos críticos y su tipo:")
-        for point, p_type in critical_point_types:
-            st.write(f"x = {point}: {p_type}")
+        st.latex(f"f(x) = {compiled.latex(0)}")
+        st.latex(f"f'(x) = {compiled.latex(1)}")
+        st.latex(f"f''(x) = {compiled.latex(2)}")
 
-        # Selección del rango para graficar
-        st.subheader("Gráfica de la función y puntos críticos")
-        st.write("Selecciona el rango de valores de x para graficar.")
-        x_min = st.number_input("Valor mínimo de x", value=-10.0)
-        x_max = st.number_input("Valor máximo de x", value=10.0)
+        # Solución exacta con solveset, solo si se pide (puede tardar)
+        if st.checkbox("Mostrar los puntos críticos exactos (cálculo simbólico)"):
+            critical_points = find_critical_points(compiled)
+            if critical_points is None:
+                st.warning("Encontrar los puntos críticos de forma simbólica es demasiado costoso "
+                           "para esta función.")
+            else:
+                st.latex(f"f'(x) = 0 \\iff x \\in {sp.latex(critical_points)}")
 
-        if x_min < x_max:
-            plot_function_and_critical_points(func, (x_min, x_max))
-        else:
-            st.error("El valor mínimo de x debe ser menor que el máximo.")
+        # Puntos críticos en el intervalo y gráfica (se recalculan solos al cambiar el intervalo)
+        interval_section(compiled)
 
         # Explicación adicional
         st.subheader("Explicación paso a paso")
         st.write("1. Deriva la función para encontrar los puntos críticos (donde f'(x) = 0).\n"
+                 "   Aquí se hace de forma numérica: f se aproxima en el intervalo por un\n"
+                 "   polinomio de Chebyshev y se buscan todas las raíces de su derivada.\n"
                  "2. Usa la segunda derivada para determinar el tipo de cada punto crítico:\n"
                  "   - Si f''(x) > 0 en el punto, es un mínimo.\n"
                  "   - Si f''(x) < 0 en el punto, es un máximo.\n"
@@ -95,3 +150,5 @@ if func_input:
 
     except Exception as e:
         st.error(f"Error al procesar la función: {e}")
+
+mostrar_estadisticas_memoria()
@@ -1,6 +1,6 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
 
 # Título de la aplicación
 st.title("Concepto de Pendiente y Derivada")
@@ -44,7 +44,8 @@ segundo_y = calcular_funcion(segundo_x)
 pendiente = (segundo_y - punto_y) / (segundo_x - punto_x)
 
 # Visualización de la curva, puntos y pendiente
-fig, ax = plt.subplots(figsize=(8, 6))
+fig = crear_figura(figsize=(8, 6))
+ax = fig.subplots()
 ax.plot(x, y, label=f"{funcion}", color="blue")
 ax.scatter([punto_x, segundo_x], [punto_y, segundo_y], color="red", label="Puntos seleccionados")
 ax.plot([punto_x, segundo_x], [punto_y, segundo_y], color="green", linestyle="--", label=f"Secante: pendiente = {pendiente:.2f}")
@@ -55,7 +56,7 @@ ax.legend()
 ax.grid()
 
 # Mostrar la gráfica
-st.pyplot(fig)
+mostrar(fig)
 
 # Paso 4: Introducción al límite
 st.markdown("""
@@ -70,7 +71,8 @@ segundo_y_reducido = calcular_funcion(segundo_x_reducido)
 pendiente_reducida = (segundo_y_reducido - punto_y) / (segundo_x_reducido - punto_x)
 
 # Gráfica con h reducido
-fig2, ax2 = plt.subplots(figsize=(8, 6))
+fig2 = crear_figura(figsize=(8, 6))
+ax2 = fig2.subplots()
 ax2.plot(x, y, label=f"{funcion}", color="blue")
 ax2.scatter([punto_x, segundo_x_reducido], [punto_y, segundo_y_reducido], color="orange", label="Puntos con h reducido")
 ax2.plot([punto_x, segundo_x_reducido], [punto_y, segundo_y_reducido], color="purple", linestyle="--", label=f"Pendiente aproximada = {pendiente_reducida:.2f}")
@@ -81,7 +83,7 @@ ax2.legend()
 ax2.grid()
 
 # Mostrar la segunda gráfica
-st.pyplot(fig2)
+mostrar(fig2)
 
 # Conclusión
 st.markdown("""
@@ -0,0 +1,251 @@
+"""
+Caché en disco de expresiones compiladas, compartida por todos los procesos
+del servidor (y por los que arrancan en frío).
+
+Se guarda en un archivo SQLite el estado de cada ExpresionCompilada (la
+expresión y sus derivadas serializadas, su LaTeX, el código fuente de sus
+núcleos de NumPy y sus polos), indexado por un hash de su forma canónica
+(srepr) y de las versiones de Python, SymPy y NumPy, y además el texto que
+escribió el usuario asociado a ese hash. Así otro proceso puede recuperar la
+expresión sin volver a llamar a sympify, diff, latex ni al generador de
+código. Las entradas que llevan mucho tiempo sin usarse se borran, y si el
+archivo pasa de un tamaño máximo se borran las usadas hace más tiempo.
+
+Lo guardado se deserializa con pickle y el código de los núcleos se ejecuta,
+así que quien pueda escribir el archivo puede ejecutar código en las apps. Por
+eso el archivo va, por defecto, en un directorio privado del usuario (no en el
+de las apps, que el servidor publica), y solo se usa si el archivo y su
+directorio son del usuario del proceso y nadie más puede escribir en ellos.
+
+Si el archivo está bloqueado por otro proceso, la operación se omite y se
+vuelve a intentar en la siguiente; cualquier otro error del disco (archivo
+de solo lectura o dañado, o escribible por otros usuarios) desactiva la
+caché en disco sin afectar a las apps.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import stat
+import sys
+import threading
+import time
+
+import numpy as np
+import sympy as sp
+
+RUTA_CACHE = os.environ.get(
+    "DERIVADA_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "derivada-app", "cache_expresiones.sqlite"),
+)
+# Subir este número al cambiar el formato de lo que se guarda
+VERSION_CACHE = 1
+TAMANO_MAXIMO = 64 * 2**20
+EDAD_MAXIMA = 30 * 24 * 3600
+# Cada cuántas escrituras se revisa si hay que desalojar entradas
+ESCRITURAS_POR_DESALOJO = 100
+# Segundos que se espera a que otro proceso libere el archivo
+ESPERA_BLOQUEO = 5
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS expresiones (
+    clave TEXT PRIMARY KEY,
+    datos BLOB NOT NULL,
+    tamano INTEGER NOT NULL,
+    usado REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS textos (
+    clave TEXT PRIMARY KEY,
+    expresion TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expresiones_usado ON expresiones (usado);
+"""
+
+
+def _privado(ruta):
+    """
+    True si `ruta` no existe todavía, o es del usuario del proceso (o de
+    root) y ni el grupo ni los demás pueden escribir en ella (en sistemas sin
+    usuarios POSIX no se revisa).
+    """
+    if not hasattr(os, "getuid"):
+        return True
+    try:
+        datos = os.stat(ruta)
+    except FileNotFoundError:
+        return True
+    return datos.st_uid in (os.getuid(), 0) and not datos.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _bloqueada(error):
+    """
+    True si el error de SQLite es pasajero: la base de datos estaba ocupada o
+    bloqueada por otra conexión.
+    """
+    codigo = getattr(error, "sqlite_errorcode", None)
+    if codigo is not None:
+        # Los códigos extendidos (SQLITE_BUSY_SNAPSHOT, ...) guardan el
+        # código principal en el byte bajo
+        return codigo & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class CachePersistente:
+    """
+    Almacén SQLite de estados de ExpresionCompilada.
+    """
+
+    def __init__(self, ruta=RUTA_CACHE, tamano_maximo=TAMANO_MAXIMO, edad_maxima=EDAD_MAXIMA):
+        self.ruta = ruta
+        self.tamano_maximo = tamano_maximo
+        self.edad_maxima = edad_maxima
+        # DERIVADA_CACHE="" desactiva la caché en disco
+        self.activa = bool(ruta)
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.desalojos = 0
+        self.bloqueos = 0
+        self._versiones = (f"{VERSION_CACHE}|{sys.version_info[0]}.{sys.version_info[1]}"
+                           f"|{sp.__version__}|{np.__version__}")
+        self._candado = threading.Lock()
+        self._preparada = False
+
+    def clave(self, *partes):
+        """
+        Hash de las partes junto con las versiones de las bibliotecas.
+        """
+        texto = "\0".join(map(str, partes + (self._versiones,)))
+        return hashlib.sha256(texto.encode()).hexdigest()
+
+    def _conectar(self):
+        if not self._preparada:
+            directorio = os.path.dirname(os.path.abspath(self.ruta))
+            os.makedirs(directorio, mode=0o700, exist_ok=True)
+            if not (_privado(directorio) and _privado(self.ruta)):
+                raise PermissionError(f"otros usuarios pueden escribir en {self.ruta}")
+            if not os.path.exists(self.ruta):
+                # SQLite lo crearía con la máscara del proceso, que puede
+                # dejarlo escribible por el grupo
+                os.close(os.open(self.ruta, os.O_CREAT | os.O_WRONLY, 0o600))
+        conexion = sqlite3.connect(self.ruta, timeout=ESPERA_BLOQUEO)
+        if not self._preparada:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.executescript(_ESQUEMA)
+            self._preparada = True
+        return conexion
+
+    def _usar(self, operacion):
+        """
+        Ejecuta operacion(conexion) en una transacción. Si el disco falla,
+        devuelve None; salvo que el archivo solo estuviera bloqueado, además
+        desactiva la caché.
+        """
+        if not self.activa:
+            return None
+        try:
+            with self._candado:
+                conexion = self._conectar()
+                try:
+                    with conexion:
+                        return operacion(conexion)
+                finally:
+                    conexion.close()
+        except sqlite3.Error as error:
+            if _bloqueada(error):
+                self.bloqueos += 1
+            else:
+                self.activa = False
+            return None
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            self.activa = False
+            return None
+
+    def buscar(self, clave_expresion):
+        """
+        Estado guardado bajo `clave_expresion`, o None.
+        """
+        def operacion(conexion):
+            fila = conexion.execute("SELECT datos FROM expresiones WHERE clave = ?",
+                                    (clave_expresion,)).fetchone()
+            if fila is None:
+                return None
+            conexion.execute("UPDATE expresiones SET usado = ? WHERE clave = ?",
+                             (time.time(), clave_expresion))
+            return pickle.loads(fila[0])
+
+        estado = self._usar(operacion)
+        if estado is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return estado
+
+    def buscar_texto(self, texto, variable):
+        """
+        (clave_expresion, estado) de lo guardado para el texto tal como lo
+        escribió el usuario, o None.
+        """
+        fila = self._usar(lambda conexion: conexion.execute(
+            "SELECT expresion FROM textos WHERE clave = ?", (self.clave(texto, variable),)
+        ).fetchone())
+        if fila is None:
+            self.fallos += 1
+            return None
+        estado = self.buscar(fila[0])
+        return None if estado is None else (fila[0], estado)
+
+    def asociar_texto(self, texto, variable, clave_expresion):
+        self._usar(lambda conexion: conexion.execute(
+            "INSERT OR REPLACE INTO textos (clave, expresion) VALUES (?, ?)",
+            (self.clave(texto, variable), clave_expresion),
+        ))
+
+    def guardar(self, clave_expresion, estado):
+        datos = pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL)
+        self._usar(lambda conexion: conexion.execute(
+            "INSERT OR REPLACE INTO expresiones (clave, datos, tamano, usado) VALUES (?, ?, ?, ?)",
+            (clave_expresion, datos, len(datos), time.time()),
+        ))
+        self.escrituras += 1
+        if self.escrituras % ESCRITURAS_POR_DESALOJO == 1:
+            self.desalojar()
+
+    def desalojar(self):
+        """
+        Borra las entradas sin usar desde hace más de edad_maxima segundos y,
+        si aún se pasa de tamano_maximo bytes, las usadas hace más tiempo.
+        """
+        def operacion(conexion):
+            borradas = conexion.execute("DELETE FROM expresiones WHERE usado < ?",
+                                        (time.time() - self.edad_maxima,)).rowcount
+            total = conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM expresiones").fetchone()[0]
+            if total > self.tamano_maximo:
+                # Se deja un margen del 10 % para no desalojar en cada escritura
+                sobrante = total - 0.9 * self.tamano_maximo
+                claves, acumulado = [], 0
+                for clave, tamano in conexion.execute(
+                        "SELECT clave, tamano FROM expresiones ORDER BY usado"):
+                    if acumulado >= sobrante:
+                        break
+                    claves.append((clave,))
+                    acumulado += tamano
+                conexion.executemany("DELETE FROM expresiones WHERE clave = ?", claves)
+                borradas += len(claves)
+            conexion.execute("DELETE FROM textos WHERE expresion NOT IN (SELECT clave FROM expresiones)")
+            return borradas
+
+        self.desalojos += self._usar(operacion) or 0
+
+    def estadisticas(self):
+        return {
+            "activa": self.activa,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "escrituras": self.escrituras,
+            "desalojos": self.desalojos,
+            "bloqueos": self.bloqueos,
+            "ruta": self.ruta,
+        }
@@ -1,6 +1,7 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
+from graficas import mostrar_grafica, usar_graficas_vectoriales
 
 # ===============================================
 # FUNCIONES DEL MODELO
@@ -118,29 +119,40 @@ theta_vals = np.linspace(0.01, 6.28, 300)  # de 0.01 a ~ 2π
 r_vals = PERIM_FIXED / (theta_vals + 2)
 area_vals = 0.5 * r_vals**2 * theta_vals
 
-fig, ax = plt.subplots(figsize=(6,4))
-ax.plot(theta_vals, area_vals, label="Área A(θ)")
-ax.set_xlabel(r"Ángulo θ (rad)")
-ax.set_ylabel(r"Área de la rebanada (cm²)")
-ax.set_title("A(θ) = (1/2) * [r(θ)]^2 * θ,   con   r(θ)·(θ+2) = 32 cm")
-ax.grid(True)
-
 # Punto máximo teórico (θ=2)
 theta_opt = 2.0
 r_opt = PERIM_FIXED/(theta_opt + 2.0)  # = 8
 area_opt = 0.5 * (r_opt**2) * theta_opt
 
-ax.axvline(theta_opt, color="red", linestyle="--", label="θ óptimo = 2 rad")
-ax.plot(theta_opt, area_opt, 'ro')
+if usar_graficas_vectoriales():
+    # El navegador dibuja la curva, la recta del óptimo y los puntos
+    puntos = [(theta_opt, area_opt, "Área máxima")]
+    if r_calc > 0:
+        puntos.append((theta, 0.5 * (r_calc**2) * theta, "θ actual"))
+    mostrar_grafica([{"nombre": "Área A(θ)", "x": theta_vals, "y": area_vals}],
+                    titulo="A(θ) = (1/2) * [r(θ)]^2 * θ,   con   r(θ)·(θ+2) = 32 cm",
+                    eje_x="Ángulo θ (rad)", eje_y="Área de la rebanada (cm²)",
+                    verticales=[(theta_opt, "θ óptimo = 2 rad")], puntos=puntos, alto=320)
+else:
+    fig = crear_figura(figsize=(6,4))
+    ax = fig.subplots()
+    ax.plot(theta_vals, area_vals, label="Área A(θ)")
+    ax.set_xlabel(r"Ángulo θ (rad)")
+    ax.set_ylabel(r"Área de la rebanada (cm²)")
+    ax.set_title("A(θ) = (1/2) * [r(θ)]^2 * θ,   con   r(θ)·(θ+2) = 32 cm")
+    ax.grid(True)
+
+    ax.axvline(theta_opt, color="red", linestyle="--", label="θ óptimo = 2 rad")
+    ax.plot(theta_opt, area_opt, 'ro')
 
-# Punto actual según slider
-if r_calc > 0:
-    curr_area = 0.5 * (r_calc**2) * theta
-    ax.plot(theta, curr_area, 'go', label="θ actual")
+    # Punto actual según slider
+    if r_calc > 0:
+        curr_area = 0.5 * (r_calc**2) * theta
+        ax.plot(theta, curr_area, 'go', label="θ actual")
 
-ax.legend()
+    ax.legend()
 
-st.pyplot(fig)
+    mostrar(fig)
 
 st.markdown(
     r"""
@@ -0,0 +1,63 @@
+"""
+Punto de entrada único: todas las apps como páginas de un mismo servidor.
+
+    streamlit run principal.py
+
+Cada app sigue siendo su propio script y tiene su propia dirección
+(por ejemplo, /deri-app o /tiro_parabolico), pero todas corren en un solo
+proceso: NumPy, SymPy, Matplotlib y SciPy se importan una sola vez, y las
+cachés compartidas (expresiones compiladas, figuras, el pool de procesos
+auxiliares de aislamiento.py) sirven a todas las páginas. Cada script se
+puede seguir ejecutando por separado con streamlit run.
+"""
+import streamlit as st
+
+# (archivo, título en el menú, dirección)
+SECCIONES = {
+    "Cálculo diferencial": [
+        ("deri-app.py", "Derivadas de funciones algebraicas", "deri-app"),
+        ("racio-app.py", "Derivadas de funciones racionales", "racio-app"),
+        ("pendiente.py", "Pendiente y derivada", "pendiente"),
+        ("deri-tabla.py", "Pendiente en un punto (tabla)", "deri-tabla"),
+        ("limite-app.py", "Límites", "limite-app"),
+        ("asintotas.py", "Asíntotas", "asintotas"),
+        ("opti-app.py", "Optimización", "opti-app"),
+    ],
+    "Óptimos en la vida real": [
+        ("pizza-app.py", "Rebanada de pizza (pulgadas)", "pizza-app"),
+        ("pizza_metrico_app.py", "Rebanada de pizza (cm)", "pizza_metrico_app"),
+        ("aves-app.py", "Aves y aviones", "aves-app"),
+    ],
+    "Física": [
+        ("tiro_parabolico.py", "Tiro parabólico", "tiro_parabolico"),
+        ("snell-app.py", "Reflexión y refracción", "snell-app"),
+        ("cuerpo_negro_app.py", "Cuerpo negro", "cuerpo_negro_app"),
+        ("campo_dipolo_app.py", "Campo de un dipolo", "campo_dipolo_app"),
+        ("esfericos-app.py", "Armónicos esféricos", "esfericos-app"),
+    ],
+}
+
+
+def inicio():
+    """
+    Página principal: enlaces a todas las apps, por sección.
+    """
+    st.title("Apps de cálculo y física")
+    st.write("Elige una app en el menú o en la lista de abajo.")
+    for seccion, paginas in SECCIONES.items():
+        st.subheader(seccion)
+        for archivo, titulo, _ in paginas:
+            st.page_link(archivo, label=titulo)
+
+
+# El interruptor de gráficas interactivas es un widget de cada página; sin
+# esto, Streamlit borraría su valor al pasar a una página que no lo tiene
+if "graficas_vectoriales" in st.session_state:
+    st.session_state.graficas_vectoriales = st.session_state.graficas_vectoriales
+
+paginas = {"": [st.Page(inicio, title="Inicio", url_path="inicio", default=True)]}
+for seccion, lista in SECCIONES.items():
+    paginas[seccion] = [st.Page(archivo, title=titulo, url_path=direccion)
+                        for archivo, titulo, direccion in lista]
+
+st.navigation(paginas).run()
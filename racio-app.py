@@ -1,31 +1,81 @@
 import streamlit as st
-import sympy as sp
 import numpy as np
-import matplotlib.pyplot as plt
+from simbolico import compilar
+from muestreo import limites_y, muestrear_adaptativo
+from figuras import crear_figura, figura_de_sesion, mostrar, mostrar_estadisticas_memoria
+from graficas import mostrar_grafica, usar_graficas_vectoriales
 
-def plot_function_and_derivative(expr, derivative_expr, x_range=(-10, 10)):
+def build_plot():
     """
-    Function to plot a given expression and its derivative over a specified range.
+    Figure of f and f' for this session; later reruns only update its data.
     """
-    x = sp.symbols('x')
-    func = sp.lambdify(x, expr, "numpy")
-    deriv = sp.lambdify(x, derivative_expr, "numpy")
-
-    x_vals = np.linspace(x_range[0], x_range[1], 500)
-    y_vals = func(x_vals)
-    dy_vals = deriv(x_vals)
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, y_vals, label=f"f(x) = {expr}")
-    plt.plot(x_vals, dy_vals, label=f"f'(x) = {derivative_expr}", linestyle="--")
-    plt.axhline(0, color="black", linewidth=0.8)
-    plt.axvline(0, color="black", linewidth=0.8)
-    plt.title("Función racional y su derivada")
-    plt.xlabel("x")
-    plt.ylabel("y")
-    plt.legend()
-    plt.grid()
-    st.pyplot(plt)
+    fig = crear_figura(figsize=(10, 6))
+    ax = fig.add_subplot()
+    line_f, = ax.plot([], [])
+    line_df, = ax.plot([], [], linestyle="--")
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.axvline(0, color="black", linewidth=0.8)
+    ax.set_title("Función racional y su derivada")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.grid()
+    return fig, (ax, line_f, line_df)
+
+def plot_function_and_derivative(compiled, x_range=(-10, 10), vector=False):
+    """
+    Function to plot a compiled expression and its derivative over a specified range.
+    With vector=True the chart is drawn in the browser, with the poles as asymptotes.
+    """
+    expr = compiled.expr
+    derivative_expr = compiled.derivada(1)
+
+    # Las muestras se guardan por expresión y rango (en una caché acotada)
+    x_vals, (y_vals, dy_vals) = compiled.memo_acotado(
+        ("samples_f_df", tuple(x_range)),
+        lambda: muestrear_adaptativo(
+            compiled.nucleo((0, 1)), x_range[0], x_range[1], singularidades=compiled.polos()
+        ),
+    )
+
+    if vector:
+        mostrar_grafica(
+            [{"nombre": f"f(x) = {expr}", "x": x_vals, "y": y_vals},
+             {"nombre": f"f'(x) = {derivative_expr}", "x": x_vals, "y": dy_vals, "discontinua": True}],
+            titulo="Función racional y su derivada",
+            verticales=[(0, None)] + [(p, f"Asíntota x = {p:g}") for p in compiled.polos()
+                                      if x_range[0] <= p <= x_range[1]],
+            horizontales=[(0, None)],
+            limites_y=limites_y(x_vals, [y_vals, dy_vals]),
+        )
+        return
+
+    fig, (ax, line_f, line_df) = figura_de_sesion("racio", build_plot)
+    line_f.set_data(x_vals, y_vals)
+    line_f.set_label(f"f(x) = {expr}")
+    line_df.set_data(x_vals, dy_vals)
+    line_df.set_label(f"f'(x) = {derivative_expr}")
+    ax.set_xlim(x_range[0], x_range[1])
+    ax.set_ylim(*limites_y(x_vals, [y_vals, dy_vals]))
+    ax.legend()
+    mostrar(fig)
+
+@st.fragment
+def plot_section(compiled, vector=False):
+    """
+    Range inputs and plot. As a fragment, editing the range reruns only this
+    section, not the parsing, differentiation and LaTeX above it.
+    """
+    st.write("Selecciona el rango de valores de x para graficar.")
+    x_min = st.number_input("Valor mínimo de x", value=-10.0, key="x_min")
+    x_max = st.number_input("Valor máximo de x", value=10.0, key="x_max")
+
+    if x_min < x_max:
+        try:
+            plot_function_and_derivative(compiled, (x_min, x_max), vector)
+        except Exception as e:
+            st.error(f"Error al graficar la función: {e}")
+    else:
+        st.error("El valor mínimo de x debe ser menor que el máximo.")
 
 # Configuración básica de Streamlit
 st.title("Aprende derivadas de funciones racionales")
@@ -35,30 +85,21 @@ st.write("Este programa interactivo te ayuda a aprender cómo calcular derivadas
 st.header("Ingresa una función racional")
 func_input = st.text_input("Función racional en términos de x (ejemplo: (x**2 + 1) / (x - 2))", "(x**2 + 1) / (x - 2)")
 
+vector = usar_graficas_vectoriales()
+
 if func_input:
     try:
         # Define la variable simbólica y la función
-        x = sp.symbols('x')
-        func = sp.sympify(func_input)
-
-        # Calcula la derivada
-        derivative = sp.diff(func, x)
+        compiled = compilar(func_input)
 
         # Muestra la función y su derivada
         st.subheader("Resultados")
-        st.latex(f"f(x) = {sp.latex(func)}")
-        st.latex(f"f'(x) = {sp.latex(derivative)}")
+        st.latex(f"f(x) = {compiled.latex(0)}")
+        st.latex(f"f'(x) = {compiled.latex(1)}")
 
         # Selección del rango para graficar
         st.subheader("Gráficas")
-        st.write("Selecciona el rango de valores de x para graficar.")
-        x_min = st.number_input("Valor mínimo de x", value=-10.0)
-        x_max = st.number_input("Valor máximo de x", value=10.0)
-
-        if x_min < x_max:
-            plot_function_and_derivative(func, derivative, (x_min, x_max))
-        else:
-            st.error("El valor mínimo de x debe ser menor que el máximo.")
+        plot_section(compiled, vector)
 
         # Explicaciones adicionales
         st.subheader("Explicación paso a paso")
@@ -70,3 +111,5 @@ if func_input:
 
     except Exception as e:
         st.error(f"Error al procesar la función: {e}")
+
+mostrar_estadisticas_memoria()
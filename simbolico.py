@@ -0,0 +1,462 @@
+"""
+Caché compartida de expresiones simbólicas para las apps de cálculo.
+
+Cada expresión se analiza (sympify) una sola vez; sus derivadas, su LaTeX y
+sus funciones de NumPy (lambdify, por separado o fusionadas en un solo
+núcleo) se calculan la primera vez que se piden y quedan guardadas. Como
+los módulos importados sobreviven a las re-ejecuciones de Streamlit, la
+caché es compartida por todas las sesiones del proceso. Además, todo lo
+calculado se copia en una caché en disco (persistencia.py) que comparten
+los demás procesos del servidor.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import sympy as sp
+from sympy.printing.numpy import NumPyPrinter
+from sympy.printing.precedence import PRECEDENCE
+
+from persistencia import CachePersistente
+
+
+class CacheLRU:
+    """
+    Diccionario acotado que descarta la entrada usada hace más tiempo.
+    Lleva la cuenta de aciertos, fallos y desalojos.
+    """
+
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, construir):
+        """
+        Devuelve el valor de `clave`; si no está, lo crea con construir().
+        """
+        with self._candado:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+
+        # Se construye fuera del candado para no bloquear a las otras sesiones
+        valor = construir()
+
+        with self._candado:
+            if clave in self._datos:
+                return self._datos[clave]
+            self._datos[clave] = valor
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+        return valor
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "entradas": len(self._datos),
+                "capacidad": self.capacidad,
+            }
+
+    def limpiar(self):
+        with self._candado:
+            self._datos.clear()
+
+
+class ExpresionCompilada:
+    """
+    Una expresión ya analizada junto con lo que se deriva de ella.
+    Las derivadas, el LaTeX y las funciones numéricas se calculan a pedido.
+
+    La misma instancia la usan a la vez los hilos de varias sesiones: lo que
+    se agrega a sus listas y diccionarios se hace con el candado tomado
+    (reentrante, porque por ejemplo latex() llama a derivada()).
+    """
+
+    def __init__(self, expr, variable):
+        self.expr = expr
+        self.variable = variable
+        self._derivadas = [expr]
+        self._latex = {}
+        self._funciones = {}
+        self._nucleos = {}
+        self._memo = {}
+        self._disco = None
+        self._clave_disco = None
+        self._candado = threading.RLock()
+
+    @classmethod
+    def desde_estado(cls, estado):
+        """
+        Reconstruye una expresión guardada con estado(), sin derivar, generar
+        LaTeX ni generar código otra vez.
+        """
+        compilada = cls(estado["expr"], estado["variable"])
+        compilada._derivadas = list(estado["derivadas"])
+        compilada._latex = dict(estado["latex"])
+        for ordenes, fuente in estado["fuentes"].items():
+            compilada._nucleos[ordenes] = compilada._crear_nucleo(ordenes, fuente)
+        for orden, fuente in estado["funciones"].items():
+            compilada._funciones[orden] = _definir(fuente, "funcion")
+        if estado["polos"] is not None:
+            compilada._memo["polos"] = estado["polos"]
+        return compilada
+
+    def estado(self):
+        """
+        Copia de lo calculado hasta ahora que vale la pena guardar en disco.
+        """
+        with self._candado:
+            return {
+                "expr": self.expr,
+                "variable": self.variable,
+                "derivadas": list(self._derivadas),
+                "latex": dict(self._latex),
+                "fuentes": {ordenes: nucleo.fuente for ordenes, nucleo in self._nucleos.items()
+                            if nucleo.fuente is not None},
+                "funciones": {orden: funcion.fuente for orden, funcion in self._funciones.items()
+                              if getattr(funcion, "fuente", None) is not None},
+                "polos": self._memo.get("polos"),
+            }
+
+    def conectar_disco(self, disco, clave):
+        """
+        A partir de ahora, cada resultado nuevo se copia en `disco` bajo `clave`.
+        """
+        self._disco, self._clave_disco = disco, clave
+
+    def _guardar(self):
+        if self._disco is not None:
+            self._disco.guardar(self._clave_disco, self.estado())
+
+    def derivada(self, orden=1):
+        """
+        Derivada de orden `orden` (orden 0 es la propia expresión).
+        """
+        with self._candado:
+            if len(self._derivadas) <= orden:
+                while len(self._derivadas) <= orden:
+                    self._derivadas.append(sp.diff(self._derivadas[-1], self.variable))
+                self._guardar()
+            return self._derivadas[orden]
+
+    def latex(self, orden=0):
+        with self._candado:
+            if orden not in self._latex:
+                self._latex[orden] = sp.latex(self.derivada(orden))
+                self._guardar()
+            return self._latex[orden]
+
+    def funcion(self, orden=0):
+        """
+        Función de NumPy que evalúa la derivada de orden `orden`.
+        """
+        with self._candado:
+            if orden not in self._funciones:
+                fuente = generar_fuente_funcion(self.variable, self.derivada(orden))
+                if fuente is not None:
+                    self._funciones[orden] = _definir(fuente, "funcion")
+                    self._guardar()
+                else:
+                    por_punto = _evaluar_por_punto(self.variable, [self.derivada(orden)])
+                    self._funciones[orden] = lambda x_vals: por_punto(x_vals)[0][()]
+            return self._funciones[orden]
+
+    def nucleo(self, ordenes=(0, 1)):
+        """
+        Función que evalúa a la vez las derivadas de los órdenes pedidos.
+
+        Las subexpresiones comunes de todas ellas (por ejemplo, el denominador
+        que comparten f y f' en la regla del cociente) se calculan una sola vez.
+        La función devuelta recibe los valores de x y, opcionalmente, un arreglo
+        `salida` de forma (len(ordenes),) + x.shape para reutilizarlo entre
+        llamadas; las derivadas constantes se expanden a la forma de x.
+        """
+        ordenes = tuple(ordenes)
+        with self._candado:
+            if ordenes not in self._nucleos:
+                fuente = generar_fuente_nucleo(self.variable, [self.derivada(orden) for orden in ordenes])
+                self._nucleos[ordenes] = self._crear_nucleo(ordenes, fuente)
+                if fuente is not None:
+                    self._guardar()
+            return self._nucleos[ordenes]
+
+    def _crear_nucleo(self, ordenes, fuente):
+        if fuente is not None:
+            evaluar_en = _definir(fuente, "nucleo")
+        else:
+            # Alguna función no tiene equivalente en NumPy: se evalúa con mpmath
+            evaluar_todas = _evaluar_por_punto(self.variable, [self.derivada(orden) for orden in ordenes])
+
+            def evaluar_en(x_vals, salida):
+                salida[...] = evaluar_todas(x_vals)
+                return salida
+
+        def evaluar(x_vals, salida=None):
+            x_vals = np.asarray(x_vals, dtype=float)
+            if salida is None:
+                salida = np.empty((len(ordenes),) + x_vals.shape)
+            return evaluar_en(x_vals, salida)
+
+        evaluar.fuente = fuente
+        return evaluar
+
+    def polos(self):
+        """
+        Raíces reales del denominador cuando este es un polinomio en la
+        variable (las asíntotas verticales de una función racional); lista
+        vacía en otro caso.
+        """
+        def calcular():
+            denominador = sp.denom(sp.together(self.expr))
+            if not denominador.is_polynomial(self.variable) or not denominador.has(self.variable):
+                return []
+            try:
+                # Sin factores repetidos, para que np.roots no separe las raíces múltiples
+                libre = sp.Poly(sp.sqf_part(denominador, self.variable), self.variable)
+                coeficientes = [complex(c) for c in libre.all_coeffs()]
+            except TypeError:
+                # Coeficientes con otros símbolos
+                return []
+            raices = np.roots(coeficientes)
+            reales = sorted(r.real for r in raices if abs(r.imag) < 1e-6 * max(1.0, abs(r)))
+            return [float(r) for i, r in enumerate(reales)
+                    if i == 0 or r - reales[i - 1] > 1e-6 * max(1.0, abs(r))]
+
+        with self._candado:
+            if "polos" not in self._memo:
+                self.memo("polos", calcular)
+                self._guardar()
+            return self._memo["polos"]
+
+    def memo(self, nombre, calcular):
+        """
+        Guarda cualquier otro resultado derivado de la expresión (por ejemplo,
+        sus puntos críticos) bajo `nombre`.
+        """
+        with self._candado:
+            if nombre in self._memo:
+                return self._memo[nombre]
+
+        # Se calcula fuera del candado (puede tardar varios segundos) para no
+        # bloquear a las otras sesiones; si dos lo calculan a la vez, se queda
+        # el primer resultado
+        valor = calcular()
+
+        with self._candado:
+            return self._memo.setdefault(nombre, valor)
+
+    def memo_acotado(self, nombre, calcular):
+        """
+        Como memo, pero para resultados que dependen de valores que cambian
+        con cada interacción (por ejemplo, el intervalo de una gráfica): en
+        lugar de quedarse con la expresión mientras viva el proceso, van a
+        una caché LRU acotada que comparten todas las expresiones.
+        """
+        return _resultados.obtener((self.expr, self.variable, nombre), calcular)
+
+
+class _ImpresoraNumPy(NumPyPrinter):
+    """
+    Como NumPyPrinter, pero escribe las potencias enteras negativas como
+    divisiones (x**(-1.0) es bastante más lento que 1/x en NumPy).
+    """
+
+    def _print_Pow(self, expr, rational=False):
+        if expr.exp.is_Integer and expr.exp.is_negative:
+            base = self.parenthesize(expr.base, PRECEDENCE["Pow"])
+            if expr.exp == -1:
+                return f"1/{base}"
+            return f"1/{base}**{-int(expr.exp)}"
+        return super()._print_Pow(expr, rational=rational)
+
+
+def generar_fuente_nucleo(variable, expresiones):
+    """
+    Código fuente de `nucleo(x, salida)`, que aplica eliminación de
+    subexpresiones comunes (cse) a todas las expresiones juntas y escribe cada
+    resultado en su fila de `salida`. Devuelve None si alguna función no se
+    puede traducir a NumPy.
+    """
+    impresora = _ImpresoraNumPy()
+    reemplazos, reducidas = sp.cse(expresiones, symbols=sp.numbered_symbols("_t"))
+    lineas = [f"def nucleo({impresora.doprint(variable)}, salida):"]
+    try:
+        for simbolo, subexpresion in reemplazos:
+            lineas.append(f"    {impresora.doprint(simbolo)} = {impresora.doprint(subexpresion)}")
+        for i, reducida in enumerate(reducidas):
+            lineas.append(f"    salida[{i}][...] = {impresora.doprint(reducida)}")
+    except NotImplementedError:
+        return None
+    if not _vectorizable(impresora):
+        return None
+    lineas.append("    return salida")
+    fuente = _importaciones(impresora) + "\n".join(lineas) + "\n"
+    try:
+        compile(fuente, "<nucleo>", "exec")
+    except SyntaxError:
+        return None
+    return fuente
+
+
+def generar_fuente_funcion(variable, expresion):
+    """
+    Código fuente de `funcion(x)`, equivalente a lambdify(variable, expresion,
+    "numpy") pero con el código a la vista para poder guardarlo. Devuelve None
+    si alguna función no se puede traducir a NumPy.
+    """
+    impresora = _ImpresoraNumPy()
+    try:
+        cuerpo = impresora.doprint(expresion)
+    except NotImplementedError:
+        return None
+    if not _vectorizable(impresora):
+        return None
+    fuente = (_importaciones(impresora)
+              + f"def funcion({impresora.doprint(variable)}):\n    return {cuerpo}\n")
+    try:
+        compile(fuente, "<funcion>", "exec")
+    except SyntaxError:
+        return None
+    return fuente
+
+
+def _evaluar_por_punto(variable, expresiones):
+    """
+    Función que evalúa las expresiones con mpmath, punto por punto, y
+    devuelve un arreglo de forma (len(expresiones),) + x.shape. Es para las
+    funciones que NumPy no tiene (zeta, polygamma, besselj, ...): mucho más
+    lenta, pero mpmath conoce casi todas las de SymPy. Si alguna tampoco la
+    tiene (por ejemplo, la derivada de sign), lambdify lanza el error.
+    """
+    evaluar = sp.lambdify(variable, list(expresiones), "mpmath")
+
+    def en_punto(x):
+        try:
+            return [_real(valor) for valor in evaluar(x)]
+        except (ArithmeticError, ValueError, TypeError):
+            # Polos y puntos fuera del dominio, como NaN en NumPy
+            return [np.nan] * len(expresiones)
+
+    def evaluar_todas(x_vals):
+        x_vals = np.asarray(x_vals, dtype=float)
+        valores = np.array([en_punto(x) for x in x_vals.ravel().tolist()], dtype=float)
+        return valores.reshape(x_vals.size, len(expresiones)).T.reshape((len(expresiones),) + x_vals.shape)
+
+    return evaluar_todas
+
+
+def _real(valor):
+    """
+    float del resultado de mpmath, o NaN si es complejo.
+    """
+    valor = complex(valor)
+    return valor.real if valor.imag == 0 else np.nan
+
+
+def _vectorizable(impresora):
+    """
+    False si el código impreso usa el módulo math (NumPyPrinter lo usa para
+    gamma, erf y otras funciones que NumPy no tiene), que solo acepta
+    escalares.
+    """
+    return "math" not in impresora.module_imports
+
+
+def _importaciones(impresora):
+    """
+    Líneas import de los módulos que usa el código impreso (por ejemplo,
+    functools para Max y Min), además de numpy.
+    """
+    modulos = sorted(set(impresora.module_imports) - {"numpy"})
+    return "".join(f"import {modulo}\n" for modulo in modulos)
+
+
+def _definir(fuente, nombre):
+    """
+    Ejecuta el código fuente generado y devuelve la función `nombre`, con el
+    código en su atributo `fuente`.
+    """
+    espacio = {"numpy": np}
+    exec(compile(fuente, f"<{nombre}>", "exec"), espacio)
+    funcion = espacio[nombre]
+    funcion.fuente = fuente
+    return funcion
+
+
+# Expresiones indexadas por su forma canónica (srepr) y, aparte, el texto tal
+# como lo escribió el usuario, para no tener que volver a llamar a sympify.
+_expresiones = CacheLRU(capacidad=256)
+_textos = CacheLRU(capacidad=1024)
+# Resultados de memo_acotado (muestras de gráficas, extremos en un intervalo)
+_resultados = CacheLRU(capacidad=256)
+# Segundo nivel, en disco y compartido entre procesos
+_disco = CachePersistente()
+
+
+def compilar(entrada, variable="x"):
+    """
+    Devuelve la ExpresionCompilada de `entrada` (texto o expresión de SymPy)
+    en términos de `variable`, reutilizándola si ya se había compilado en
+    este proceso o en cualquier otro que use la misma caché en disco.
+    """
+    if isinstance(entrada, str):
+        texto = entrada.strip()
+        return _textos.obtener((texto, variable), lambda: _compilar_texto(texto, variable))
+
+    expr = sp.sympify(entrada)
+    forma = sp.srepr(expr)
+    return _expresiones.obtener((forma, variable), lambda: _cargar(expr, forma, variable))
+
+
+def _compilar_texto(texto, variable):
+    encontrado = _disco.buscar_texto(texto, variable)
+    if encontrado is None:
+        compilada = compilar(sp.sympify(texto), variable)
+        _disco.asociar_texto(texto, variable, compilada._clave_disco)
+        return compilada
+
+    # Sin sympify: la expresión se reconstruye de su copia serializada
+    clave_disco, estado = encontrado
+
+    def reconstruir():
+        compilada = ExpresionCompilada.desde_estado(estado)
+        compilada.conectar_disco(_disco, clave_disco)
+        return compilada
+
+    return _expresiones.obtener((sp.srepr(estado["expr"]), variable), reconstruir)
+
+
+def _cargar(expr, forma, variable):
+    clave_disco = _disco.clave(forma, variable)
+    estado = _disco.buscar(clave_disco)
+    if estado is not None:
+        compilada = ExpresionCompilada.desde_estado(estado)
+    else:
+        compilada = ExpresionCompilada(expr, sp.Symbol(variable))
+    compilada.conectar_disco(_disco, clave_disco)
+    if estado is None:
+        compilada._guardar()
+    return compilada
+
+
+def estadisticas_cache():
+    """
+    Contadores de las cachés de expresiones, de textos y de resultados
+    (aciertos, fallos, desalojos, entradas y capacidad) y de la caché en disco.
+    """
+    return {
+        "expresiones": _expresiones.estadisticas(),
+        "textos": _textos.estadisticas(),
+        "resultados": _resultados.estadisticas(),
+        "disco": _disco.estadisticas(),
+    }
@@ -1,6 +1,6 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
 
 # Configuración de la aplicación
 st.title("Demostración de Reflexión y Refracción de la Luz")
@@ -30,7 +30,8 @@ else:
 angulo_refraccion = np.degrees(angulo_refraccion_rad)
 
 # Visualización
-fig, ax = plt.subplots(figsize=(8, 6))
+fig = crear_figura(figsize=(8, 6))
+ax = fig.subplots()
 
 if modo == "Reflexión":
     ax.axhline(0, color="black", linewidth=0.8, linestyle="--")
@@ -82,7 +83,7 @@ ax.set_xlabel("Eje X")
 ax.set_ylabel("Eje Y")
 
 # Mostrar gráfico
-st.pyplot(fig)
+mostrar(fig)
 
 # Explicaciones teóricas
 st.subheader("Explicación teórica")
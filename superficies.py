@@ -0,0 +1,155 @@
+"""
+Superficies r(θ, φ) en 3D con nivel de detalle.
+
+El costo de dibujar una superficie (con mplot3d, que ordena y pinta cada cara
+por separado, o en el navegador) crece con el número de caras, así que la
+resolución de la malla no es fija: resolucion() la elige a partir de
+- los lóbulos que tiene la función en θ y en φ (cuántas muestras hacen falta
+  para que no se pierdan),
+- el tamaño de la salida en píxeles (no tiene caso que una cara mida menos
+  de un par de píxeles), y
+- un presupuesto de triángulos, distinto para matplotlib y para el navegador.
+Cuando el presupuesto o los píxeles no alcanzan para MUESTRAS_POR_LOBULO,
+muestras_por_lobulo() dice cuántas quedan, para avisar que la superficie
+puede verse con artefactos (por ejemplo, con l grande).
+
+Las direcciones (sen θ cos φ, sen θ sen φ, cos θ) de cada resolución salen de
+las tablas de senos y cosenos de armonicos.py, y se guardan (de solo lectura)
+para las siguientes re-ejecuciones.
+
+vista_3d() manda la malla al navegador como triángulos de deck.gl (con
+pydeck y una vista orbital): girarla y acercarla no le cuesta nada al
+servidor.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from armonicos import malla_theta, tabla_fases
+
+# Triángulos que se dibujan en un tiempo razonable (en el navegador, el límite
+# es el JSON que hay que enviar: pydeck lo indenta, unos 400 bytes por triángulo)
+PRESUPUESTO_MATPLOTLIB = 12000
+PRESUPUESTO_NAVEGADOR = 16000
+# Ancho en píxeles de la gráfica en la página, y tamaño mínimo de una cara
+PIXELES_SALIDA = 700
+PIXELES_POR_CARA = 2
+# Muestras por lóbulo, y mínimos para que la superficie se vea redonda
+MUESTRAS_POR_LOBULO = 8
+MINIMO_THETA = 40
+MINIMO_PHI = 48
+
+
+def resolucion(lobulos_theta, lobulos_phi, presupuesto=PRESUPUESTO_MATPLOTLIB,
+               pixeles=PIXELES_SALIDA):
+    """
+    (n_theta, n_phi) de la malla para una superficie con los lóbulos dados
+    en cada dirección, sin pasar de `presupuesto` triángulos
+    (2 (n_theta - 1) (n_phi - 1)) ni de una cara cada PIXELES_POR_CARA
+    píxeles de la salida. Con esos límites puede haber menos de
+    MUESTRAS_POR_LOBULO muestras por lóbulo.
+    """
+    maximo = max(pixeles // PIXELES_POR_CARA, MINIMO_PHI)
+    n_theta = min(max(MUESTRAS_POR_LOBULO * lobulos_theta + 1, MINIMO_THETA), maximo // 2)
+    n_phi = min(max(MUESTRAS_POR_LOBULO * lobulos_phi + 1, MINIMO_PHI), maximo)
+
+    triangulos = 2 * (n_theta - 1) * (n_phi - 1)
+    if triangulos > presupuesto:
+        # Se reducen las dos direcciones en la misma proporción y, si con los
+        # mínimos todavía no alcanza, solo la que puede bajar más
+        factor = np.sqrt(presupuesto / triangulos)
+        n_theta = max(int(n_theta * factor), MINIMO_THETA)
+        n_phi = max(int(n_phi * factor), MINIMO_PHI)
+        n_theta = max(min(n_theta, presupuesto // (2 * (n_phi - 1)) + 1), 2)
+        n_phi = max(min(n_phi, presupuesto // (2 * (n_theta - 1)) + 1), 3)
+    return n_theta, n_phi
+
+
+def muestras_por_lobulo(lobulos_theta, lobulos_phi, presupuesto=PRESUPUESTO_MATPLOTLIB,
+                        pixeles=PIXELES_SALIDA):
+    """
+    Menor número de muestras por lóbulo, en θ o en φ, de la malla que elige
+    resolucion() con los mismos argumentos (infinito si no hay lóbulos).
+    """
+    n_theta, n_phi = resolucion(lobulos_theta, lobulos_phi, presupuesto, pixeles)
+    return min(((n - 1) / lobulos for n, lobulos in ((n_theta, lobulos_theta), (n_phi, lobulos_phi))
+                if lobulos), default=np.inf)
+
+
+@lru_cache(maxsize=16)
+def direcciones(n_theta, n_phi):
+    """
+    (θ, φ, ux, uy, uz): los ángulos de la malla y las componentes del vector
+    unitario en cada punto, de forma (n_theta, n_phi).
+    """
+    theta, cos_theta, sin_theta = malla_theta(n_theta)
+    phi, coseno, seno = tabla_fases(n_phi, 1)
+    ux = np.multiply.outer(sin_theta, coseno[1])
+    uy = np.multiply.outer(sin_theta, seno[1])
+    uz = np.repeat(cos_theta[:, None], n_phi, axis=1)
+    for arreglo in (ux, uy, uz):
+        arreglo.flags.writeable = False
+    return theta, phi, ux, uy, uz
+
+
+def superficie(r):
+    """
+    (x, y, z) de la superficie de radio r(θ, φ), dado en la malla de
+    direcciones() de su misma forma.
+    """
+    _, _, ux, uy, uz = direcciones(*r.shape)
+    return r * ux, r * uy, r * uz
+
+
+def triangulos(x, y, z, colores):
+    """
+    Triángulos de la malla: (vértices, de forma (T, 3, 3), y el promedio de
+    los colores RGB de los vértices de cada uno, de forma (T, 3)). Cada celda
+    se parte en dos y se descartan los triángulos de área nula (en los polos
+    las celdas tienen un solo lado).
+    """
+    puntos = np.stack([x, y, z], axis=-1)
+    esquinas = (np.s_[:-1, :-1], np.s_[:-1, 1:], np.s_[1:, :-1], np.s_[1:, 1:])
+    a, b, c, d = (puntos[i] for i in esquinas)
+    ca, cb, cc, cd = (colores[i][..., :3] for i in esquinas)
+    vertices = np.concatenate([
+        np.stack([a, b, d], axis=-2).reshape(-1, 3, 3),
+        np.stack([a, d, c], axis=-2).reshape(-1, 3, 3),
+    ])
+    medias = np.concatenate([((ca + cb + cd) / 3).reshape(-1, 3), ((ca + cd + cc) / 3).reshape(-1, 3)])
+
+    normal = np.cross(vertices[:, 1] - vertices[:, 0], vertices[:, 2] - vertices[:, 0])
+    area = np.einsum("ij,ij->i", normal, normal)
+    validos = area > 1e-12 * area.max() if area.size else area > 0
+    return vertices[validos], medias[validos]
+
+
+def vista_3d(x, y, z, colores, alto=500):
+    """
+    pydeck.Deck con la superficie en una vista orbital que se gira y se
+    acerca con el ratón.
+    - colores : RGB o RGBA (de 0 a 1) de cada punto de la malla, como los
+      facecolors de plot_surface
+    """
+    import pandas as pd
+    import pydeck as pdk
+
+    # La superficie se lleva a radio 1 para que la cámara no dependa de (l, m)
+    escala = np.max(np.sqrt(x * x + y * y + z * z))
+    if escala > 0:
+        x, y, z = x / escala, y / escala, z / escala
+    vertices, medias = triangulos(x, y, z, colores)
+    rgb = np.round(np.clip(medias, 0, 1) * 255).astype(np.uint8)
+
+    # Con radio 1, tres decimales son menos de un píxel
+    tabla = pd.DataFrame({"poligono": np.round(vertices, 3).tolist(), "color": rgb.tolist()})
+    capa = pdk.Layer(
+        "SolidPolygonLayer", tabla,
+        get_polygon="poligono", get_fill_color="color",
+        # Triángulos en cualquier orientación, no solo horizontales
+        _full3d=True,
+    )
+    vista = pdk.View(type="OrbitView", controller=True)
+    estado = pdk.ViewState(target=[0, 0, 0], rotation_orbit=45, rotation_x=30,
+                           zoom=float(np.log2(0.35 * alto)), min_zoom=0, max_zoom=12)
+    return pdk.Deck(layers=[capa], views=[vista], initial_view_state=estado, map_style=None)
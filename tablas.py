@@ -0,0 +1,133 @@
+"""
+Tablas de valores grandes (de 10^5 a 10^7 filas) sin tenerlas completas en memoria.
+
+La fila i de la tabla corresponde a x_i = x_min + i * (x_max - x_min) / (n - 1),
+así que cualquier tramo de filas se puede calcular por separado: la vista
+paginada evalúa solo las filas de la página que se muestra, y la exportación
+recorre la tabla por bloques de tamaño fijo, escribiendo cada bloque en el
+archivo antes de calcular el siguiente. La gráfica de la tabla completa
+también se calcula por bloques, guardando de cada uno solo los puntos que
+quedan después de diezmarlo.
+"""
+import io
+
+import numpy as np
+
+from muestreo import ANCHO_PIXELES, diezmar
+
+TAMANO_BLOQUE = 65536
+# Streamlit guarda en memoria el archivo completo de cada descarga (un CSV de
+# 10^7 filas pesa unos 580 MB), así que desde las apps solo se ofrece la
+# descarga hasta este número de filas (unos 30 MB de CSV)
+FILAS_MAXIMAS_DESCARGA = 500_000
+
+
+def valores_x(x_min, x_max, n_filas, inicio, fin):
+    """
+    Valores de x de las filas inicio a fin - 1 (iguales a los de
+    np.linspace(x_min, x_max, n_filas) en esas posiciones).
+    """
+    if n_filas == 1:
+        return np.full(fin - inicio, float(x_min))
+    paso = (x_max - x_min) / (n_filas - 1)
+    x = x_min + paso * np.arange(inicio, fin, dtype=float)
+    if fin == n_filas:
+        x[-1] = x_max
+    return x
+
+
+def bloques(nucleo, x_min, x_max, n_filas, tamano_bloque=TAMANO_BLOQUE, columnas=2):
+    """
+    Recorre la tabla por bloques. nucleo(x, salida) debe escribir en `salida`
+    (de forma (columnas, len(x))) las columnas de la tabla, por ejemplo f y f'
+    de ExpresionCompilada.nucleo((0, 1)). Produce (x, valores) por bloque; los
+    arreglos se reutilizan entre bloques, así que hay que consumirlos antes de
+    pedir el siguiente.
+    """
+    salida = np.empty((columnas, min(tamano_bloque, n_filas)))
+    for inicio in range(0, n_filas, tamano_bloque):
+        fin = min(inicio + tamano_bloque, n_filas)
+        x = valores_x(x_min, x_max, n_filas, inicio, fin)
+        with np.errstate(all="ignore"):
+            valores = nucleo(x, salida=salida[:, :fin - inicio])
+        yield x, valores
+
+
+def envolvente(nucleo, x_min, x_max, n_filas, ancho_pixeles=ANCHO_PIXELES, columnas=2,
+               tamano_bloque=TAMANO_BLOQUE):
+    """
+    (x, valores) para graficar la tabla completa: cada bloque se diezma con
+    las columnas de píxeles de todo el intervalo, así que se obtienen unos
+    dos puntos por píxel y por columna de la tabla, sea cual sea n_filas.
+    """
+    partes_x, partes_valores = [], []
+    for x, valores in bloques(nucleo, x_min, x_max, n_filas, tamano_bloque, columnas):
+        x, valores = diezmar(x, valores, ancho_pixeles, rango=(x_min, x_max))
+        partes_x.append(x)
+        partes_valores.append(valores)
+    return np.concatenate(partes_x), np.concatenate(partes_valores, axis=1)
+
+
+def pagina(nucleo, x_min, x_max, n_filas, numero, tamano_pagina, nombres):
+    """
+    DataFrame de pandas con solo las filas de la página `numero` (desde 0).
+    """
+    import pandas as pd
+
+    inicio = numero * tamano_pagina
+    fin = min(inicio + tamano_pagina, n_filas)
+    x = valores_x(x_min, x_max, n_filas, inicio, fin)
+    with np.errstate(all="ignore"):
+        valores = nucleo(x)
+    datos = {nombres[0]: x}
+    datos.update(zip(nombres[1:], valores))
+    return pd.DataFrame(datos, index=np.arange(inicio, fin))
+
+
+def exportar_csv(archivo, nucleo, x_min, x_max, n_filas, nombres, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Escribe la tabla completa como CSV en `archivo` (abierto en modo binario),
+    bloque por bloque.
+    """
+    archivo.write((",".join(nombres) + "\n").encode())
+    for x, valores in bloques(nucleo, x_min, x_max, n_filas, tamano_bloque, len(nombres) - 1):
+        # repr da el número más corto que se lee de vuelta exactamente igual
+        columnas = [map(repr, columna.tolist()) for columna in (x, *valores)]
+        texto = "\n".join(map(",".join, zip(*columnas)))
+        archivo.write((texto + "\n").encode())
+
+
+def exportar_parquet(archivo, nucleo, x_min, x_max, n_filas, nombres, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Escribe la tabla completa como Parquet en `archivo` (ruta o archivo
+    binario), un grupo de filas por bloque. Requiere pyarrow: devuelve False
+    si no está instalado.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+
+    esquema = pa.schema([(nombre, pa.float64()) for nombre in nombres])
+    with pq.ParquetWriter(archivo, esquema) as escritor:
+        for x, valores in bloques(nucleo, x_min, x_max, n_filas, tamano_bloque, len(nombres) - 1):
+            columnas = [pa.array(x)] + [pa.array(fila) for fila in valores]
+            escritor.write_table(pa.Table.from_arrays(columnas, schema=esquema))
+    return True
+
+
+def exportacion_diferida(exportar, nucleo, x_min, x_max, n_filas, nombres):
+    """
+    Función sin argumentos para el `data` de st.download_button: la tabla
+    solo se escribe (por bloques, con exportar_csv o exportar_parquet) cuando
+    se pulsa el botón. Devuelve un BytesIO, uno de los tipos que acepta
+    Streamlit para las descargas.
+    """
+    def generar():
+        archivo = io.BytesIO()
+        exportar(archivo, nucleo, x_min, x_max, n_filas, nombres)
+        archivo.seek(0)
+        return archivo
+
+    return generar
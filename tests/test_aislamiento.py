@@ -0,0 +1,22 @@
+import pickle
+
+import pytest
+import sympy as sp
+
+from aislamiento import LimiteNoExiste, _limite
+
+x = sp.Symbol("x")
+
+
+def test_limites_laterales_distintos():
+    with pytest.raises(LimiteNoExiste) as error:
+        _limite(sp.Abs(x) / x, x, 0, "+-")
+    assert (error.value.izquierda, error.value.derecha) == (-1, 1)
+    # La excepción vuelve del proceso auxiliar serializada con pickle
+    copia = pickle.loads(pickle.dumps(error.value))
+    assert (copia.izquierda, copia.derecha) == (-1, 1)
+
+
+def test_limite_por_ambos_lados_y_por_un_lado():
+    assert _limite((x**2 - 1) / (x - 1), x, 1, "+-") == 2
+    assert _limite(sp.Abs(x) / x, x, 0, "+") == 1
@@ -0,0 +1,36 @@
+import pytest
+
+from extremos import NO_ACOTADA, NO_DEFINIDA, analizar_extremos
+from simbolico import compilar
+
+
+def extremos_de(texto, a, b):
+    compilada = compilar(texto)
+    return analizar_extremos(compilada.funcion(0), compilada.nucleo((1, 2)), a, b)
+
+
+@pytest.mark.parametrize("texto, a, b, problema", [
+    ("tan(x)", -10.0, 10.0, NO_ACOTADA),
+    ("1/x", -10.0, 10.0, NO_DEFINIDA),
+    ("(x**2+1)/(x-2)", -10.0, 10.0, NO_ACOTADA),
+    ("log(x)", -1.0, 1.0, NO_DEFINIDA),
+])
+def test_sin_extremos_globales_si_no_es_acotada_o_no_esta_definida(texto, a, b, problema):
+    resultado = extremos_de(texto, a, b)
+    assert resultado["problema"] == problema
+    assert resultado["maximo_global"] is None
+    assert resultado["minimo_global"] is None
+    assert resultado["subintervalos"]
+
+
+@pytest.mark.parametrize("texto, a, b, maximo, minimo", [
+    ("x**3 - 6*x**2 + 9*x + 1", -10.0, 10.0, (10.0, 491.0), (-10.0, -1689.0)),
+    # Un pico (derivada discontinua) en x = 0.3
+    ("sqrt((x - 0.3)**2)", -1.0, 1.0, (-1.0, 1.3), (0.3, 0.0)),
+])
+def test_extremos_globales_de_una_funcion_continua(texto, a, b, maximo, minimo):
+    resultado = extremos_de(texto, a, b)
+    assert resultado["problema"] is None
+    # El pico se ubica con la resolución de la rejilla de muestreo
+    assert resultado["maximo_global"] == pytest.approx(maximo, abs=1e-4)
+    assert resultado["minimo_global"] == pytest.approx(minimo, abs=1e-4)
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+
+import pytest
+
+import persistencia
+from persistencia import CachePersistente
+
+
+def test_un_bloqueo_pasajero_no_desactiva_la_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistencia, "ESPERA_BLOQUEO", 0.05)
+    ruta = str(tmp_path / "cache.sqlite")
+    cache = CachePersistente(ruta)
+    cache.guardar("a", {"valor": 1})
+
+    otra = sqlite3.connect(ruta)
+    otra.execute("BEGIN EXCLUSIVE")
+    cache.guardar("b", {"valor": 2})
+    assert cache.activa
+    assert cache.estadisticas()["bloqueos"] >= 1
+    otra.rollback()
+    otra.close()
+
+    cache.guardar("b", {"valor": 2})
+    assert cache.buscar("a") == {"valor": 1}
+    assert cache.buscar("b") == {"valor": 2}
+
+
+def test_un_archivo_danado_desactiva_la_cache(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    ruta.write_bytes(b"esto no es una base de datos SQLite" * 100)
+    cache = CachePersistente(str(ruta))
+    assert cache.buscar("a") is None
+    assert not cache.activa
+
+
+@pytest.mark.skipif("DERIVADA_CACHE" in os.environ, reason="ruta elegida con DERIVADA_CACHE")
+def test_la_ruta_por_defecto_no_esta_en_el_directorio_de_las_apps():
+    directorio_apps = os.path.dirname(os.path.abspath(persistencia.__file__))
+    assert not os.path.abspath(persistencia.RUTA_CACHE).startswith(directorio_apps + os.sep)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="sin permisos POSIX")
+def test_no_usa_un_archivo_que_otros_pueden_escribir(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    CachePersistente(str(ruta)).guardar("a", {"valor": 1})
+    os.chmod(ruta, 0o666)
+    cache = CachePersistente(str(ruta))
+    assert cache.buscar("a") is None
+    assert not cache.activa
+
+
+def test_crea_el_archivo_privado(tmp_path):
+    ruta = tmp_path / "nuevo" / "cache.sqlite"
+    CachePersistente(str(ruta)).guardar("a", {"valor": 1})
+    assert not os.stat(ruta).st_mode & 0o077
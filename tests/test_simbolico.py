@@ -0,0 +1,35 @@
+import math
+
+import numpy as np
+import pytest
+
+import simbolico
+from simbolico import compilar
+
+
+def test_memo_acotado_no_crece_con_cada_intervalo():
+    compilada = compilar("x**3 - 2*x")
+    capacidad = simbolico._resultados.capacidad
+    for i in range(capacidad + 50):
+        compilada.memo_acotado(("muestras", -i, i + 1), lambda: i)
+
+    assert simbolico.estadisticas_cache()["resultados"]["entradas"] <= capacidad
+    assert not any(isinstance(nombre, tuple) for nombre in compilada._memo)
+    # Las entradas recientes se siguen reutilizando
+    assert compilada.memo_acotado(("muestras", -capacidad, capacidad + 1), lambda: None) == capacidad
+
+
+def test_funciones_sin_equivalente_en_numpy_se_evaluan_con_mpmath():
+    x = np.array([0.5, 1.5, 2.5])
+    np.testing.assert_allclose(compilar("gamma(x)").funcion(0)(x), [math.gamma(v) for v in x])
+    valores = compilar("zeta(x)").nucleo((0, 1))(np.array([2.0, 1.0]))
+    assert valores[0, 0] == pytest.approx(math.pi**2 / 6)
+    assert valores[1, 0] == pytest.approx(-0.9375482543158437)
+    # En el polo, NaN como en NumPy
+    assert np.isnan(valores[0, 1])
+    assert compilar("erf(x)").funcion(1)(0.0) == pytest.approx(2 / math.sqrt(math.pi))
+
+
+def test_sin_traduccion_posible_el_error_llega_a_quien_la_pide():
+    with pytest.raises(NotImplementedError):
+        compilar("Abs(x)").nucleo((1, 2))
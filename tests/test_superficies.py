@@ -0,0 +1,13 @@
+from superficies import MUESTRAS_POR_LOBULO, PRESUPUESTO_NAVEGADOR, muestras_por_lobulo, resolucion
+
+
+def test_muestras_por_lobulo_coincide_con_resolucion():
+    n_theta, n_phi = resolucion(11, 21)
+    assert muestras_por_lobulo(11, 21) == min((n_theta - 1) / 11, (n_phi - 1) / 21)
+
+
+def test_l_grande_queda_submuestreado_y_l_chico_no():
+    # |Y(l, 0)| tiene l + 1 lóbulos en θ y ninguno en φ
+    assert muestras_por_lobulo(3, 0) >= MUESTRAS_POR_LOBULO
+    assert muestras_por_lobulo(101, 0) < 2
+    assert muestras_por_lobulo(101, 0, PRESUPUESTO_NAVEGADOR) < MUESTRAS_POR_LOBULO
@@ -0,0 +1,37 @@
+import io
+
+import numpy as np
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from simbolico import compilar
+from tablas import exportacion_diferida, exportar_csv, exportar_parquet
+
+NOMBRES = ["x", "f(x)", "f'(x)"]
+
+
+def descargar(exportar, n_filas):
+    """Bytes que Streamlit enviaría al pulsar el botón de descarga."""
+    nucleo = compilar("x**2").nucleo((0, 1))
+    generar = exportacion_diferida(exportar, nucleo, -1.0, 1.0, n_filas, NOMBRES)
+    datos, _ = convert_data_to_bytes_and_infer_mime(generar(), TypeError("tipo no soportado"))
+    return datos
+
+
+def test_csv_pasa_por_la_conversion_de_streamlit():
+    lineas = descargar(exportar_csv, 1001).decode().splitlines()
+    assert lineas[0] == ",".join(NOMBRES)
+    assert len(lineas) == 1002
+    tabla = np.loadtxt(lineas[1:], delimiter=",")
+    x = np.linspace(-1.0, 1.0, 1001)
+    np.testing.assert_array_equal(tabla[:, 0], x)
+    np.testing.assert_allclose(tabla[:, 1], x**2)
+    np.testing.assert_allclose(tabla[:, 2], 2 * x)
+
+
+def test_parquet_pasa_por_la_conversion_de_streamlit():
+    pq = pytest.importorskip("pyarrow.parquet")
+    tabla = pq.read_table(io.BytesIO(descargar(exportar_parquet, 70_000)))
+    assert tabla.column_names == NOMBRES
+    assert tabla.num_rows == 70_000
+    np.testing.assert_allclose(tabla.column("f(x)").to_numpy(), np.linspace(-1.0, 1.0, 70_000) ** 2)
@@ -1,6 +1,9 @@
+import os
+import time
+import zipfile
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+from figuras import crear_figura, mostrar
 
 # ------------------------------------------------------
 # 1. Funciones para el caso ideal (sin resistencia)
@@ -28,7 +31,8 @@ def calcular_trayectoria(v, angulo, g=9.8, num_points=100):
 # ------------------------------------------------------
 # 2. Funciones para el caso con resistencia del aire
 # ------------------------------------------------------
-def calcular_trayectoria_con_drag(v, angulo, k, g=9.8, dt=0.01):
+def calcular_trayectoria_con_drag(v, angulo, k, g=9.8, dt=0.01, metodo="euler",
+                                  num_points=200):
     """
     Calcula la trayectoria (x, y) teniendo en cuenta una fuerza de arrastre
     proporcional a k * v^2.
@@ -39,7 +43,14 @@ def calcular_trayectoria_con_drag(v, angulo, k, g=9.8, dt=0.01):
     - k : coeficiente de arrastre
     - g : aceleración de la gravedad (m/s^2)
     - dt : paso de tiempo para la integración
+    - metodo : "euler" (paso fijo dt) o "rk45" (paso adaptativo, ver
+      `resolver_con_drag_adaptativo`; en ese caso dt no se usa)
+    - num_points : puntos de la curva devuelta con metodo="rk45"
     """
+    if metodo == "rk45":
+        _, t_vuelo, trayectoria, _ = resolver_con_drag_adaptativo(v, angulo, k, g)
+        return trayectoria(np.linspace(0, t_vuelo, num_points))
+
     # Convertimos ángulo a radianes
     theta = np.radians(angulo)
     
@@ -91,13 +102,541 @@ def calcular_trayectoria_con_drag(v, angulo, k, g=9.8, dt=0.01):
     
     return x_vals, y_vals
 
-def calcular_distancia_con_drag(v, angulo, k, g=9.8, dt=0.01):
+def calcular_distancia_con_drag(v, angulo, k, g=9.8, dt=0.01, metodo="euler"):
     """
     Devuelve la distancia alcanzada (último valor de x) con arrastre.
     """
+    if metodo == "rk45":
+        return resolver_con_drag_adaptativo(v, angulo, k, g)[0]
     x_vals, y_vals = calcular_trayectoria_con_drag(v, angulo, k, g, dt)
     return x_vals[-1]  # el último valor de x
 
+def calcular_trayectorias_con_drag_lote(v, angulos, k, g=9.8, dt=0.01,
+                                        guardar_trayectorias=True):
+    """
+    Integra a la vez (con NumPy) varias trayectorias con arrastre k * v^2.
+
+    Es el mismo método de Euler de `calcular_trayectoria_con_drag`, pero cada
+    lanzamiento es un "carril" de un arreglo: todos avanzan en el mismo paso y
+    una máscara indica cuáles ya tocaron el piso.
+    - v : velocidad(es) inicial(es) (m/s), escalar o arreglo
+    - angulos : ángulo(s) de lanzamiento en grados, escalar o arreglo
+    - k : coeficiente(s) de arrastre, escalar o arreglo
+    - g : aceleración de la gravedad (m/s^2)
+    - dt : paso de tiempo para la integración
+    - guardar_trayectorias : si es False solo se calculan las distancias
+
+    Devuelve (distancias, x_tray, y_tray). Las trayectorias son arreglos de
+    forma (n_lanzamientos, n_pasos) rellenos con NaN después del impacto
+    (None si guardar_trayectorias es False).
+    """
+    v, angulos, k = np.broadcast_arrays(
+        np.asarray(v, dtype=float),
+        np.asarray(angulos, dtype=float),
+        np.asarray(k, dtype=float),
+    )
+    v, angulos, k = v.ravel(), angulos.ravel(), k.ravel()
+
+    theta = np.radians(angulos)
+    vx = v * np.cos(theta)
+    vy = v * np.sin(theta)
+    x = np.zeros_like(vx)
+    y = np.zeros_like(vy)
+
+    # Carriles que todavía están en el aire y punto de impacto de cada uno
+    en_vuelo = np.ones(vx.shape, dtype=bool)
+    distancias = np.zeros_like(vx)
+
+    x_pasos = [x.copy()] if guardar_trayectorias else None
+    y_pasos = [y.copy()] if guardar_trayectorias else None
+
+    while en_vuelo.any():
+        v_mod = np.sqrt(vx**2 + vy**2)
+        vx = vx + (-k * v_mod * vx) * dt
+        vy = vy + (-g - k * v_mod * vy) * dt
+        x_nuevo = x + vx * dt
+        y_nuevo = y + vy * dt
+
+        # Igual que en el caso escalar, el alcance es el último x con y >= 0
+        aterriza = en_vuelo & (y_nuevo < 0)
+        distancias[aterriza] = x[aterriza]
+        en_vuelo &= ~aterriza
+
+        x = np.where(en_vuelo, x_nuevo, x)
+        y = np.where(en_vuelo, y_nuevo, y)
+
+        if guardar_trayectorias:
+            x_pasos.append(np.where(en_vuelo, x_nuevo, np.nan))
+            y_pasos.append(np.where(en_vuelo, y_nuevo, np.nan))
+
+    if not guardar_trayectorias:
+        return distancias, None, None
+
+    return distancias, np.stack(x_pasos, axis=1), np.stack(y_pasos, axis=1)
+
+# ------------------------------------------------------
+# 2.1 Integrador adaptativo (Dormand–Prince 5(4)) con detección del impacto
+# ------------------------------------------------------
+# Coeficientes del método de Dormand–Prince (tabla de Butcher)
+_DP_A = [
+    np.array([]),
+    np.array([1/5]),
+    np.array([3/40, 9/40]),
+    np.array([44/45, -56/15, 32/9]),
+    np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+    np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+# Diferencia entre la solución de orden 5 y la de orden 4 (estimación del error)
+_DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+# Coeficientes de la salida densa (interpolante de orden 4 dentro de cada paso)
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+def _derivadas_drag(estado, k, g):
+    """
+    Lado derecho del sistema para el estado (x, y, vx, vy).
+    """
+    _, _, vx, vy = estado
+    v_mod = np.sqrt(vx**2 + vy**2)
+    return np.array([vx, vy, -k * v_mod * vx, -g - k * v_mod * vy])
+
+def _interpolar_paso(estado, K, h, sigma):
+    """
+    Evalúa la salida densa de un paso en las fracciones sigma (0 a 1) del paso.
+    """
+    sigma = np.atleast_1d(sigma)
+    potencias = np.cumprod(np.tile(sigma, (4, 1)), axis=0)  # sigma, sigma^2, ...
+    return estado[:, None] + h * (K.T @ _DP_P) @ potencias
+
+def resolver_con_drag_adaptativo(v, angulo, k, g=9.8, rtol=1e-8, atol=1e-10):
+    """
+    Integra la trayectoria con arrastre k * v^2 usando Runge–Kutta adaptativo
+    (Dormand–Prince 5(4)) con control del error local.
+
+    El paso se ajusta solo, y el instante en que y = 0 se localiza dentro del
+    último paso con la salida densa, así que el alcance no depende de un dt.
+    - v : velocidad inicial (m/s)
+    - angulo : ángulo de lanzamiento en grados
+    - k : coeficiente de arrastre
+    - g : aceleración de la gravedad (m/s^2)
+    - rtol, atol : tolerancias relativa y absoluta del error por paso
+
+    Devuelve (distancia, t_vuelo, trayectoria, n_pasos), donde
+    trayectoria(t) da los arreglos (x, y) en cualquier instante 0 <= t <= t_vuelo.
+    """
+    theta = np.radians(angulo)
+    estado = np.array([0.0, 0.0, v * np.cos(theta), v * np.sin(theta)])
+    t = 0.0
+    h = 0.01 * max(v, 1.0) / g  # paso inicial; el control lo corrige enseguida
+    f = _derivadas_drag(estado, k, g)
+
+    # Cada paso aceptado guarda (t_inicio, h, estado_inicio, K) para la salida densa
+    pasos = []
+    n_pasos = 0
+    while True:
+        K = np.empty((7, 4))
+        K[0] = f
+        for i in range(1, 6):
+            K[i] = _derivadas_drag(estado + h * (_DP_A[i] @ K[:i]), k, g)
+        estado_nuevo = estado + h * (_DP_B @ K[:6])
+        K[6] = _derivadas_drag(estado_nuevo, k, g)
+        n_pasos += 1
+
+        escala = atol + rtol * np.maximum(np.abs(estado), np.abs(estado_nuevo))
+        error = np.sqrt(np.mean((h * (_DP_E @ K) / escala) ** 2))
+
+        if error > 1:
+            h *= max(0.2, 0.9 * error ** (-1 / 5))
+            continue
+
+        pasos.append((t, h, estado, K))
+
+        # Evento: la pelota cruza y = 0 bajando dentro de este paso
+        if estado_nuevo[1] < 0 and estado_nuevo[3] < 0:
+            # Bisección sobre la salida densa para encontrar y(sigma) = 0
+            bajo, alto = 0.0, 1.0
+            for _ in range(60):
+                medio = 0.5 * (bajo + alto)
+                if _interpolar_paso(estado, K, h, medio)[1, 0] >= 0:
+                    bajo = medio
+                else:
+                    alto = medio
+            sigma = 0.5 * (bajo + alto)
+            t_vuelo = t + sigma * h
+            distancia = _interpolar_paso(estado, K, h, sigma)[0, 0]
+            break
+
+        t += h
+        estado = estado_nuevo
+        f = K[6]
+        h *= min(10.0, 0.9 * max(error, 1e-10) ** (-1 / 5))
+
+    inicios = np.array([p[0] for p in pasos])
+
+    def trayectoria(tiempos):
+        tiempos = np.clip(np.atleast_1d(np.asarray(tiempos, dtype=float)), 0.0, t_vuelo)
+        indices = np.clip(np.searchsorted(inicios, tiempos, side="right") - 1, 0, None)
+        x_vals = np.empty_like(tiempos)
+        y_vals = np.empty_like(tiempos)
+        for i in np.unique(indices):
+            t_i, h_i, estado_i, K_i = pasos[i]
+            seleccion = indices == i
+            puntos = _interpolar_paso(estado_i, K_i, h_i, (tiempos[seleccion] - t_i) / h_i)
+            x_vals[seleccion] = puntos[0]
+            y_vals[seleccion] = puntos[1]
+        return x_vals, y_vals
+
+    return distancia, t_vuelo, trayectoria, n_pasos
+
+def calcular_distancias_con_drag_lote(v, angulos, k, g=9.8, h=0.05):
+    """
+    Alcances de varios lanzamientos a la vez con el método de Dormand–Prince
+    de `resolver_con_drag_adaptativo`, pero con paso fijo h para que todos los
+    "carriles" avancen juntos con NumPy. El impacto se localiza igual, con la
+    salida densa del último paso, así que con h = 0.05 s los alcances difieren
+    de los del integrador adaptativo en menos de 1 mm.
+    - v, angulos, k : escalares o arreglos (se combinan con broadcasting)
+    - h : paso de tiempo (s)
+    """
+    v, angulos, k = np.broadcast_arrays(
+        np.asarray(v, dtype=float),
+        np.asarray(angulos, dtype=float),
+        np.asarray(k, dtype=float),
+    )
+    v, angulos, k = v.ravel(), angulos.ravel(), k.ravel()
+    theta = np.radians(angulos)
+    # Estado de forma (4, n): filas x, y, vx, vy; solo quedan los carriles en el aire
+    estado = np.array([np.zeros_like(v), np.zeros_like(v), v * np.cos(theta), v * np.sin(theta)])
+    carriles = np.arange(v.size)
+    distancias = np.zeros_like(v)
+    f = _derivadas_drag(estado, k, g)
+
+    while carriles.size:
+        K = np.empty((7,) + estado.shape)
+        K[0] = f
+        for i in range(1, 6):
+            K[i] = _derivadas_drag(estado + h * np.tensordot(_DP_A[i], K[:i], axes=1), k, g)
+        estado_nuevo = estado + h * np.tensordot(_DP_B, K[:6], axes=1)
+        K[6] = _derivadas_drag(estado_nuevo, k, g)
+
+        aterriza = (estado_nuevo[1] < 0) & (estado_nuevo[3] < 0)
+        if aterriza.any():
+            # Bisección sobre la salida densa de cada carril que cruza y = 0
+            inicio = estado[:, aterriza]
+            Q = np.tensordot(_DP_P.T, K[:, :, aterriza], axes=1)  # (potencia, fila, carril)
+            bajo = np.zeros(inicio.shape[1])
+            alto = np.ones(inicio.shape[1])
+            for _ in range(50):
+                medio = 0.5 * (bajo + alto)
+                y = inicio[1] + h * np.einsum("pc,pc->c", Q[:, 1], medio ** np.arange(1, 5)[:, None])
+                arriba = y >= 0
+                bajo = np.where(arriba, medio, bajo)
+                alto = np.where(arriba, alto, medio)
+            sigma = 0.5 * (bajo + alto)
+            distancias[carriles[aterriza]] = (
+                inicio[0] + h * np.einsum("pc,pc->c", Q[:, 0], sigma ** np.arange(1, 5)[:, None])
+            )
+            sigue = ~aterriza
+            carriles, estado_nuevo, K, k = carriles[sigue], estado_nuevo[:, sigue], K[:, :, sigue], k[sigue]
+        estado = estado_nuevo
+        f = K[6]
+
+    return distancias
+
+# ------------------------------------------------------
+# 2.2 Búsqueda del ángulo óptimo (sección áurea)
+# ------------------------------------------------------
+def buscar_angulo_optimo(distancia, angulo_min=20.0, angulo_max=40.0, tol=0.01):
+    """
+    Busca el ángulo que maximiza distancia(angulo) en [angulo_min, angulo_max]
+    por el método de la sección áurea.
+
+    Supone que el alcance es unimodal en el intervalo (crece y luego decrece,
+    o es monótono). Los extremos también se evalúan, porque en un intervalo
+    restringido el máximo suele estar en el borde.
+    - distancia : función que recibe un ángulo en grados y devuelve el alcance
+    - angulo_min, angulo_max : intervalo de búsqueda en grados
+    - tol : ancho final del intervalo (en grados)
+
+    Devuelve (angulo_optimo, distancia_maxima, n_evaluaciones).
+    """
+    razon = (np.sqrt(5) - 1) / 2  # 1/phi
+    a, b = angulo_min, angulo_max
+    c = b - razon * (b - a)
+    d = a + razon * (b - a)
+    fc, fd = distancia(c), distancia(d)
+    n_evaluaciones = 2
+
+    while b - a > tol:
+        if fc >= fd:
+            b, d, fd = d, c, fc
+            c = b - razon * (b - a)
+            fc = distancia(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + razon * (b - a)
+            fd = distancia(d)
+        n_evaluaciones += 1
+
+    candidatos = [(c, fc), (d, fd),
+                  (angulo_min, distancia(angulo_min)),
+                  (angulo_max, distancia(angulo_max))]
+    n_evaluaciones += 2
+
+    angulo_optimo, distancia_maxima = max(candidatos, key=lambda par: par[1])
+    return angulo_optimo, distancia_maxima, n_evaluaciones
+
+# ------------------------------------------------------
+# 2.3 Tabla precalculada sobre la rejilla (ángulo, k, v0)
+# ------------------------------------------------------
+# TIRO_PARABOLICO_TABLA="" deja la tabla solo en memoria (no se lee ni se guarda)
+RUTA_TABLA = os.environ.get(
+    "TIRO_PARABOLICO_TABLA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tabla_tiro_parabolico.npz"),
+)
+VERSION_TABLA = 1
+
+def construir_tabla(angulos, ks, velocidades, g=9.8, num_points=100):
+    """
+    Precalcula con el integrador adaptativo el alcance, la altura máxima y la
+    trayectoria (num_points puntos equiespaciados en el tiempo) de cada
+    combinación de la rejilla, además del ángulo óptimo para cada (k, v0).
+
+    Devuelve un diccionario de arreglos, con el mismo formato que se guarda
+    en disco con `guardar_tabla`.
+    """
+    angulos = np.asarray(angulos, dtype=float)
+    ks = np.asarray(ks, dtype=float)
+    velocidades = np.asarray(velocidades, dtype=float)
+    forma = (len(angulos), len(ks), len(velocidades))
+
+    distancias = np.empty(forma)
+    alturas = np.empty(forma)
+    x_tray = np.empty(forma + (num_points,), dtype=np.float32)
+    y_tray = np.empty(forma + (num_points,), dtype=np.float32)
+    angulo_optimo = np.empty(forma[1:])
+    distancia_maxima = np.empty(forma[1:])
+
+    for j, k in enumerate(ks):
+        for l, v in enumerate(velocidades):
+            for i, angulo in enumerate(angulos):
+                distancia, t_vuelo, trayectoria, _ = resolver_con_drag_adaptativo(v, angulo, k, g)
+                x_vals, y_vals = trayectoria(np.linspace(0, t_vuelo, num_points))
+                distancias[i, j, l] = distancia
+                alturas[i, j, l] = y_vals.max()
+                x_tray[i, j, l] = x_vals
+                y_tray[i, j, l] = y_vals
+            angulo_optimo[j, l], distancia_maxima[j, l], _ = buscar_angulo_optimo(
+                lambda a: calcular_distancia_con_drag(v, a, k, g, metodo="rk45"),
+                angulos[0], angulos[-1]
+            )
+
+    return {
+        "version": np.array(VERSION_TABLA),
+        "g": np.array(g),
+        "angulos": angulos,
+        "ks": ks,
+        "velocidades": velocidades,
+        "distancias": distancias,
+        "alturas": alturas,
+        "x_tray": x_tray,
+        "y_tray": y_tray,
+        "angulo_optimo": angulo_optimo,
+        "distancia_maxima": distancia_maxima,
+    }
+
+def guardar_tabla(tabla, ruta=RUTA_TABLA):
+    """
+    Guarda la tabla en un archivo .npz comprimido. Se escribe en un archivo
+    temporal del mismo directorio y luego se renombra, para que otro proceso
+    del servidor nunca lea un archivo a medias. Devuelve False si no se pudo
+    guardar (por ejemplo, en un directorio de solo lectura).
+    """
+    if not ruta:
+        return False
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            np.savez_compressed(archivo, **tabla)
+        os.replace(temporal, ruta)
+        return True
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        return False
+
+def cargar_tabla(ruta=RUTA_TABLA):
+    """
+    Diccionario de arreglos guardado con `guardar_tabla`, o None si no existe
+    o no se puede leer (cualquier error cuenta como si no estuviera).
+    """
+    if not ruta:
+        return None
+    try:
+        with np.load(ruta) as datos:
+            return {nombre: datos[nombre] for nombre in datos.files}
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+def cargar_o_construir_tabla(angulos, ks, velocidades, g=9.8, ruta=RUTA_TABLA):
+    """
+    Carga la tabla desde disco si existe y corresponde a la misma rejilla;
+    si no, la construye y trata de guardarla para las siguientes ejecuciones.
+    """
+    tabla = cargar_tabla(ruta)
+    nombres = ("version", "g", "angulos", "ks", "velocidades", "distancias", "alturas",
+               "x_tray", "y_tray", "angulo_optimo", "distancia_maxima")
+    if tabla is not None and all(nombre in tabla for nombre in nombres):
+        misma_rejilla = (
+            int(tabla["version"]) == VERSION_TABLA
+            and float(tabla["g"]) == g
+            and all(
+                np.array_equal(tabla[nombre], np.asarray(valores, dtype=float))
+                for nombre, valores in
+                (("angulos", angulos), ("ks", ks), ("velocidades", velocidades))
+            )
+        )
+        if misma_rejilla:
+            return tabla
+
+    tabla = construir_tabla(angulos, ks, velocidades, g)
+    guardar_tabla(tabla, ruta)
+    return tabla
+
+def _interpolar_rejilla(ejes, valores, punto):
+    """
+    Interpolación multilineal de `valores` (cuyas primeras dimensiones son los
+    ejes de la rejilla) en `punto`. Los valores fuera de la rejilla se recortan
+    al borde; un eje con un solo valor se toma tal cual.
+    """
+    indices = []
+    pesos = []
+    for eje, valor in zip(ejes, punto):
+        if len(eje) == 1:
+            indices.append((0, 0))
+            pesos.append(0.0)
+            continue
+        valor = np.clip(valor, eje[0], eje[-1])
+        i = int(np.clip(np.searchsorted(eje, valor, side="right") - 1, 0, len(eje) - 2))
+        indices.append((i, i + 1))
+        pesos.append((valor - eje[i]) / (eje[i + 1] - eje[i]))
+
+    resultado = 0.0
+    for esquina in np.ndindex(*(2,) * len(ejes)):
+        peso = np.prod([w if lado else 1 - w for lado, w in zip(esquina, pesos)])
+        if peso == 0:
+            continue
+        resultado = resultado + peso * valores[tuple(par[lado] for par, lado in zip(indices, esquina))]
+    return resultado
+
+def consultar_tabla(tabla, angulo, k, v):
+    """
+    Devuelve (distancia, altura_maxima, x_vals, y_vals) para (angulo, k, v)
+    interpolando en la tabla precalculada.
+    """
+    ejes = (tabla["angulos"], tabla["ks"], tabla["velocidades"])
+    punto = (angulo, k, v)
+    distancia = float(_interpolar_rejilla(ejes, tabla["distancias"], punto))
+    altura = float(_interpolar_rejilla(ejes, tabla["alturas"], punto))
+    x_vals = _interpolar_rejilla(ejes, tabla["x_tray"], punto).astype(float)
+    y_vals = _interpolar_rejilla(ejes, tabla["y_tray"], punto).astype(float)
+    return distancia, altura, x_vals, y_vals
+
+def consultar_optimo(tabla, k, v):
+    """
+    Devuelve (angulo_optimo, distancia_maxima) para (k, v) desde la tabla.
+    """
+    ejes = (tabla["ks"], tabla["velocidades"])
+    angulo = float(_interpolar_rejilla(ejes, tabla["angulo_optimo"], (k, v)))
+    distancia = float(_interpolar_rejilla(ejes, tabla["distancia_maxima"], (k, v)))
+    return angulo, distancia
+
+# ------------------------------------------------------
+# 2.4 Ensamble de Monte Carlo con estadísticas acumuladas por bloques
+# ------------------------------------------------------
+def _percentil_histograma(conteos, bordes, q):
+    """
+    Percentil q (0 a 100) a partir de un histograma, interpolando dentro del bin.
+    """
+    acumulado = np.cumsum(conteos)
+    objetivo = q / 100 * acumulado[-1]
+    i = int(np.searchsorted(acumulado, objetivo))
+    i = min(i, len(conteos) - 1)
+    previo = acumulado[i - 1] if i > 0 else 0
+    fraccion = (objetivo - previo) / conteos[i] if conteos[i] > 0 else 0.0
+    return bordes[i] + fraccion * (bordes[i + 1] - bordes[i])
+
+def simular_ensamble(n_muestras, v, angulo, k, sigma_v, sigma_angulo, sigma_k,
+                     g=9.8, h=0.05, tam_bloque=4096, n_bins=2000, semilla=None):
+    """
+    Propaga la incertidumbre de (v, ángulo, k) al alcance con Monte Carlo.
+
+    Los lanzamientos se sortean con distribución normal alrededor de los valores
+    nominales y se integran en bloques de tam_bloque con
+    `calcular_distancias_con_drag_lote` (el mismo método de Dormand–Prince
+    del alcance determinista, con paso fijo h). De cada bloque solo se acumula un
+    histograma de alcances (con bordes fijos) y sumas para la media y la
+    desviación, así que la memoria no crece con n_muestras.
+    - n_muestras : número total de lanzamientos
+    - v, angulo, k : valores nominales
+    - sigma_v, sigma_angulo, sigma_k : desviaciones estándar de cada parámetro
+    - h : paso de tiempo del integrador por lotes
+    - tam_bloque : lanzamientos integrados a la vez
+    - n_bins : número de bins del histograma (define la resolución de los percentiles)
+    - semilla : semilla del generador aleatorio
+
+    Devuelve un diccionario con p5, p50, p95, media, desviacion, conteos,
+    bordes, n_muestras, paso, segundos y trayectorias_por_segundo.
+    """
+    rng = np.random.default_rng(semilla)
+
+    # El alcance nunca supera el del caso ideal con la velocidad más alta probable
+    v_tope = v + 6 * sigma_v
+    bordes = np.linspace(0.0, 1.05 * v_tope**2 / g, n_bins + 1)
+    conteos = np.zeros(n_bins, dtype=np.int64)
+    suma = 0.0
+    suma_cuadrados = 0.0
+
+    inicio = time.perf_counter()
+    restantes = n_muestras
+    while restantes > 0:
+        n = min(tam_bloque, restantes)
+        v_muestra = np.clip(rng.normal(v, sigma_v, n), 1e-3, None)
+        angulo_muestra = np.clip(rng.normal(angulo, sigma_angulo, n), 0.1, 89.9)
+        k_muestra = np.clip(rng.normal(k, sigma_k, n), 0.0, None)
+
+        distancias = calcular_distancias_con_drag_lote(v_muestra, angulo_muestra, k_muestra, g, h)
+        conteos += np.histogram(np.clip(distancias, bordes[0], bordes[-1]), bins=bordes)[0]
+        suma += distancias.sum()
+        suma_cuadrados += (distancias**2).sum()
+        restantes -= n
+    segundos = time.perf_counter() - inicio
+
+    media = suma / n_muestras
+    return {
+        "p5": _percentil_histograma(conteos, bordes, 5),
+        "p50": _percentil_histograma(conteos, bordes, 50),
+        "p95": _percentil_histograma(conteos, bordes, 95),
+        "media": media,
+        "desviacion": np.sqrt(max(suma_cuadrados / n_muestras - media**2, 0.0)),
+        "conteos": conteos,
+        "bordes": bordes,
+        "n_muestras": n_muestras,
+        "paso": h,
+        "segundos": segundos,
+        "trayectorias_por_segundo": n_muestras / segundos if segundos > 0 else np.inf,
+    }
+
 # ------------------------------------------------------
 # 3. Configuración de la aplicación en Streamlit
 # ------------------------------------------------------
@@ -131,6 +670,16 @@ k = st.sidebar.slider(
     step=0.01
 )
 
+@st.cache_resource
+def obtener_tabla():
+    """
+    Tabla precalculada para toda la rejilla de los controles (se carga una
+    sola vez por proceso; la primera vez se construye y se guarda en disco).
+    """
+    return cargar_o_construir_tabla(np.arange(20, 41), np.linspace(0.0, 0.2, 21), [v_inicial], g)
+
+tabla = obtener_tabla()
+
 st.write(f"**Ángulo seleccionado:** {angulo}°")
 st.write(f"**Coeficiente de arrastre seleccionado:** {k:.2f}")
 
@@ -141,15 +690,15 @@ st.write(f"**Coeficiente de arrastre seleccionado:** {k:.2f}")
 # 4.1 Trayectoria ideal (sin drag)
 x_ideal, y_ideal = calcular_trayectoria(v_inicial, angulo, g)
 
-# 4.2 Trayectoria con drag
-x_drag, y_drag = calcular_trayectoria_con_drag(v_inicial, angulo, k, g, dt=0.01)
+# 4.2 Trayectoria con drag (leída de la tabla precalculada con paso adaptativo)
+distancia_con_drag, _, x_drag, y_drag = consultar_tabla(tabla, angulo, k, v_inicial)
 
 # 4.3 Distancias alcanzadas
 distancia_ideal = calcular_distancia(v_inicial, angulo, g)
-distancia_con_drag = x_drag[-1]  # último valor de la lista en x_drag
 
 # Crear la figura
-fig, ax = plt.subplots(figsize=(6, 4))
+fig = crear_figura(figsize=(6, 4))
+ax = fig.subplots()
 
 # Graficar trayectoria ideal
 ax.plot(x_ideal, y_ideal, label="Trayectoria ideal (sin drag)")
@@ -164,7 +713,7 @@ ax.grid(True)
 ax.legend()
 
 # Mostrar la gráfica en Streamlit
-st.pyplot(fig)
+mostrar(fig)
 
 # Resultados numéricos
 st.write(f"**Distancia sin resistencia:** {distancia_ideal:.2f} m")
@@ -174,15 +723,10 @@ st.write(f"**Distancia con resistencia:** {distancia_con_drag:.2f} m")
 # 5. Hallar la distancia máxima en el rango de ángulos [20°, 40°]
 #    tanto sin drag como con drag
 # ------------------------------------------------------
-angulos = np.linspace(20, 40, 200)
-distancias_ideales = [calcular_distancia(v_inicial, a, g) for a in angulos]
-distancias_drag = [calcular_distancia_con_drag(v_inicial, a, k, g) for a in angulos]
-
-distancia_maxima_ideal = max(distancias_ideales)
-angulo_max_ideal = angulos[np.argmax(distancias_ideales)]
-
-distancia_maxima_drag = max(distancias_drag)
-angulo_max_drag = angulos[np.argmax(distancias_drag)]
+angulo_max_ideal, distancia_maxima_ideal, _ = buscar_angulo_optimo(
+    lambda a: calcular_distancia(v_inicial, a, g), 20, 40
+)
+angulo_max_drag, distancia_maxima_drag = consultar_optimo(tabla, k, v_inicial)
 
 st.write("---")
 st.write("### Máximos en el rango de ángulos (20° - 40°)")
@@ -200,7 +744,68 @@ with col2:
     st.write(f"**Ángulo óptimo:** {angulo_max_drag:.2f}°")
 
 # ------------------------------------------------------
-# 6. Explicación
+# 6. Modo ensamble: incertidumbre en v, ángulo y k (Monte Carlo)
+# ------------------------------------------------------
+@st.cache_data(max_entries=32, show_spinner="Simulando el ensamble...")
+def ensamble_en_cache(n_muestras, v, angulo, k, sigma_v, sigma_angulo, sigma_k, g, semilla):
+    """
+    simular_ensamble guardado por parámetros y semilla: con la misma semilla el
+    resultado es el mismo, así que las interacciones que no cambian el
+    ensamble (o las de otras sesiones) no lo vuelven a simular.
+    """
+    return simular_ensamble(n_muestras, v, angulo, k, sigma_v, sigma_angulo, sigma_k, g, semilla=semilla)
+
+st.sidebar.header("Modo ensamble (Monte Carlo)")
+modo_ensamble = st.sidebar.checkbox("Activar modo ensamble", value=False)
+
+if modo_ensamble:
+    n_muestras = st.sidebar.number_input(
+        "Número de lanzamientos", min_value=1000, max_value=500000, value=20000, step=1000
+    )
+    sigma_v = st.sidebar.number_input("Desviación de la velocidad (m/s)", min_value=0.0, value=0.5, step=0.1)
+    sigma_angulo = st.sidebar.number_input("Desviación del ángulo (°)", min_value=0.0, value=1.0, step=0.1)
+    sigma_k = st.sidebar.number_input(
+        "Desviación de k", min_value=0.0, value=0.005, step=0.001, format="%.3f"
+    )
+
+    resultado = ensamble_en_cache(
+        int(n_muestras), v_inicial, angulo, k, sigma_v, sigma_angulo, sigma_k, g, semilla=0
+    )
+
+    st.write("---")
+    st.write("### Ensamble de lanzamientos con incertidumbre")
+
+    col_p5, col_p50, col_p95 = st.columns(3)
+    col_p5.metric("P5 del alcance", f"{resultado['p5']:.2f} m")
+    col_p50.metric("P50 (mediana)", f"{resultado['p50']:.2f} m")
+    col_p95.metric("P95 del alcance", f"{resultado['p95']:.2f} m")
+
+    st.write(
+        f"**Media:** {resultado['media']:.2f} m, "
+        f"**desviación estándar:** {resultado['desviacion']:.2f} m"
+    )
+    st.caption(
+        f"{resultado['n_muestras']} trayectorias en {resultado['segundos']:.2f} s "
+        f"({resultado['trayectorias_por_segundo']:,.0f} trayectorias/s), integradas con el mismo "
+        f"método de Dormand–Prince que el alcance de arriba, con paso fijo de {resultado['paso']:g} s "
+        "(cada alcance difiere en menos de 1 mm del calculado con paso adaptativo)."
+    )
+
+    # Solo se grafica la zona del histograma que tiene conteos
+    ocupados = np.nonzero(resultado["conteos"])[0]
+    desde, hasta = ocupados[0], ocupados[-1] + 1
+    fig_mc = crear_figura(figsize=(6, 3))
+    ax_mc = fig_mc.subplots()
+    ax_mc.stairs(resultado["conteos"][desde:hasta], resultado["bordes"][desde:hasta + 1], fill=True)
+    for nombre in ("p5", "p50", "p95"):
+        ax_mc.axvline(resultado[nombre], color="red", linestyle="--", linewidth=0.8)
+    ax_mc.set_xlabel("Alcance (m)")
+    ax_mc.set_ylabel("Lanzamientos")
+    ax_mc.set_title("Distribución del alcance con arrastre")
+    mostrar(fig_mc)
+
+# ------------------------------------------------------
+# 7. Explicación
 # ------------------------------------------------------
 st.write("""
 ---